@@ -0,0 +1,114 @@
+"""Local HTTP stand-in for EDGAR that replays a fixture directory.
+
+`patch_constants` points every EDGAR URL and storage path of the package at
+the stub and a scratch directory, so the real pipeline runs unmodified and
+offline.
+"""
+
+import hashlib
+import http.server
+import pathlib
+import threading
+import time
+import urllib.parse
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "EdgarStub"
+
+    def _resolve(self) -> pathlib.Path | None:
+        url = urllib.parse.urlsplit(self.path)
+        root = self.server.fixtures_dir
+        if url.path == "/cgi-bin/browse-edgar":
+            ticker = urllib.parse.parse_qs(url.query).get("CIK", [""])[0]
+            return root / "browse-edgar" / f"{ticker.upper()}.html"
+        relative = url.path.lstrip("/")
+        if not relative or ".." in relative.split("/"):
+            return None
+        return root / relative
+
+    def do_GET(self) -> None:
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+        path = self._resolve()
+        if path is None or not path.is_file():
+            self._send(404, b"Not Found", "text/plain")
+            return
+        body = path.read_bytes()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", None, etag)
+            return
+        content_type = "application/json" if path.suffix == ".json" else "text/html"
+        self._send(200, body, content_type, etag)
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str | None,
+        etag: str | None = None,
+    ) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        with self.server.stats_lock:
+            self.server.requests += 1
+            self.server.bytes_sent += len(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class EdgarStub(http.server.ThreadingHTTPServer):
+    """Serves `fixtures_dir` on a free localhost port, optionally adding `latency_s` per request."""
+
+    daemon_threads = True
+
+    def __init__(self, fixtures_dir: pathlib.Path, latency_s: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.fixtures_dir = fixtures_dir
+        self.latency_s = latency_s
+        self.requests = 0
+        self.bytes_sent = 0
+        self.stats_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "EdgarStub":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def patch_constants(base_url: str, data_dir: pathlib.Path) -> None:
+    """Points the package at the stub and keeps every file it writes under `data_dir`."""
+    from mcp_sec_filings import constants
+
+    constants.SEC_SEARCH_URL = f"{base_url}/cgi-bin/browse-edgar"
+    constants.SEC_EDGAR_URL = f"{base_url}/Archives/edgar/data"
+    constants.SEC_SUBMISSIONS_URL = f"{base_url}/submissions/{{name}}"
+    constants.SEC_CIK_URL = constants.SEC_SUBMISSIONS_URL.format(name="CIK{cik}.json")
+    constants.SEC_COMPANY_TICKERS_URL = f"{base_url}/files/company_tickers.json"
+
+    constants.BASE_DIR = str(data_dir)
+    constants.CACHE_DIR = f"{constants.BASE_DIR}/.cache"
+    constants.TICKER_INDEX_PATH = f"{constants.CACHE_DIR}/company_tickers.json"
+    constants.CATALOG_PATH = f"{constants.BASE_DIR}/catalog.sqlite3"
+    constants.SEARCH_INDEX_PATH = f"{constants.BASE_DIR}/search.sqlite3"
+    constants.PAGE_CACHE_DIR = f"{constants.CACHE_DIR}/pages"
@@ -0,0 +1,72 @@
+"""Deterministic stand-in for vLLM's `AsyncLLMEngine`.
+
+It mimics the parts `docling_vllm.VLLMBackend` uses: `generate` is an async
+generator of outputs whose last item carries `outputs[0].text` and
+`outputs[0].token_ids`. Latency is `base_latency_s + tokens * per_token_s`,
+and up to `max_batch` requests are served at once, the way a GPU engine
+batches concurrent requests.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import random
+import time
+from typing import Any, AsyncIterator
+
+
+@dataclasses.dataclass
+class FakeCompletion:
+    text: str
+    token_ids: list[int]
+
+
+@dataclasses.dataclass
+class FakeRequestOutput:
+    request_id: str
+    outputs: list[FakeCompletion]
+    finished: bool
+
+
+class FakeAsyncLLMEngine:
+    def __init__(
+        self,
+        base_latency_s: float = 0.05,
+        per_token_s: float = 0.0002,
+        tokens_per_page: int = 600,
+        max_batch: int = 16,
+        seed: int = 0,
+    ) -> None:
+        self.base_latency_s = base_latency_s
+        self.per_token_s = per_token_s
+        self.tokens_per_page = tokens_per_page
+        self.seed = seed
+        self.latencies: list[float] = []
+        self._slots = asyncio.Semaphore(max_batch)
+
+    def _doctags(self, image: Any) -> tuple[str, int]:
+        # Seeded from the image so the same page always yields the same output.
+        digest = hashlib.sha256(image.resize((32, 32)).tobytes()).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big") ^ self.seed)
+        tokens = max(1, int(rng.gauss(self.tokens_per_page, self.tokens_per_page / 5)))
+        words = " ".join(f"word{rng.randint(0, 999)}" for _ in range(tokens // 4))
+        doctags = (
+            "<doctag><section_header_level_1><loc_20><loc_20><loc_480><loc_40>"
+            f"Page {digest[:4].hex()}</section_header_level_1>"
+            f"<text><loc_20><loc_50><loc_480><loc_480>{words}</text></doctag>"
+        )
+        return doctags, tokens
+
+    async def generate(
+        self, prompt: dict[str, Any], sampling_params: Any, request_id: str
+    ) -> AsyncIterator[FakeRequestOutput]:
+        start = time.perf_counter()
+        text, tokens = self._doctags(prompt["multi_modal_data"]["image"])
+        async with self._slots:
+            await asyncio.sleep(self.base_latency_s + tokens * self.per_token_s)
+        self.latencies.append(time.perf_counter() - start)
+        yield FakeRequestOutput(
+            request_id=request_id,
+            outputs=[FakeCompletion(text=text, token_ids=list(range(tokens)))],
+            finished=True,
+        )
@@ -0,0 +1,213 @@
+"""EDGAR fixtures for the offline benchmarks.
+
+A fixture directory mirrors the EDGAR URL layout that `edgar_stub` serves:
+
+    files/company_tickers.json
+    submissions/CIK##########.json
+    browse-edgar/<TICKER>.html
+    Archives/edgar/data/<cik>/<accession>/<ticker>-<report date>.htm
+
+`generate` writes deterministic synthetic fixtures. `record` downloads the same
+files from the live EDGAR for a few tickers, so real filings can be replayed.
+
+    python -m benchmarks.fixtures generate --out /tmp/edgar --tickers 5
+    python -m benchmarks.fixtures record --out /tmp/edgar --ticker AAPL --year 2024
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import pathlib
+import random
+
+FORM_PAGES = {"10-K": 40, "10-Q": 15, "8-K": 3}
+
+
+@dataclasses.dataclass(frozen=True)
+class Company:
+    ticker: str
+    cik: int
+    name: str
+
+    @property
+    def padded_cik(self) -> str:
+        return f"{self.cik:010d}"
+
+
+def make_companies(count: int) -> list[Company]:
+    return [
+        Company(ticker=f"TK{i:03d}", cik=1_000_000 + i, name=f"Fixture Corp {i}")
+        for i in range(count)
+    ]
+
+
+def _filing_html(rng: random.Random, company: Company, form: str, pages: int) -> str:
+    words = "revenue income operating segment fiscal liquidity capital risk market customer product".split()
+    body: list[str] = []
+    for page in range(pages):
+        style = ' style="page-break-before: always"' if page else ""
+        body.append(f"<div{style}>")
+        if page == 0:
+            body.append(f"<p><b>{company.name} {form}</b></p>")
+        body.append(f"<p>Item {page % 15 + 1}. Section {page + 1}</p>")
+        for _ in range(6):
+            sentence = " ".join(rng.choice(words) for _ in range(40))
+            body.append(f"<p>{sentence.capitalize()}.</p>")
+        body.append("<table>")
+        for row in range(8):
+            cells = "".join(
+                f"<td>$</td><td>{rng.randint(1, 99_999):,}</td>" for _ in range(3)
+            )
+            body.append(f"<tr><td>Line item {row}</td>{cells}</tr>")
+        body.append("</table></div>")
+    return (
+        f"<html><head><title>{form}</title></head><body>{''.join(body)}</body></html>"
+    )
+
+
+def _write(path: pathlib.Path, content: str | bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content, encoding="utf-8")
+
+
+def generate(
+    root: pathlib.Path,
+    companies: list[Company],
+    years: list[int],
+    forms: tuple[str, ...] = ("10-K", "10-Q"),
+    pages: dict[str, int] | None = None,
+    unindexed_tickers: int = 1,
+    seed: int = 0,
+) -> None:
+    """Writes fixtures for every company, year and form.
+
+    The last `unindexed_tickers` companies are left out of
+    `company_tickers.json` so lookups fall back to the browse-edgar search.
+    """
+    pages = {**FORM_PAGES, **(pages or {})}
+    rng = random.Random(seed)
+    tickers = {
+        str(i): {"cik_str": c.cik, "ticker": c.ticker, "title": c.name}
+        for i, c in enumerate(companies[: len(companies) - unindexed_tickers])
+    }
+    _write(root / "files" / "company_tickers.json", json.dumps(tickers))
+
+    for company in companies:
+        _write(
+            root / "browse-edgar" / f"{company.ticker}.html",
+            f'<html><body><a href="/cgi-bin/browse-edgar?action=getcompany&CIK={company.padded_cik}">'
+            f"{company.name}</a></body></html>",
+        )
+        columns: dict[str, list[str]] = {
+            "accessionNumber": [],
+            "filingDate": [],
+            "reportDate": [],
+            "form": [],
+        }
+        sequence = 0
+        for year in sorted(years, reverse=True):
+            # (report date, filing date) pairs per form.
+            periods = {
+                "10-K": [(f"{year}-12-31", f"{year + 1}-02-15")],
+                "10-Q": [
+                    (f"{year}-03-31", f"{year}-05-01"),
+                    (f"{year}-06-30", f"{year}-08-01"),
+                    (f"{year}-09-30", f"{year}-11-01"),
+                ],
+                "8-K": [(f"{year}-05-15", f"{year}-05-16")],
+            }
+            for form in forms:
+                for report_date, filing_date in periods[form]:
+                    sequence += 1
+                    accession_num = (
+                        f"{company.padded_cik}-{year % 100:02d}-{sequence:06d}"
+                    )
+                    columns["accessionNumber"].append(accession_num)
+                    columns["filingDate"].append(filing_date)
+                    columns["reportDate"].append(report_date)
+                    columns["form"].append(form)
+                    html_path = (
+                        root
+                        / "Archives/edgar/data"
+                        / str(company.cik)
+                        / accession_num.replace("-", "")
+                        / f"{company.ticker.lower()}-{report_date.replace('-', '')}.htm"
+                    )
+                    _write(html_path, _filing_html(rng, company, form, pages[form]))
+        submissions = {
+            "cik": str(company.cik),
+            "name": company.name,
+            "tickers": [company.ticker],
+            "filings": {"recent": columns, "files": []},
+        }
+        _write(
+            root / "submissions" / f"CIK{company.padded_cik}.json",
+            json.dumps(submissions),
+        )
+
+
+async def record(
+    root: pathlib.Path, tickers: list[str], year: int, forms: list[str]
+) -> None:
+    """Downloads the live EDGAR files a benchmark run for `tickers` and `year` requests."""
+    from mcp_sec_filings import constants, datamodels, http_client, sec_filings
+
+    async def save(url: str, path: pathlib.Path) -> None:
+        response = await http_client.sec_get(url)
+        response.raise_for_status()
+        _write(path, response.content)
+
+    await save(
+        constants.SEC_COMPANY_TICKERS_URL, root / "files" / "company_tickers.json"
+    )
+    for ticker in tickers:
+        await save(
+            sec_filings._search_url(ticker), root / "browse-edgar" / f"{ticker}.html"
+        )
+        request = datamodels.SECFilingsRequest(
+            ticker=ticker, year=year, filing_types=forms, include_amends=False
+        )
+        cik = await sec_filings.get_cik_by_ticker(ticker)
+        await save(
+            constants.SEC_CIK_URL.format(cik=cik),
+            root / "submissions" / f"CIK{cik}.json",
+        )
+        for html_url in await sec_filings.get_sec_filings_html_urls(request) or []:
+            relative = html_url.html_url.removeprefix(constants.SEC_EDGAR_URL).lstrip(
+                "/"
+            )
+            await save(html_url.html_url, root / "Archives/edgar/data" / relative)
+    await http_client.aclose_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Write EDGAR fixtures for the benchmarks."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate_parser = subparsers.add_parser("generate")
+    generate_parser.add_argument("--out", type=pathlib.Path, required=True)
+    generate_parser.add_argument("--tickers", type=int, default=5)
+    generate_parser.add_argument("--years", default="2020-2024")
+    record_parser = subparsers.add_parser("record")
+    record_parser.add_argument("--out", type=pathlib.Path, required=True)
+    record_parser.add_argument("--ticker", action="append", required=True)
+    record_parser.add_argument("--year", type=int, required=True)
+    record_parser.add_argument("--form", action="append", default=None)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        start, end = map(int, args.years.split("-"))
+        generate(args.out, make_companies(args.tickers), list(range(start, end + 1)))
+    else:
+        asyncio.run(
+            record(args.out, args.ticker, args.year, args.form or ["10-K", "10-Q"])
+        )
+
+
+if __name__ == "__main__":
+    main()
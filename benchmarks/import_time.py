@@ -0,0 +1,99 @@
+"""Fails when a cold `import sec_server` goes over the startup budget.
+
+Every run imports the server in a fresh interpreter, so the measurement is a
+cold start like the one an MCP client pays when it spawns the server. The
+run also fails if a heavy dependency that only conversion needs gets
+imported at startup.
+
+    python benchmarks/import_time.py --budget-ms 1500 --runs 5
+"""
+
+import argparse
+import json
+import pathlib
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# Modules the server must not import until a code path needs them.
+LAZY_MODULES = [
+    "docling",
+    "docling_core",
+    "numpy",
+    "pandas",
+    "pdf2image",
+    "pdfkit",
+    "pypdfium2",
+    "torch",
+    "transformers",
+    "vllm",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import sec_server
+elapsed = time.perf_counter() - start
+loaded = sorted({name.split(".")[0] for name in sys.modules} & set(json.loads(sys.argv[1])))
+print(json.dumps({"seconds": elapsed, "loaded": loaded}))
+"""
+
+
+def measure_once() -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, json.dumps(LAZY_MODULES)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list[tuple[int, str]]:
+    """Cumulative microseconds per module from `-X importtime`, slowest first."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import sec_server"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows: list[tuple[int, str]] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    results = [measure_once() for _ in range(args.runs)]
+    median_ms = statistics.median(result["seconds"] for result in results) * 1000
+    loaded = sorted({name for result in results for name in result["loaded"]})
+
+    print(f"import sec_server: median {median_ms:.0f} ms over {args.runs} runs")
+    for cumulative_us, name in slowest_imports(args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if median_ms > args.budget_ms:
+        print(f"FAIL: over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: imported at startup: {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""Offline end-to-end benchmarks of the filing pipeline.
+
+Each scenario generates fixtures and serves them from a local EDGAR stub. It
+runs the real fetch, render and markdown code paths, with a fake inference
+engine in place of vLLM, and reports throughput, p50/p99 latencies and peak
+RSS. Scenarios run in their own interpreter so peak RSS is per scenario.
+Rendering and rasterizing still need wkhtmltopdf and poppler.
+
+    python -m benchmarks.run --scenario all --json results.json
+    python -m benchmarks.run --scenario large-document --engine-latency-ms 120
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import math
+import os
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+from benchmarks import edgar_stub, fake_engine, fixtures
+
+
+@dataclasses.dataclass(frozen=True)
+class Scenario:
+    name: str
+    tickers: int
+    years: tuple[int, ...]
+    forms: tuple[str, ...]
+    pages: dict[str, int] = dataclasses.field(default_factory=dict)
+    unindexed_tickers: int = 0
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("single-ticker", tickers=1, years=(2024,), forms=("10-K", "10-Q")),
+        Scenario(
+            "year-range",
+            tickers=1,
+            years=(2020, 2021, 2022, 2023, 2024),
+            forms=("10-K", "10-Q"),
+        ),
+        # A few tickers are missing from company_tickers.json so the
+        # browse-edgar fallback is exercised too.
+        Scenario(
+            "many-ticker",
+            tickers=25,
+            years=(2024,),
+            forms=("10-K",),
+            unindexed_tickers=3,
+        ),
+        Scenario(
+            "large-document",
+            tickers=1,
+            years=(2024,),
+            forms=("10-K",),
+            pages={"10-K": 300},
+        ),
+    ]
+}
+
+
+def percentile(values: list[float], p: float) -> float | None:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _latency_summary(prefix: str, values: list[float]) -> dict[str, float | None]:
+    return {
+        f"{prefix}_p50_s": percentile(values, 50),
+        f"{prefix}_p99_s": percentile(values, 99),
+    }
+
+
+def _peak_rss_mb(who: int) -> float:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+async def _fetch_phase(scenario: Scenario):
+    from mcp_sec_filings import datamodels, sec_filings
+
+    latencies: list[float] = []
+
+    async def run_request(ticker: str, year: int):
+        request = datamodels.SECFilingsRequest(
+            ticker=ticker,
+            year=year,
+            filing_types=list(scenario.forms),
+            include_amends=False,
+        )
+        start = time.perf_counter()
+        html_urls = await sec_filings.get_sec_filings_html_urls(request)
+        results = await sec_filings.sec_save_pdf(html_urls or [], request)
+        latencies.append(time.perf_counter() - start)
+        return results
+
+    companies = fixtures.make_companies(scenario.tickers)
+    start = time.perf_counter()
+    batches = await asyncio.gather(
+        *(run_request(c.ticker, year) for c in companies for year in scenario.years)
+    )
+    elapsed = time.perf_counter() - start
+    results = [
+        result for batch in batches for result in batch if result.status == "complete"
+    ]
+    return results, latencies, elapsed
+
+
+async def _markdown_phase(mcp_results, engine, use_text_layer: bool):
+    from mcp_sec_filings import constants, docling_vllm, pdf2md
+
+    lazy_backend = pdf2md.LazyBackend("vllm")
+    lazy_backend.backend = docling_vllm.VLLMBackend(engine, sampling_params=None)
+    page_budget = pdf2md.PageBudget(
+        int(os.getenv("MAX_INFLIGHT_PAGES", str(constants.MAX_INFLIGHT_PAGES)))
+    )
+    latencies: list[float] = []
+
+    async def run_document(page_scheduler, mcp_result):
+        start = time.perf_counter()
+        await pdf2md.convert_single_pdf_to_markdown(
+            page_scheduler, page_budget, mcp_result, use_text_layer=use_text_layer
+        )
+        latencies.append(time.perf_counter() - start)
+
+    page_counts = await asyncio.gather(
+        *(pdf2md.get_page_count(mcp_result.pdf_path) for mcp_result in mcp_results)
+    )
+    start = time.perf_counter()
+    async with pdf2md.build_page_scheduler(lazy_backend) as page_scheduler:
+        await asyncio.gather(
+            *(run_document(page_scheduler, mcp_result) for mcp_result in mcp_results)
+        )
+    return sum(page_counts), latencies, time.perf_counter() - start
+
+
+async def run_scenario(scenario: Scenario, args: argparse.Namespace) -> dict:
+    from mcp_sec_filings import adaptive_limiter, http_client, sec_filings
+
+    # Duplicate synthetic pages would otherwise be served from the page cache.
+    os.environ.setdefault("PAGE_CACHE_MAX_BYTES", "0")
+    os.environ["SEC_MAX_REQUESTS_PER_SECOND"] = str(args.sec_rate)
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scenario.name}-") as tmp:
+        root = pathlib.Path(tmp)
+        fixtures.generate(
+            root / "fixtures",
+            fixtures.make_companies(scenario.tickers),
+            list(scenario.years),
+            forms=scenario.forms,
+            pages=scenario.pages,
+            unindexed_tickers=scenario.unindexed_tickers,
+        )
+        with edgar_stub.EdgarStub(
+            root / "fixtures", latency_s=args.edgar_latency_ms / 1000
+        ) as stub:
+            edgar_stub.patch_constants(stub.base_url, root / "data")
+            try:
+                mcp_results, request_latencies, fetch_seconds = await _fetch_phase(
+                    scenario
+                )
+            finally:
+                await http_client.aclose_client()
+                sec_filings.shutdown_render_executor()
+            report = {
+                "scenario": scenario.name,
+                "requests": len(request_latencies),
+                "filings": len(mcp_results),
+                "fetch_seconds": fetch_seconds,
+                "filings_per_second": len(mcp_results) / fetch_seconds,
+                **_latency_summary("request", request_latencies),
+                "edgar_requests": stub.requests,
+                "edgar_bytes": stub.bytes_sent,
+            }
+
+        if not args.no_markdown and mcp_results:
+            engine = fake_engine.FakeAsyncLLMEngine(
+                base_latency_s=args.engine_latency_ms / 1000,
+                per_token_s=args.engine_per_token_ms / 1000,
+                tokens_per_page=args.tokens_per_page,
+                max_batch=args.engine_max_batch,
+            )
+            pages, document_latencies, markdown_seconds = await _markdown_phase(
+                mcp_results, engine, args.text_layer
+            )
+            report.update(
+                {
+                    "pages": pages,
+                    "markdown_seconds": markdown_seconds,
+                    "pages_per_second": pages / markdown_seconds,
+                    **_latency_summary("document", document_latencies),
+                    **_latency_summary("page", engine.latencies),
+                }
+            )
+
+    # Where the adaptive limiters settled, to compare runs with different latencies.
+    for limit in adaptive_limiter.snapshot():
+        report[f"{limit.resource}_limit"] = limit.limit
+    report["peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_SELF)
+    report["peak_children_rss_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return report
+
+
+def _run_isolated(name: str, argv: list[str]) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json") as result_file:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", *argv, "--scenario", name]
+            + ["--json", result_file.name],
+            check=True,
+        )
+        return json.loads(pathlib.Path(result_file.name).read_text())[0]
+
+
+def _print_report(reports: list[dict]) -> None:
+    for report in reports:
+        print(f"== {report['scenario']}")
+        for key, value in report.items():
+            if key == "scenario":
+                continue
+            formatted = f"{value:.4f}" if isinstance(value, float) else str(value)
+            print(f"  {key:<24} {formatted}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--json", type=pathlib.Path, default=None)
+    parser.add_argument("--sec-rate", type=float, default=1000.0)
+    parser.add_argument("--edgar-latency-ms", type=float, default=20.0)
+    parser.add_argument("--engine-latency-ms", type=float, default=50.0)
+    parser.add_argument("--engine-per-token-ms", type=float, default=0.2)
+    parser.add_argument("--engine-max-batch", type=int, default=16)
+    parser.add_argument("--tokens-per-page", type=int, default=600)
+    parser.add_argument("--no-markdown", action="store_true")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument(
+        "--text-layer",
+        action="store_true",
+        help="Route pages through the PDF text layer, the synthetic filings then skip the engine",
+    )
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    if args.scenario == "all":
+        # Forward every option except the scenario and result file to the children.
+        argv, skip = [], False
+        for arg in sys.argv[1:]:
+            if skip:
+                skip = False
+            elif arg in {"--scenario", "--json"}:
+                skip = True
+            elif not arg.startswith(("--scenario=", "--json=")):
+                argv.append(arg)
+        reports = [_run_isolated(name, argv) for name in SCENARIOS]
+    else:
+        reports = [asyncio.run(run_scenario(SCENARIOS[args.scenario], args))]
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(reports, indent=4))
+    if args.scenario == "all" or args.json is None:
+        _print_report(reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,9 @@ async def main():
 
     filings = await sec_filings.get_sec_filings_html_urls(sec_filings_request=sec_filings_request)
 
-    mcpresults_pdf = sec_filings.sec_save_pdf(filings, sec_filings_request)
+    mcpresults_pdf = await sec_filings.sec_save_pdf(filings, sec_filings_request)
 
-    await pdf2md.pdf2md_main(mcpresults_pdf)
+    await pdf2md.pdf2md_main([mcpresult_pdf for mcpresult_pdf in mcpresults_pdf if mcpresult_pdf.status == "complete"])
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,242 @@
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import os
+import time
+from typing import AsyncIterator
+
+from loguru import logger
+
+from mcp_sec_filings import constants, datamodels, metrics
+
+
+@dataclasses.dataclass
+class Slot:
+    """Held while one unit of work runs, set `overloaded` to report an overload signal.
+
+    The latency is measured from `started`, reset it when the slot first waits
+    on something that says nothing about the resource.
+    """
+
+    overloaded: bool = False
+    started: float = dataclasses.field(default_factory=time.perf_counter)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit of one resource class, tuned from observed latency and errors.
+
+    The short term latency (an EWMA with `smoothing`) is compared with a long
+    term baseline (an EWMA with `baseline_smoothing`, a plain mean over the
+    first samples). While the limit is saturated and the short term latency
+    stays within `tolerance` times the baseline, the limit grows by one slot
+    per limit's worth of completions (additive increase). An overloaded
+    completion, or a short term latency past the tolerance, cuts it by
+    `backoff` at most once per smoothed latency (multiplicative decrease).
+    The limit always stays within `floor` and `ceiling`.
+    """
+
+    def __init__(
+        self,
+        resource: constants.ResourceClass,
+        floor: int,
+        ceiling: int,
+        initial: int,
+        tolerance: float = constants.ADAPTIVE_LATENCY_TOLERANCE,
+        backoff: float = constants.ADAPTIVE_BACKOFF,
+        smoothing: float = constants.ADAPTIVE_LATENCY_SMOOTHING,
+        baseline_smoothing: float = constants.ADAPTIVE_BASELINE_SMOOTHING,
+    ) -> None:
+        assert (
+            1 <= floor <= ceiling
+        ), f"Invalid limits for {resource}: {floor=} {ceiling=}"
+        self.resource = resource
+        self.floor = floor
+        self.ceiling = ceiling
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.baseline_smoothing = baseline_smoothing
+        self.limit = float(min(ceiling, max(floor, initial)))
+        self.inflight = 0
+        self.latency: float | None = None
+        self.baseline_latency: float | None = None
+        self.samples = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._waiters: collections.deque[asyncio.Future[None]] = collections.deque()
+        self._publish()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.inflight < self.current_limit:
+            self.inflight += 1
+            self._publish()
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before the cancellation.
+                self.release(None)
+            else:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: float | None, overloaded: bool = False) -> None:
+        """Frees a slot, `latency` is None for work that was cancelled and says nothing about the resource."""
+        self.inflight -= 1
+        if overloaded:
+            self._decrease("overload")
+        elif latency is not None:
+            self._observe(latency)
+        self._wake()
+        self._publish()
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[Slot]:
+        """Runs the body in a slot, timing it and counting exceptions as overload."""
+        await self.acquire()
+        slot = Slot()
+        try:
+            yield slot
+        except asyncio.CancelledError:
+            self.release(None)
+            raise
+        except Exception:
+            self.release(time.perf_counter() - slot.started, overloaded=True)
+            raise
+        self.release(time.perf_counter() - slot.started, slot.overloaded)
+
+    def _observe(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+        self.samples += 1
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        else:
+            # A mean until it has enough samples, so a few early outliers
+            # do not set the baseline for long.
+            weight = max(1 / self.samples, self.baseline_smoothing)
+            self.baseline_latency += weight * (latency - self.baseline_latency)
+
+        if self.latency > self.tolerance * self.baseline_latency:
+            self._decrease("latency")
+        elif self._waiters or self.inflight + 1 >= self.current_limit:
+            # Only grow when the limit was actually the bottleneck.
+            previous = self.current_limit
+            self.limit = min(float(self.ceiling), self.limit + 1 / self.limit)
+            if self.current_limit != previous:
+                logger.debug(
+                    f"Raised {self.resource} concurrency limit to {self.current_limit}"
+                )
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        # Work started under the old limit still completes after a cut, give
+        # it one smoothed latency to drain before cutting again.
+        if self.limit <= self.floor or now - self._last_decrease < (
+            self.latency or 0.0
+        ):
+            return
+        self._last_decrease = now
+        previous = self.current_limit
+        self.limit = max(float(self.floor), self.limit * self.backoff)
+        if self.current_limit == previous:
+            return
+        self.decreases += 1
+        metrics.inc(
+            "adaptive_concurrency_decreases_total",
+            resource=self.resource,
+            reason=reason,
+        )
+        logger.debug(
+            f"Lowered {self.resource} concurrency limit to {self.current_limit} on {reason}"
+        )
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < self.current_limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def _publish(self) -> None:
+        metrics.set_gauge(
+            "adaptive_concurrency_limit", self.current_limit, resource=self.resource
+        )
+        metrics.set_gauge(
+            "adaptive_concurrency_inflight", self.inflight, resource=self.resource
+        )
+
+    def snapshot(self) -> datamodels.ConcurrencyLimit:
+        return datamodels.ConcurrencyLimit(
+            resource=self.resource,
+            limit=self.current_limit,
+            floor=self.floor,
+            ceiling=self.ceiling,
+            inflight=self.inflight,
+            waiting=sum(1 for waiter in self._waiters if not waiter.done()),
+            latency_seconds=self.latency,
+            baseline_latency_seconds=self.baseline_latency,
+            decreases=self.decreases,
+        )
+
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+_limiters_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_limiter(
+    resource: constants.ResourceClass,
+    floor: int | None = None,
+    ceiling: int | None = None,
+    initial: int | None = None,
+) -> AdaptiveLimiter:
+    """Returns the process wide limiter of a resource class for the running loop.
+
+    `floor`, `ceiling` and `initial` override the defaults of
+    `constants.ADAPTIVE_LIMITS` when the limiter is created, the
+    ADAPTIVE_<RESOURCE>_FLOOR/CEILING/INITIAL env vars override both.
+    """
+    global _limiters_loop
+
+    loop = asyncio.get_running_loop()
+    if _limiters_loop is not loop:
+        # Waiters belong to one loop, a new loop starts from fresh limiters.
+        _limiters.clear()
+        _limiters_loop = loop
+    limiter = _limiters.get(resource)
+    if limiter is None:
+        default_floor, default_ceiling, default_initial = constants.ADAPTIVE_LIMITS[
+            resource
+        ]
+        prefix = f"ADAPTIVE_{resource.upper()}"
+        limiter = AdaptiveLimiter(
+            resource,
+            floor=int(os.getenv(f"{prefix}_FLOOR", str(floor or default_floor))),
+            ceiling=int(
+                os.getenv(f"{prefix}_CEILING", str(ceiling or default_ceiling))
+            ),
+            initial=int(
+                os.getenv(f"{prefix}_INITIAL", str(initial or default_initial))
+            ),
+        )
+        _limiters[resource] = limiter
+        logger.info(
+            f"Started {resource} limiter with limit {limiter.current_limit} in [{limiter.floor}, {limiter.ceiling}]"
+        )
+    return limiter
+
+
+def snapshot() -> list[datamodels.ConcurrencyLimit]:
+    """Current limits of every resource class used so far."""
+    return [limiter.snapshot() for limiter in _limiters.values()]
@@ -0,0 +1,125 @@
+import asyncio
+import dataclasses
+import os
+from typing import Any
+
+from loguru import logger
+
+from mcp_sec_filings import catalog, constants, datamodels, sec_filings
+
+# Filings of one ticker and year are fetched once, whatever specs asked for
+# them, so no two stores ever write the same <TICKER>-<YEAR> directory.
+_WorkKey = tuple[str, int]
+
+
+@dataclasses.dataclass
+class _Work:
+    filing_types: set[str] = dataclasses.field(default_factory=set)
+    include_amends: bool = False
+
+
+def _plan(
+    specs: list[datamodels.BatchFilingsSpec],
+) -> tuple[list[tuple[datamodels.BatchFilingsSpec, int]], dict[_WorkKey, _Work]]:
+    """Expands specs into per year items and merges them into one work unit per ticker and year."""
+    items = [(spec, year) for spec in specs for year in spec.years()]
+    work: dict[_WorkKey, _Work] = {}
+    for spec, year in items:
+        unit = work.setdefault((spec.ticker, year), _Work())
+        unit.filing_types.update(spec.filing_types)
+        unit.include_amends = unit.include_amends or spec.include_amends
+    return items, work
+
+
+async def run_batch(
+    specs: list[datamodels.BatchFilingsSpec], max_concurrency: int | None = None
+) -> list[datamodels.BatchItemResult]:
+    """Fetches and stores the filings of many specs as one job, returning one result per ticker and year.
+
+    Every ticker is resolved to its CIK and submissions once, identical ticker
+    and year pairs are stored once, renders share the process wide pool and a
+    single `max_concurrency` budget bounds the work in flight across the batch.
+    """
+    budget = asyncio.Semaphore(
+        max_concurrency
+        or int(os.getenv("BATCH_MAX_CONCURRENCY", str(constants.BATCH_MAX_CONCURRENCY)))
+    )
+    items, work = _plan(specs)
+    tickers = sorted({ticker for ticker, _ in work})
+    logger.info(
+        f"Batch of {len(specs)} specs planned into {len(tickers)} tickers and {len(work)} ticker years"
+    )
+
+    async def resolve(ticker: str):
+        async with budget:
+            return await sec_filings.get_company_filings(ticker)
+
+    resolved = dict(
+        zip(
+            tickers,
+            await asyncio.gather(*map(resolve, tickers), return_exceptions=True),
+            strict=True,
+        )
+    )
+
+    async def store(key: _WorkKey, unit: _Work) -> Any:
+        ticker, year = key
+        company = resolved[ticker]
+        if isinstance(company, BaseException):
+            raise company
+        cik, company_filings = company
+        if company_filings is None:
+            return None
+        request = datamodels.SECFilingsRequest(
+            ticker=ticker,
+            year=year,
+            filing_types=sorted(unit.filing_types),
+            include_amends=unit.include_amends,
+        )
+        async with budget:
+            html_urls = await sec_filings.select_html_urls(
+                cik, company_filings, request
+            )
+            mcp_results = await sec_filings.sec_save_pdf(html_urls, request)
+        return html_urls, mcp_results
+
+    keys = list(work)
+    outcomes = dict(
+        zip(
+            keys,
+            await asyncio.gather(
+                *(store(key, work[key]) for key in keys), return_exceptions=True
+            ),
+            strict=True,
+        )
+    )
+    return [_item_result(spec, year, outcomes) for spec, year in items]
+
+
+def _item_result(
+    spec: datamodels.BatchFilingsSpec, year: int, outcomes: dict[_WorkKey, Any]
+) -> datamodels.BatchItemResult:
+    outcome = outcomes[(spec.ticker, year)]
+    result = datamodels.BatchItemResult(
+        ticker=spec.ticker,
+        year=year,
+        filing_types=spec.filing_types,
+        status="failed",
+    )
+    if isinstance(outcome, BaseException):
+        logger.error(f"Batch item {spec.ticker} {year} failed: {outcome}")
+        result.error = str(outcome) or type(outcome).__name__
+        return result
+    if outcome is None:
+        result.status = "not_found"
+        return result
+
+    def wanted(filing_name: str) -> bool:
+        return catalog.form_from_filing_name(filing_name) in spec.filing_types
+
+    html_urls, mcp_results = outcome
+    result.filings = [r for r in mcp_results if wanted(r.filing_name)]
+    requested = sum(1 for html_url in html_urls if wanted(html_url.filing_name))
+    stored = sum(1 for r in result.filings if r.status == "complete")
+    result.status = "complete" if stored >= requested else "partial"
+    return result
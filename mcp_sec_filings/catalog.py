@@ -0,0 +1,226 @@
+import contextlib
+import json
+import os
+import pathlib
+import re
+import sqlite3
+from typing import Iterator
+
+from loguru import logger
+
+from mcp_sec_filings import constants, datamodels, filing_store
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    pdf_path TEXT PRIMARY KEY,
+    accession_num TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    form TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    filing_name TEXT NOT NULL,
+    html_url TEXT NOT NULL,
+    pdf_mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS filings_ticker_form_year ON filings (ticker, form, year);
+CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_ticker_year_re = re.compile(r"^(?P<ticker>.+)-(?P<year>\d{4})$")
+
+
+def form_from_filing_name(filing_name: str) -> str:
+    """Strips the quarter and duplicate suffix `get_accession_list` adds to 10-Q names."""
+    return re.sub(r"^(10-Q)\d(-1)?$", r"\1", filing_name)
+
+
+@contextlib.contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    os.makedirs(os.path.dirname(constants.CATALOG_PATH), exist_ok=True)
+    conn = sqlite3.connect(constants.CATALOG_PATH, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        if (
+            conn.execute(
+                "SELECT 1 FROM catalog_meta WHERE key = 'imported_metadata'"
+            ).fetchone()
+            is None
+        ):
+            _import_metadata_files(conn)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _upsert(
+    conn: sqlite3.Connection, mcp_results: list[datamodels.MCPResultsPDF], year: int
+) -> None:
+    rows = [
+        (
+            mcp_result.pdf_path,
+            mcp_result.accession_num,
+            mcp_result.ticker,
+            form_from_filing_name(mcp_result.filing_name),
+            year,
+            mcp_result.filing_name,
+            mcp_result.html_url,
+            os.path.getmtime(mcp_result.pdf_path),
+        )
+        for mcp_result in mcp_results
+        if os.path.exists(mcp_result.pdf_path)
+    ]
+    conn.executemany(
+        "INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+
+
+def _import_metadata_files(conn: sqlite3.Connection) -> None:
+    """Seeds the catalog once from the per-year metadata written before it existed."""
+    for json_file in pathlib.Path(constants.BASE_DIR).glob("*/*.json"):
+        match = _ticker_year_re.match(json_file.stem)
+        if match is None:
+            continue
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            mcp_results = [datamodels.MCPResultsPDF.model_validate(d) for d in data]
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Skipping {json_file} while importing the catalog: {e}")
+            continue
+        _upsert(conn, mcp_results, int(match.group("year")))
+    conn.execute(
+        "INSERT OR REPLACE INTO catalog_meta VALUES ('imported_metadata', '1')"
+    )
+
+
+def record_filings(mcp_results: list[datamodels.MCPResultsPDF], year: int) -> None:
+    with _connect() as conn:
+        _upsert(conn, mcp_results, year)
+
+
+def _refresh_row(
+    conn: sqlite3.Connection,
+    pdf_path: str,
+    mtime: float,
+    manifests: dict[str, dict[str, datamodels.ManifestEntry]],
+) -> datamodels.ManifestEntry | None:
+    """Re-reads the row of a PDF that changed on disk from the manifest next to it.
+
+    The row is dropped when the manifest no longer has the PDF as a complete filing.
+    """
+    directory = os.path.dirname(pdf_path)
+    if directory not in manifests:
+        manifests[directory] = filing_store.load_manifest(directory)
+    entry = next(
+        (
+            entry
+            for entry in manifests[directory].values()
+            if entry.status == "complete"
+            and os.path.abspath(entry.pdf_path) == os.path.abspath(pdf_path)
+        ),
+        None,
+    )
+    if entry is None:
+        logger.info(
+            f"Dropping catalog entry for {pdf_path=}, its manifest entry is gone"
+        )
+        conn.execute("DELETE FROM filings WHERE pdf_path = ?", (pdf_path,))
+        return None
+    conn.execute(
+        "UPDATE filings SET accession_num = ?, form = ?, filing_name = ?, html_url = ?, pdf_mtime = ? WHERE pdf_path = ?",
+        (
+            entry.accession_num,
+            form_from_filing_name(entry.filing_name),
+            entry.filing_name,
+            entry.html_url,
+            mtime,
+            pdf_path,
+        ),
+    )
+    return entry
+
+
+def list_filings(
+    ticker: str | None = None,
+    form: str | None = None,
+    year: int | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[datamodels.MCPResultsPDF]:
+    """Lists stored filings, dropping rows whose PDF is gone and re-reading ones whose mtime moved.
+
+    Only the rows of the requested page are checked against the filesystem.
+    """
+    clauses, params = [], []
+    for column, value in (
+        ("ticker", ticker and ticker.upper()),
+        ("form", form),
+        ("year", year),
+    ):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    query = "SELECT pdf_path, accession_num, ticker, filing_name, html_url, pdf_mtime FROM filings"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY ticker, year, filing_name LIMIT ? OFFSET ?"
+    params.extend([limit if limit is not None else -1, offset])
+
+    mcp_results: list[datamodels.MCPResultsPDF] = []
+    manifests: dict[str, dict[str, datamodels.ManifestEntry]] = {}
+    with _connect() as conn:
+        for (
+            pdf_path,
+            accession_num,
+            row_ticker,
+            filing_name,
+            html_url,
+            pdf_mtime,
+        ) in conn.execute(query, params).fetchall():
+            try:
+                mtime = os.path.getmtime(pdf_path)
+            except OSError:
+                logger.info(f"Dropping catalog entry for missing {pdf_path=}")
+                conn.execute("DELETE FROM filings WHERE pdf_path = ?", (pdf_path,))
+                continue
+            if mtime != pdf_mtime:
+                logger.debug(f"Refreshing stale catalog entry for {pdf_path=}")
+                entry = _refresh_row(conn, pdf_path, mtime, manifests)
+                if entry is None:
+                    continue
+                accession_num = entry.accession_num
+                filing_name = entry.filing_name
+                html_url = entry.html_url
+            mcp_results.append(
+                datamodels.MCPResultsPDF(
+                    ticker=row_ticker,
+                    html_url=html_url,
+                    filing_name=filing_name,
+                    accession_num=accession_num,
+                    pdf_path=pdf_path,
+                )
+            )
+    return mcp_results
+
+
+def list_filings_with_form_year() -> list[tuple[datamodels.MCPResultsPDF, str, int]]:
+    """Every cataloged filing with its form and year, without the stale file checks of `list_filings`."""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT pdf_path, accession_num, ticker, filing_name, html_url, form, year FROM filings"
+        ).fetchall()
+    return [
+        (
+            datamodels.MCPResultsPDF(
+                ticker=ticker,
+                html_url=html_url,
+                filing_name=filing_name,
+                accession_num=accession_num,
+                pdf_path=pdf_path,
+            ),
+            form,
+            year,
+        )
+        for pdf_path, accession_num, ticker, filing_name, html_url, form, year in rows
+    ]
@@ -4,9 +4,28 @@ from typing_extensions import Literal
 SEC_SEARCH_URL: Final[str] = "http://www.sec.gov/cgi-bin/browse-edgar"
 SEC_EDGAR_URL: Final[str] = "https://www.sec.gov/Archives/edgar/data"
 
-SEC_CIK_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
+SEC_SUBMISSIONS_URL = "https://data.sec.gov/submissions/{name}"
+SEC_CIK_URL = SEC_SUBMISSIONS_URL.format(name="CIK{cik}.json")
+SEC_COMPANY_TICKERS_URL: Final[str] = "https://www.sec.gov/files/company_tickers.json"
 
 BASE_DIR = "SEC_EDGAR_FILINGS"
+CACHE_DIR = f"{BASE_DIR}/.cache"
+TICKER_INDEX_PATH = f"{CACHE_DIR}/company_tickers.json"
+TICKER_INDEX_TTL_SECONDS: Final[int] = 24 * 60 * 60
+MANIFEST_FILE_NAME = "manifest.json"
+CATALOG_PATH = f"{BASE_DIR}/catalog.sqlite3"
+# Filings listed by list_resources, the list_filings tool pages through the rest.
+RESOURCE_LIST_LIMIT = 500
+
+# SEC asks automated clients to stay at or below 10 requests per second.
+SEC_MAX_REQUESTS_PER_SECOND: Final[float] = 10.0
+SEC_MAX_RETRIES: Final[int] = 4
+SEC_BACKOFF_BASE_SECONDS: Final[float] = 0.5
+SEC_RETRY_STATUS_CODES: Final[frozenset[int]] = frozenset({429, 500, 502, 503, 504})
+
+# Submissions JSON is revalidated with a conditional GET once it is older than this.
+SUBMISSIONS_CACHE_FRESH_SECONDS: Final[int] = 5 * 60
+SUBMISSIONS_CACHE_MAX_BYTES: Final[int] = 256 * 1024 * 1024
 
 
 SecFilingType = Literal[
@@ -73,4 +92,74 @@ PROMPT_TEXT = "Convert page to Docling."
 CHAT_TEMPLATE = f"<|im_start|>User:<image>{PROMPT_TEXT}<end_of_utterance>\
 Assistant:"
 MAX_TOKENS= 8192
-PAGE_BREAK = "---Page Break---"
\ No newline at end of file
+InferenceBackendName = Literal["vllm", "transformers"]
+INFERENCE_DTYPE = "float32"
+INFERENCE_MAX_BATCH_SIZE = 4
+INFERENCE_MAX_BATCH_WAIT_MS = 50
+MAX_TRACKED_MARKDOWN_JOBS = 1000
+BATCH_MAX_CONCURRENCY = 8
+# Adaptive concurrency limits per resource class as (floor, ceiling, initial).
+# EDGAR metadata (submissions, ticker index) and archive downloads (filing
+# HTML) are separate classes, their latencies differ by orders of magnitude.
+ResourceClass = Literal["edgar_metadata", "edgar_archive", "render", "inference"]
+ADAPTIVE_LIMITS: Final[dict[str, tuple[int, int, int]]] = {
+    "edgar_metadata": (1, 10, 5),
+    "edgar_archive": (1, 10, 5),
+    "render": (1, 8, 2),
+    "inference": (1, 8, 2),
+}
+# Latency above this multiple of the baseline counts as congestion.
+ADAPTIVE_LATENCY_TOLERANCE = 2.0
+ADAPTIVE_BACKOFF = 0.7
+ADAPTIVE_LATENCY_SMOOTHING = 0.2
+# The baseline is a slow average of latency, a plain mean over the first samples.
+ADAPTIVE_BASELINE_SMOOTHING = 0.02
+PAGE_BREAK = "---Page Break---"
+
+RASTER_DPI = 200
+RASTER_THREADS = 1
+RASTER_CHUNK_PAGES = 4
+# Upper bound on rasterized page images held in memory across all documents.
+MAX_INFLIGHT_PAGES = 8
+
+PAGE_CACHE_DIR = f"{CACHE_DIR}/pages"
+PAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+PAGE_CACHE_NORMALIZED_WIDTH = 512
+PAGE_CHECKPOINT_SUFFIX = ".pages.jsonl"
+
+# Pages whose embedded text layer passes these checks skip SmolDocling.
+PAGE_ROUTES_SUFFIX = ".routes.json"
+TEXT_LAYER_MIN_CHARS = 50
+TEXT_LAYER_MAX_IMAGE_COVERAGE = 0.5
+TEXT_LAYER_MAX_GARBAGE_RATIO = 0.05
+TEXT_LAYER_MIN_TABLE_LINES = 5
+TEXT_LAYER_MAX_TABLE_RATIO = 0.3
+
+# "html" converts the filing HTML straight to markdown and only sends
+# image-only documents through the "vlm" (PDF render + SmolDocling) path.
+ConversionMode = Literal["vlm", "html"]
+HTML_MIN_TEXT_CHARS = 200
+METRICS_RESOURCE_URI = "metrics://prometheus"
+# Latency histogram bucket upper bounds in seconds, renders and 10-K pages can take minutes.
+METRICS_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+METRICS_TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+SEARCH_INDEX_PATH = f"{BASE_DIR}/search.sqlite3"
+SEARCH_SNIPPET_TOKENS = 24
+MD_OFFSETS_SUFFIX = ".offsets.json"
+FILING_RESOURCE_MAX_BYTES = 4 * 1024 * 1024
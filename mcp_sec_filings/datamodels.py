@@ -1,6 +1,6 @@
 import pydantic
 import pydantic_settings
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 import datetime
 
 import re
@@ -66,6 +66,7 @@ class AccessionNumElem(pydantic.BaseModel):
 class HTMLURLList(pydantic.BaseModel):
     html_url: str
     filing_name: str
+    accession_num: str = ""
 
     @classmethod
     def from_cik_accnum_ticker(
@@ -74,9 +75,114 @@ class HTMLURLList(pydantic.BaseModel):
         rgld_cik = int(cik.lstrip("0"))
         html_url = f"{constants.SEC_EDGAR_URL}/{rgld_cik}/{acc_num.no_dashes_accession_num}/{ticker.lower()}-{acc_num.no_dashes_report_date}.htm"
         filing_name = acc_num.filing_name
-        return cls(html_url=html_url, filing_name=filing_name)
+        return cls(
+            html_url=html_url,
+            filing_name=filing_name,
+            accession_num=acc_num.accession_num,
+        )
 
 
 class MCPResultsPDF(HTMLURLList):
     pdf_path: str
     ticker: str
+    status: Literal["complete", "failed"] = "complete"
+    error: str | None = None
+
+
+class ManifestEntry(pydantic.BaseModel):
+    accession_num: str
+    filing_name: str
+    html_url: str
+    html_path: str
+    pdf_path: str
+    html_sha256: str | None = None
+    pdf_sha256: str | None = None
+    status: Literal["pending", "complete", "failed"]
+    error: str | None = None
+    updated_at: str
+
+
+class ConcurrencyLimit(pydantic.BaseModel):
+    resource: constants.ResourceClass
+    limit: int
+    floor: int
+    ceiling: int
+    inflight: int
+    waiting: int
+    latency_seconds: float | None = None
+    baseline_latency_seconds: float | None = None
+    decreases: int = 0
+
+
+class ConversionJob(pydantic.BaseModel):
+    job_id: str
+    pdf_path: str
+    ticker: str
+    filing_name: str
+    mode: constants.ConversionMode
+    status: Literal["queued", "running", "complete", "partial", "failed"]
+    md_path: str
+    failed_pages: list[int] = []
+    error: str | None = None
+    created_at: str
+    updated_at: str
+
+
+_YEAR_RANGE_RE = re.compile(r"^\s*(\d{4})\s*-\s*(\d{4})\s*$")
+
+
+class BatchFilingsSpec(pydantic.BaseModel):
+    ticker: Annotated[str, "Ticker symbol"]
+    year: Annotated[int | None, "Single year of filings"] = None
+    year_range: Annotated[
+        str | None, "Range of years in the format START_YEAR-END_YEAR"
+    ] = None
+    filing_types: list[constants.SecFilingType]
+    include_amends: bool = False
+    _years: list[int] = pydantic.PrivateAttr(default_factory=list)
+
+    @pydantic.model_validator(mode="after")
+    def check_years(self) -> "BatchFilingsSpec":
+        self.ticker = self.ticker.upper()
+        if (self.year is None) == (self.year_range is None):
+            raise ValueError(
+                f"Exactly one of year and year range must be set, got {self.year=} and {self.year_range=}"
+            )
+        if self.year is not None:
+            self._years = [self.year]
+        else:
+            match = _YEAR_RANGE_RE.match(self.year_range or "")
+            if match is None or int(match.group(1)) > int(match.group(2)):
+                raise ValueError(
+                    f"year_range must be START_YEAR-END_YEAR with START_YEAR <= END_YEAR, got {self.year_range=}"
+                )
+            self._years = list(range(int(match.group(1)), int(match.group(2)) + 1))
+        return self
+
+    def years(self) -> list[int]:
+        return list(self._years)
+
+
+class BatchItemResult(pydantic.BaseModel):
+    ticker: str
+    year: int
+    filing_types: list[constants.SecFilingType]
+    status: Literal["complete", "partial", "not_found", "failed"]
+    filings: list[MCPResultsPDF] = []
+    error: str | None = None
+
+
+class SearchHit(pydantic.BaseModel):
+    ticker: str
+    form: str
+    year: int
+    accession_num: str
+    filing_name: str
+    pdf_path: str
+    md_path: str
+    page: Annotated[int, "1-based page of the filing the snippet is on"]
+    section: Annotated[
+        str, "Item heading the snippet is under, empty before the first one"
+    ]
+    snippet: str
+    score: Annotated[float, "bm25 rank, lower is more relevant"]
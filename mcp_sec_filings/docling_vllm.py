@@ -1,27 +1,38 @@
 import asyncio
-import torch
-from docling_core.types.doc import DoclingDocument
-from docling_core.types.doc.document import DocTagsDocument
-from transformers import AutoProcessor, AutoModelForVision2Seq
-from vllm import AsyncLLMEngine, SamplingParams
-from vllm.engine.arg_utils import AsyncEngineArgs
-from PIL import Image
+import os
+import uuid
+from typing import TYPE_CHECKING, Protocol
+from loguru import logger
 
-from mcp_sec_filings import constants
+from mcp_sec_filings import constants, metrics
 
+# torch, transformers, vllm and docling take seconds to import, so they are
+# only imported by the functions that load or run a model.
+if TYPE_CHECKING:
+    import torch
+    from PIL import Image
+    from transformers import AutoProcessor, AutoModelForVision2Seq
+    from vllm import AsyncLLMEngine, SamplingParams
 
-def load_model()-> tuple[AutoProcessor, AutoModelForVision2Seq]:
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+
+def load_model(device: str | None = None, dtype: "torch.dtype | None" = None)-> "tuple[AutoProcessor, AutoModelForVision2Seq]":
+    import torch
+    from transformers import AutoProcessor, AutoModelForVision2Seq
+
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
     processor = AutoProcessor.from_pretrained(constants.DOCLING_MODEL_NAME)
     model = AutoModelForVision2Seq.from_pretrained(
         constants.DOCLING_MODEL_NAME,
-        torch_dtype=torch.bfloat16,
+        torch_dtype=dtype or torch.bfloat16,
         # _attn_implementation="flash_attention_2" if DEVICE == "cuda" else "eager",
     ).to(device)
 
     return processor, model
 
 def load_vllm_model():
+    from vllm import AsyncLLMEngine, SamplingParams
+    from vllm.engine.arg_utils import AsyncEngineArgs
+
     llm = AsyncLLMEngine.from_engine_args(
         AsyncEngineArgs(
             model = constants.DOCLING_MODEL_NAME,
@@ -37,16 +48,139 @@ def load_vllm_model():
         max_tokens=constants.MAX_TOKENS)
     return llm, sampling_params
 
-async def convert_single_image_to_md(sempahore:asyncio.Semaphore, llm: AsyncLLMEngine, sampling_params: SamplingParams, image: Image.Image)-> str | None:
+class InferenceBackend(Protocol):
+    """Turns one page image into SmolDocling doctags."""
+
+    async def generate_doctags(self, image: "Image.Image") -> str: ...
+
+
+class VLLMBackend:
+    def __init__(self, llm: "AsyncLLMEngine", sampling_params: "SamplingParams"):
+        self.llm = llm
+        self.sampling_params = sampling_params
+
+    async def generate_doctags(self, image: "Image.Image") -> str:
+        llm_input = {"prompt": constants.CHAT_TEMPLATE, "multi_modal_data": {"image": image}}
+        output = None
+        with metrics.span("inference_generate", backend="vllm"):
+            async for output in self.llm.generate(llm_input, sampling_params=self.sampling_params, request_id=uuid.uuid4().hex):
+                pass
+        completion = output.outputs[0]
+        metrics.observe("inference_generated_tokens", len(completion.token_ids), backend="vllm")
+        return completion.text
+
+
+class TransformersBackend:
+    """CPU friendly backend on top of `load_model` that batches concurrent pages.
+
+    Pages that arrive within `max_wait_ms` of each other are generated together,
+    up to `max_batch_size` at a time. `quantize` applies dynamic int8
+    quantization to the linear layers, which needs float32 weights.
+    """
+
+    def __init__(
+        self,
+        device: str = "cpu",
+        dtype: str = constants.INFERENCE_DTYPE,
+        num_threads: int | None = None,
+        quantize: bool = False,
+        max_batch_size: int = constants.INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms: int = constants.INFERENCE_MAX_BATCH_WAIT_MS,
+    ):
+        import torch
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        torch_dtype = torch.float32 if quantize else getattr(torch, dtype)
+        self.device = device
+        self.processor, self.model = load_model(device=device, dtype=torch_dtype)
+        if quantize:
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model.eval()
+        # Decoder-only generation needs the prompts aligned on the right.
+        self.processor.tokenizer.padding_side = "left"
+        messages = [{"role": "user", "content": [{"type": "image"}, {"type": "text", "text": constants.PROMPT_TEXT}]}]
+        self.prompt = self.processor.apply_chat_template(messages, add_generation_prompt=True)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "asyncio.Queue[tuple[Image.Image, asyncio.Future[str]]] | None" = None
+        self._batcher: asyncio.Task | None = None
+
+    def _generate_batch(self, images: "list[Image.Image]") -> list[str]:
+        import torch
+
+        inputs = self.processor(
+            text=[self.prompt] * len(images),
+            images=[[image] for image in images],
+            return_tensors="pt",
+            padding=True,
+        ).to(self.device)
+        with torch.inference_mode():
+            generated_ids = self.model.generate(**inputs, max_new_tokens=constants.MAX_TOKENS)
+        trimmed_ids = generated_ids[:, inputs.input_ids.shape[1]:]
+        if metrics.is_enabled():
+            for token_count in (trimmed_ids != self.processor.tokenizer.pad_token_id).sum(dim=1).tolist():
+                metrics.observe("inference_generated_tokens", token_count, backend="transformers")
+        return [text.lstrip() for text in self.processor.batch_decode(trimmed_ids, skip_special_tokens=False)]
+
+    async def _batch_loop(self):
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                with metrics.span("inference_generate", backend="transformers", batch_size=len(batch)):
+                    doctags = await asyncio.to_thread(self._generate_batch, [image for image, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), text in zip(batch, doctags, strict=True):
+                if not future.done():
+                    future.set_result(text)
+
+    async def generate_doctags(self, image: "Image.Image") -> str:
+        if self._batcher is None or self._batcher.done():
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._batch_loop())
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future))
+        return await future
+
+
+def load_backend(name: constants.InferenceBackendName) -> InferenceBackend:
+    if name == "transformers":
+        return TransformersBackend(
+            dtype=os.getenv("INFERENCE_DTYPE", constants.INFERENCE_DTYPE),
+            num_threads=int(os.getenv("INFERENCE_TORCH_THREADS", "0")) or None,
+            quantize=os.getenv("INFERENCE_QUANTIZE", "0") == "1",
+            max_batch_size=int(os.getenv("INFERENCE_MAX_BATCH_SIZE", str(constants.INFERENCE_MAX_BATCH_SIZE))),
+            max_wait_ms=int(os.getenv("INFERENCE_MAX_BATCH_WAIT_MS", str(constants.INFERENCE_MAX_BATCH_WAIT_MS))),
+        )
+    llm, sampling_params = load_vllm_model()
+    return VLLMBackend(llm, sampling_params)
+
+
+async def convert_single_image_to_md(backend: InferenceBackend, image: "Image.Image")-> str | None:
+    from docling_core.types.doc import DoclingDocument
+    from docling_core.types.doc.document import DocTagsDocument
+
     try:
-        async with sempahore:
-            llm_input = {"prompt": constants.CHAT_TEMPLATE, "multi_modal_data": {"image": image}}
-            output = await llm.generate([llm_input], sampling_params=sampling_params)[0]
-            doctags = output.outputs[0].text
-            doctags_doc = DocTagsDocument.from_doctags_and_image_pairs([doctags], [image])
-            doc = DoclingDocument(name="Document")
-            doc.load_from_doctags(doctags_doc)
-            return doc.export_to_markdown()
+        doctags = await backend.generate_doctags(image)
+        doctags_doc = DocTagsDocument.from_doctags_and_image_pairs([doctags], [image])
+        doc = DoclingDocument(name="Document")
+        doc.load_from_doctags(doctags_doc)
+        return doc.export_to_markdown()
     except Exception as e:
+        logger.error(f"Failed to convert page with error {e}")
         return None
-
@@ -0,0 +1,201 @@
+import io
+import json
+import mmap
+import os
+import pathlib
+import re
+from typing import Any
+
+from loguru import logger
+
+from mcp_sec_filings import constants, filing_store, html2md
+
+_PAGE_BREAK = constants.PAGE_BREAK.encode("utf-8")
+# Bumped whenever the table layout or the section rules change, so stored tables are rebuilt.
+_OFFSET_TABLE_VERSION = 2
+# Item/Part headings as html2md, text_layer and the VLM write them, with any
+# markdown heading or emphasis markers in front. Pages are joined without a
+# newline, so a heading also starts right after a page break and ends at one.
+_SECTION_LINE_RE = re.compile(
+    rb"(?:^|(?<="
+    + re.escape(_PAGE_BREAK)
+    + rb"))[#*_ \t]*((?:"
+    + html2md.SECTION_RE.pattern.lstrip("^").encode()
+    + rb")(?:(?!"
+    + re.escape(_PAGE_BREAK)
+    + rb")[^\n])*)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_SECTION_KEY_RE = re.compile(r"^(item|part)\s+(\w+)", re.IGNORECASE)
+
+
+def section_key(heading: str) -> str | None:
+    """Normalizes "Item 7." or "ITEM 1A - Risk Factors" to "item-7" or "item-1a"."""
+    match = _SECTION_KEY_RE.match(heading.strip())
+    if match is None:
+        return None
+    return f"{match.group(1)}-{match.group(2)}".lower()
+
+
+def offsets_path_for(md_path: str) -> pathlib.Path:
+    return pathlib.Path(md_path).with_suffix(constants.MD_OFFSETS_SUFFIX)
+
+
+def build_offset_table(buffer: bytes | mmap.mmap) -> dict[str, Any]:
+    """Byte spans of every page and Item/Part section of a converted markdown file.
+
+    Page spans exclude the `PAGE_BREAK` separators. A section runs from its
+    heading to the next heading of any kind or the end of the document.
+    """
+    pages: list[list[int]] = []
+    start = 0
+    while True:
+        end = buffer.find(_PAGE_BREAK, start)
+        if end == -1:
+            pages.append([start, len(buffer)])
+            break
+        pages.append([start, end])
+        start = end + len(_PAGE_BREAK)
+
+    page_starts = [page_start for page_start, _ in pages]
+    sections: list[dict[str, Any]] = []
+    for match in _SECTION_LINE_RE.finditer(buffer):
+        heading = match.group(1).decode("utf-8", errors="replace").strip(" *_")
+        key = section_key(heading)
+        if key is None or len(heading) > html2md.MAX_SECTION_HEADING_CHARS:
+            continue
+        if sections:
+            sections[-1]["end"] = match.start()
+        page = sum(1 for page_start in page_starts if page_start <= match.start())
+        sections.append(
+            {"key": key, "heading": heading, "start": match.start(), "page": page}
+        )
+    if sections:
+        sections[-1]["end"] = len(buffer)
+    return {
+        "version": _OFFSET_TABLE_VERSION,
+        "size": len(buffer),
+        "pages": pages,
+        "sections": sections,
+    }
+
+
+def save_offset_table(md_path: str, md: str) -> None:
+    """Writes the offset table of markdown that was just converted next to it."""
+    table = build_offset_table(md.encode("utf-8"))
+    table["mtime_ns"] = os.stat(md_path).st_mtime_ns
+    filing_store.atomic_write_text(str(offsets_path_for(md_path)), json.dumps(table))
+
+
+def load_offset_table(md_path: str) -> dict[str, Any]:
+    """Returns the offset table of `md_path`, rebuilding it with mmap when missing or stale."""
+    stat = os.stat(md_path)
+    offsets_path = offsets_path_for(md_path)
+    try:
+        table = json.loads(offsets_path.read_text(encoding="utf-8"))
+        if (
+            table.get("version") == _OFFSET_TABLE_VERSION
+            and table["size"] == stat.st_size
+            and table.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            return table
+    except (OSError, ValueError, KeyError):
+        pass
+    logger.info(f"Rebuilding the offset table of {md_path}")
+    with open(md_path, "rb") as f:
+        if stat.st_size == 0:
+            table = build_offset_table(b"")
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                table = build_offset_table(mm)
+    table["mtime_ns"] = stat.st_mtime_ns
+    filing_store.atomic_write_text(str(offsets_path), json.dumps(table))
+    return table
+
+
+def parse_range(value: str, upper: int) -> tuple[int, int]:
+    """Parses "3", "3-7" or "3-" into an inclusive (first, last) pair clamped to `upper`."""
+    first_text, separator, last_text = value.partition("-")
+    first = int(first_text)
+    last = int(last_text) if last_text else (upper if separator else first)
+    if first > last:
+        raise ValueError(f"Invalid range {value!r}")
+    return first, min(last, upper)
+
+
+def _decode_markdown(data: bytes) -> str:
+    # Spans are contiguous, only the page separators in between are dropped.
+    return data.decode("utf-8", errors="replace").replace(constants.PAGE_BREAK, "\n\n")
+
+
+def read_bytes(path: str, start: int, end: int) -> bytes:
+    """Reads `[start, end)` of a file through mmap, so only the touched pages are loaded."""
+    end = min(end, os.path.getsize(path))
+    if end - start > constants.FILING_RESOURCE_MAX_BYTES:
+        raise ValueError(
+            f"Requested {end - start} bytes, more than FILING_RESOURCE_MAX_BYTES, ask for a smaller range"
+        )
+    if start >= end:
+        return b""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[start:end]
+
+
+def read_markdown_pages(md_path: str, pages: str) -> str:
+    table = load_offset_table(md_path)
+    first, last = parse_range(pages, len(table["pages"]))
+    if first < 1 or first > len(table["pages"]):
+        raise ValueError(f"{md_path} has {len(table['pages'])} pages, got {pages=}")
+    spans = table["pages"][first - 1 : last]
+    return _decode_markdown(read_bytes(md_path, spans[0][0], spans[-1][1]))
+
+
+def read_markdown_section(md_path: str, section: str) -> str:
+    """Reads one Item/Part section such as "item-7" or "Item 1A".
+
+    When a heading appears more than once, as it does in tables of contents,
+    the longest occurrence is the section body.
+    """
+    key = section_key(section.replace("-", " ")) or section.lower()
+    table = load_offset_table(md_path)
+    matches = [s for s in table["sections"] if s["key"] == key]
+    if not matches:
+        available = sorted({s["key"] for s in table["sections"]})
+        raise ValueError(f"No section {section!r} in {md_path}, available: {available}")
+    longest = max(matches, key=lambda s: s["end"] - s["start"])
+    return _decode_markdown(read_bytes(md_path, longest["start"], longest["end"]))
+
+
+def read_markdown_bytes(md_path: str, byte_range: str) -> str:
+    start, end = parse_range(byte_range, os.path.getsize(md_path) - 1)
+    return read_bytes(md_path, start, end + 1).decode("utf-8", errors="replace")
+
+
+def extract_pdf_pages(pdf_path: str, pages: str) -> bytes:
+    """Copies a page range of a stored PDF into a new, smaller PDF."""
+    import pypdfium2
+
+    from mcp_sec_filings import text_layer
+
+    with text_layer.pdfium_lock:
+        source = pypdfium2.PdfDocument(pdf_path)
+        try:
+            first, last = parse_range(pages, len(source))
+            if first < 1 or first > len(source):
+                raise ValueError(f"{pdf_path} has {len(source)} pages, got {pages=}")
+            extract = pypdfium2.PdfDocument.new()
+            try:
+                extract.import_pages(source, list(range(first - 1, last)))
+                buffer = io.BytesIO()
+                extract.save(buffer)
+            finally:
+                extract.close()
+        finally:
+            source.close()
+    return buffer.getvalue()
+
+
+def read_pdf_bytes(pdf_path: str, byte_range: str) -> bytes:
+    start, end = parse_range(byte_range, os.path.getsize(pdf_path) - 1)
+    return read_bytes(pdf_path, start, end + 1)
@@ -0,0 +1,88 @@
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+
+from loguru import logger
+
+from mcp_sec_filings import constants, datamodels
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """Writes `data` to a temporary file next to `path` and renames it into place."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def now_isoformat() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def html_path_for(pdf_path: str) -> str:
+    """The filing HTML is stored next to its PDF under the same name."""
+    return os.path.splitext(pdf_path)[0] + ".htm"
+
+
+def manifest_path(base_path: str) -> str:
+    return os.path.join(base_path, constants.MANIFEST_FILE_NAME)
+
+
+def load_manifest(base_path: str) -> dict[str, datamodels.ManifestEntry]:
+    path = manifest_path(base_path)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+        return {}
+    return {
+        accession_num: datamodels.ManifestEntry.model_validate(entry)
+        for accession_num, entry in entries.items()
+    }
+
+
+def save_manifest(
+    base_path: str, manifest: dict[str, datamodels.ManifestEntry]
+) -> None:
+    payload = {
+        accession_num: entry.model_dump() for accession_num, entry in manifest.items()
+    }
+    atomic_write_text(manifest_path(base_path), json.dumps(payload, indent=4))
+
+
+def is_complete(entry: datamodels.ManifestEntry | None) -> bool:
+    """True when the entry rendered successfully and its PDF is still intact on disk."""
+    if entry is None or entry.status != "complete" or not entry.pdf_sha256:
+        return False
+    if not os.path.exists(entry.pdf_path):
+        return False
+    return sha256_file(entry.pdf_path) == entry.pdf_sha256
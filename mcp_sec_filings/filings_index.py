@@ -0,0 +1,195 @@
+import collections
+import dataclasses
+from typing import Any, Iterable
+
+import httpx
+import numpy as np
+from loguru import logger
+
+from mcp_sec_filings import constants, datamodels, submissions
+
+_MAX_CACHED_INDEXES = 128
+
+
+@dataclasses.dataclass(frozen=True)
+class FilingsTable:
+    """Columnar view of an EDGAR submissions `filings` block.
+
+    Report years, 10-Q quarters and duplicate suffixes are computed once for the
+    whole table, so every (year, filing_types) query is a single boolean mask.
+    """
+
+    accession_num: np.ndarray
+    form: np.ndarray
+    filing_date: np.ndarray
+    report_date: np.ndarray
+    report_year: np.ndarray
+    filing_name: np.ndarray
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list[str]]) -> "FilingsTable":
+        return cls.from_arrays(
+            accession_num=np.asarray(columns["accessionNumber"], dtype=str),
+            form=np.asarray(columns["form"], dtype=str),
+            filing_date=np.asarray(columns["filingDate"], dtype=str),
+            report_date=np.asarray(columns["reportDate"], dtype=str),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        accession_num: np.ndarray,
+        form: np.ndarray,
+        filing_date: np.ndarray,
+        report_date: np.ndarray,
+    ) -> "FilingsTable":
+        # Missing report dates are empty strings, which numpy parses as NaT.
+        dates = report_date.astype("datetime64[D]")
+        valid = ~np.isnat(dates)
+        report_year = np.where(
+            valid, dates.astype("datetime64[Y]").astype(np.int64) + 1970, -1
+        )
+        quarter = dates.astype("datetime64[M]").astype(np.int64) % 12 // 3 + 1
+
+        is_10q = (form == "10-Q") & valid
+        filing_name = np.where(
+            is_10q, np.char.add(form, quarter.astype(str)), form
+        ).astype(str)
+
+        # Only the first 10-Q per (year, quarter) keeps the plain name, later
+        # ones (e.g. a re-filed quarter) get a "-1" suffix.
+        group_keys = np.char.add(np.char.add(report_year.astype(str), "|"), filing_name)
+        _, first_index = np.unique(group_keys, return_index=True)
+        is_first = np.zeros(len(form), dtype=bool)
+        is_first[first_index] = True
+        filing_name = np.where(
+            is_10q & ~is_first, np.char.add(filing_name, "-1"), filing_name
+        )
+
+        return cls(
+            accession_num=accession_num,
+            form=form,
+            filing_date=filing_date,
+            report_date=report_date,
+            report_year=report_year,
+            filing_name=filing_name,
+        )
+
+    def take(self, mask: np.ndarray) -> "FilingsTable":
+        return FilingsTable(
+            *(getattr(self, field.name)[mask] for field in dataclasses.fields(self))
+        )
+
+    def concat(self, other: "FilingsTable") -> "FilingsTable":
+        """Appends `other`, recomputing the duplicate suffixes over the combined rows."""
+        return FilingsTable.from_arrays(
+            accession_num=np.concatenate([self.accession_num, other.accession_num]),
+            form=np.concatenate([self.form, other.form]),
+            filing_date=np.concatenate([self.filing_date, other.filing_date]),
+            report_date=np.concatenate([self.report_date, other.report_date]),
+        )
+
+    def partition_by_year(self) -> dict[int, "FilingsTable"]:
+        return {
+            int(year): self.take(self.report_year == year)
+            for year in np.unique(self.report_year)
+            if year >= 0
+        }
+
+    def __len__(self) -> int:
+        return len(self.accession_num)
+
+    def select(
+        self, year: int, filing_types: Iterable[str]
+    ) -> list[datamodels.AccessionNumElem]:
+        mask = (self.report_year == year) & np.isin(self.form, list(filing_types))
+        return [
+            datamodels.AccessionNumElem.from_accession_metadata(
+                accession_num=str(self.accession_num[i]),
+                filing_name=str(self.filing_name[i]),
+                filing_date=str(self.filing_date[i]),
+                report_date=str(self.report_date[i]),
+            )
+            for i in np.flatnonzero(mask)
+        ]
+
+
+class FilingsIndex:
+    """Year partitioned filings of one company.
+
+    Starts from `filings.recent` and pulls the older paginated submissions
+    shards listed in `filings.files` only when a year outside the recent
+    window is requested.
+    """
+
+    def __init__(self, cik: str, submissions_doc: dict[str, Any]) -> None:
+        self.cik = cik
+        filings = submissions_doc.get("filings", {})
+        recent = FilingsTable.from_columns(filings["recent"])
+        self._partitions = recent.partition_by_year()
+        self._recent_from = min(recent.filing_date.tolist(), default="")
+        self._files: list[dict[str, Any]] = filings.get("files", [])
+        self._loaded_files: set[str] = set()
+
+    def _missing_shards(self, year: int) -> list[dict[str, Any]]:
+        # Filings for a report year are filed during that year or the next one.
+        window_start, window_end = f"{year}-01-01", f"{year + 1}-12-31"
+        if window_start >= self._recent_from:
+            return []
+        return [
+            shard
+            for shard in self._files
+            if shard["name"] not in self._loaded_files
+            and shard.get("filingFrom", "") <= window_end
+            and shard.get("filingTo", "9999") >= window_start
+        ]
+
+    def _merge(self, table: FilingsTable) -> None:
+        for year, partition in table.partition_by_year().items():
+            existing = self._partitions.get(year)
+            self._partitions[year] = (
+                partition if existing is None else existing.concat(partition)
+            )
+
+    async def ensure_year(self, year: int) -> None:
+        for shard in self._missing_shards(year):
+            url = constants.SEC_SUBMISSIONS_URL.format(name=shard["name"])
+            try:
+                columns = await submissions.submissions_cache.get(url)
+            except httpx.HTTPStatusError as exc:
+                logger.error(f"Error fetching submissions shard {shard['name']}: {exc}")
+                continue
+            if shard["name"] in self._loaded_files:
+                continue
+            self._merge(FilingsTable.from_columns(columns))
+            self._loaded_files.add(shard["name"])
+            logger.info(f"Loaded submissions shard {shard['name']} for {year=}")
+
+    def years(self) -> list[int]:
+        return sorted(self._partitions)
+
+    def select(
+        self, year: int, filing_types: Iterable[str]
+    ) -> list[datamodels.AccessionNumElem]:
+        partition = self._partitions.get(year)
+        if partition is None:
+            return []
+        return partition.select(year=year, filing_types=filing_types)
+
+
+_indexes: collections.OrderedDict[str, tuple[dict[str, Any], FilingsIndex]] = (
+    collections.OrderedDict()
+)
+
+
+def get_filings_index(cik: str, submissions_doc: dict[str, Any]) -> FilingsIndex:
+    """Returns the index for `submissions_doc`, reusing it while the submissions cache serves the same copy."""
+    cached = _indexes.get(cik)
+    if cached is not None and cached[0] is submissions_doc:
+        _indexes.move_to_end(cik)
+        return cached[1]
+    index = FilingsIndex(cik, submissions_doc)
+    _indexes[cik] = (submissions_doc, index)
+    if len(_indexes) > _MAX_CACHED_INDEXES:
+        _indexes.popitem(last=False)
+    return index
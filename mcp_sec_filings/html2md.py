@@ -0,0 +1,232 @@
+import html.parser
+import re
+
+from mcp_sec_filings import constants
+
+_SKIP_TAGS = {"script", "style", "head", "title", "ix:header"}
+_VOID_TAGS = {"br", "hr", "img", "meta", "link", "input", "col", "area", "wbr"}
+_BLOCK_TAGS = {
+    "p",
+    "div",
+    "li",
+    "ul",
+    "ol",
+    "center",
+    "blockquote",
+    "section",
+    "article",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+}
+_HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+_PAGE_BREAK_BEFORE_RE = re.compile(r"page-break-before\s*:\s*always", re.IGNORECASE)
+_PAGE_BREAK_AFTER_RE = re.compile(r"page-break-after\s*:\s*always", re.IGNORECASE)
+_HIDDEN_RE = re.compile(r"display\s*:\s*none", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+# Filing section headers such as "Item 7." or "PART II" are usually styled
+# paragraphs rather than <h*> tags, so they are promoted to headings.
+SECTION_RE = re.compile(r"^(item\s+\d+[a-z]?\.|part\s+[ivx]+\b)", re.IGNORECASE)
+MAX_SECTION_HEADING_CHARS = 120
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text.replace("\xa0", " ")).strip()
+
+
+def _clean_row(cells: list[str]) -> list[str]:
+    """Drops spacer cells and glues the "$", ")" and "%" cells EDGAR splits out of numbers.
+
+    The leading label cell is kept even when empty, as it is in the header rows
+    of financial tables, so the year headers stay above their columns.
+    """
+    if not cells:
+        return []
+    cleaned: list[str] = [] if cells[0] else [""]
+    pending_prefix = ""
+    for cell in cells:
+        if not cell:
+            continue
+        if cell in {"$", "(", "$(", "($"}:
+            pending_prefix += cell
+            continue
+        if cell in {")", "%", ")%", "%)"} and cleaned and cleaned[-1]:
+            cleaned[-1] += cell
+            continue
+        cleaned.append(pending_prefix + cell)
+        pending_prefix = ""
+    if pending_prefix:
+        cleaned.append(pending_prefix)
+    return cleaned
+
+
+def _render_table(rows: list[list[str]]) -> list[str]:
+    rows = [row for row in (_clean_row(row) for row in rows) if any(row)]
+    if not rows:
+        return []
+    # Tables with one filled cell per row are layout wrappers around paragraphs,
+    # often behind an empty indent cell.
+    if all(sum(1 for cell in row if cell) == 1 for row in rows):
+        return [next(cell for cell in row if cell) for row in rows]
+    width = max(len(row) for row in rows)
+    rows = [
+        [cell.replace("|", "\\|") for cell in row] + [""] * (width - len(row))
+        for row in rows
+    ]
+    lines = ["| " + " | ".join(rows[0]) + " |", "|" + " --- |" * width]
+    lines.extend("| " + " | ".join(row) + " |" for row in rows[1:])
+    return ["\n".join(lines)]
+
+
+class HTMLToMarkdown(html.parser.HTMLParser):
+    """Incremental EDGAR HTML to Markdown converter.
+
+    Feed it the document in chunks with `feed`, then call `close` and read
+    `markdown()`. Pages are split on CSS page breaks and joined with
+    `constants.PAGE_BREAK`, like the VLM output of `pdf2md`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._pages: list[list[str]] = [[]]
+        self._text: list[str] = []
+        self._heading: int | None = None
+        self._stack: list[tuple[str, bool, bool]] = []
+        self._hidden_depth = 0
+        self._table_depth = 0
+        self._rows: list[list[str]] = []
+        self._row: list[str] | None = None
+        self._cell: list[str] | None = None
+        self.image_count = 0
+        self.text_chars = 0
+
+    def _flush_text(self) -> None:
+        text = _normalize("".join(self._text))
+        self._text = []
+        if not text:
+            return
+        self.text_chars += len(text)
+        if self._heading is not None:
+            text = f"{'#' * self._heading} {text}"
+        elif SECTION_RE.match(text) and len(text) <= MAX_SECTION_HEADING_CHARS:
+            text = f"## {text}"
+        self._pages[-1].append(text)
+
+    def _page_break(self) -> None:
+        self._flush_text()
+        if self._pages[-1]:
+            self._pages.append([])
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        style = dict(attrs).get("style") or ""
+        hidden = tag in _SKIP_TAGS or bool(_HIDDEN_RE.search(style))
+        break_after = bool(_PAGE_BREAK_AFTER_RE.search(style))
+
+        if not self._hidden_depth and _PAGE_BREAK_BEFORE_RE.search(style):
+            self._page_break()
+
+        if tag in _VOID_TAGS:
+            if self._hidden_depth:
+                return
+            if tag == "img":
+                self.image_count += 1
+            elif tag == "br":
+                (self._cell if self._cell is not None else self._text).append(" ")
+            if break_after:
+                self._page_break()
+            return
+
+        self._stack.append((tag, hidden, break_after))
+        if hidden:
+            self._hidden_depth += 1
+        if self._hidden_depth:
+            return
+
+        if tag == "table":
+            if self._table_depth == 0:
+                self._flush_text()
+                self._rows = []
+            self._table_depth += 1
+        elif self._table_depth == 1 and tag == "tr":
+            self._row = []
+        elif self._table_depth == 1 and tag in {"td", "th"}:
+            self._cell = []
+        elif self._table_depth == 0 and tag in _BLOCK_TAGS:
+            self._flush_text()
+            self._heading = _HEADING_TAGS.get(tag, self._heading)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _VOID_TAGS or not any(t == tag for t, _, _ in self._stack):
+            return
+        # Pop unclosed children too, EDGAR HTML is not always well formed.
+        while self._stack:
+            open_tag, hidden, break_after = self._stack.pop()
+            was_hidden = self._hidden_depth > 0
+            if hidden:
+                self._hidden_depth -= 1
+            if not was_hidden:
+                self._close(open_tag)
+                if break_after:
+                    self._page_break()
+            if open_tag == tag:
+                break
+
+    def _close(self, tag: str) -> None:
+        if tag == "table":
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                self._pages[-1].extend(_render_table(self._rows))
+                self._rows = []
+        elif self._table_depth == 1 and tag in {"td", "th"} and self._cell is not None:
+            if self._row is not None:
+                self._row.append(_normalize("".join(self._cell)))
+            self._cell = None
+        elif self._table_depth == 1 and tag == "tr" and self._row is not None:
+            self._rows.append(self._row)
+            self._row = None
+        elif self._table_depth == 0 and tag in _BLOCK_TAGS:
+            self._flush_text()
+            if tag in _HEADING_TAGS:
+                self._heading = None
+
+    def handle_data(self, data: str) -> None:
+        if self._hidden_depth:
+            return
+        if self._table_depth:
+            if self._cell is not None:
+                self._cell.append(data)
+                self.text_chars += len(data.strip())
+            return
+        self._text.append(data)
+
+    def close(self) -> None:
+        super().close()
+        self._flush_text()
+
+    def pages(self) -> list[str]:
+        pages = ["\n\n".join(blocks) for blocks in self._pages]
+        if len(pages) > 1 and not pages[-1]:
+            pages.pop()
+        return pages
+
+    def markdown(self) -> str:
+        return constants.PAGE_BREAK.join(self.pages())
+
+    @property
+    def is_image_only(self) -> bool:
+        """True for exhibits that are scans wrapped in HTML, which need the VLM path."""
+        return self.image_count > 0 and self.text_chars < constants.HTML_MIN_TEXT_CHARS
+
+
+def convert_html_file_to_markdown(html_path: str) -> HTMLToMarkdown:
+    """Streams `html_path` through the converter in fixed size chunks."""
+    converter = HTMLToMarkdown()
+    with open(html_path, "r", encoding="utf-8", errors="replace") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), ""):
+            converter.feed(chunk)
+    converter.close()
+    return converter
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import random
+import time
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from mcp_sec_filings import adaptive_limiter, constants, datamodels, metrics
+
+
+class RateLimiter:
+    """Token bucket shared by every request sent to SEC EDGAR."""
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+_client: httpx.AsyncClient | None = None
+_limiter: RateLimiter | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _default_headers() -> dict[str, str]:
+    request_settings = datamodels.RequestSettings()
+    return {"User-Agent": f"{request_settings.company_name} {request_settings.email}"}
+
+
+def get_client() -> tuple[httpx.AsyncClient, RateLimiter]:
+    """Returns the process wide EDGAR client and rate limiter for the running loop."""
+    global _client, _limiter, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        rate = float(
+            os.getenv(
+                "SEC_MAX_REQUESTS_PER_SECOND",
+                str(constants.SEC_MAX_REQUESTS_PER_SECOND),
+            )
+        )
+        _client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            headers=_default_headers(),
+            limits=httpx.Limits(
+                max_connections=20, max_keepalive_connections=10, keepalive_expiry=60
+            ),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+        _limiter = RateLimiter(rate=rate)
+        _client_loop = loop
+    assert _limiter is not None
+    return _client, _limiter
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    backoff = constants.SEC_BACKOFF_BASE_SECONDS * (2**attempt)
+    return backoff + random.uniform(0, backoff / 2)
+
+
+def resource_class(url: str) -> constants.ResourceClass:
+    """Filing documents under /Archives/ are downloads, everything else is metadata."""
+    return "edgar_archive" if "/Archives/" in url else "edgar_metadata"
+
+
+async def sec_get(
+    url: str, headers: dict[str, str] | None = None, **kwargs: Any
+) -> httpx.Response:
+    """GETs an EDGAR url through the shared client, retrying on 429/5xx and transport errors.
+
+    The last response is returned as is, callers are expected to `raise_for_status`.
+    Requests in flight are bounded by the adaptive limiter of their resource
+    class, which backs off on 429/5xx, transport errors and rising latency,
+    and every send takes a token of the shared rate limiter.
+    """
+    client, limiter = get_client()
+    concurrency = adaptive_limiter.get_limiter(resource_class(url))
+    max_retries = int(os.getenv("SEC_MAX_RETRIES", str(constants.SEC_MAX_RETRIES)))
+    attempt = 0
+    start = time.perf_counter()
+    while True:
+        try:
+            async with concurrency.slot() as slot:
+                # The token is taken once the slot is held, requests queued on
+                # slots would otherwise go out in a burst when slots free up.
+                await limiter.acquire()
+                slot.started = time.perf_counter()
+                response = await client.get(url, headers=headers, **kwargs)
+                slot.overloaded = (
+                    response.status_code in constants.SEC_RETRY_STATUS_CODES
+                )
+        except httpx.TransportError as e:
+            metrics.inc("sec_http_requests_total", status="transport_error")
+            if attempt >= max_retries:
+                raise
+            delay = _retry_delay(attempt, None)
+            logger.warning(f"Transport error for {url=}: {e}, retrying in {delay:.2f}s")
+        else:
+            metrics.inc("sec_http_requests_total", status=response.status_code)
+            metrics.inc("sec_http_bytes_total", len(response.content))
+            if (
+                response.status_code not in constants.SEC_RETRY_STATUS_CODES
+                or attempt >= max_retries
+            ):
+                metrics.observe("sec_http_request_seconds", time.perf_counter() - start)
+                return response
+            delay = _retry_delay(attempt, response)
+            logger.warning(
+                f"Got {response.status_code} for {url=}, retrying in {delay:.2f}s"
+            )
+        attempt += 1
+        metrics.inc("sec_http_retries_total")
+        await asyncio.sleep(delay)
+
+
+async def aclose_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import pathlib
+import uuid
+
+from loguru import logger
+
+from mcp_sec_filings import constants, datamodels, filing_store, pdf2md
+
+
+class MarkdownEngine:
+    """Resident markdown conversion service for the MCP server.
+
+    The inference backend is loaded once, on the first page that needs it or
+    when `warm` is called, and one page scheduler is shared by every job for
+    the life of the process. Jobs run in the background and are looked up by
+    the handle `submit` returns. A PDF is converted by one job at a time,
+    submitting it again while its job is queued or running returns that job.
+    """
+
+    def __init__(self, backend: constants.InferenceBackendName | None = None):
+        self.lazy_backend = pdf2md.LazyBackend(pdf2md.resolve_backend_name(backend))
+        self.jobs: dict[str, datamodels.ConversionJob] = {}
+        self._active: dict[str, datamodels.ConversionJob] = {}
+        self._page_scheduler = None
+        self._page_budget: pdf2md.PageBudget | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def _ensure_started(self):
+        if self._page_scheduler is None:
+            self._page_scheduler = pdf2md.build_page_scheduler(self.lazy_backend)
+            self._page_budget = pdf2md.PageBudget(
+                int(os.getenv("MAX_INFLIGHT_PAGES", str(constants.MAX_INFLIGHT_PAGES)))
+            )
+        self._page_scheduler.start()
+
+    async def warm(self):
+        """Loads the inference backend ahead of the first job."""
+        try:
+            await self.lazy_backend.load()
+        except Exception as e:
+            logger.error(
+                f"Failed to warm the {self.lazy_backend.backend_name} backend: {e}"
+            )
+
+    def submit(
+        self,
+        mcpresult_pdf_list: list[datamodels.MCPResultsPDF],
+        mode: constants.ConversionMode = "vlm",
+        resume: bool = True,
+    ) -> list[datamodels.ConversionJob]:
+        self._ensure_started()
+        jobs: list[datamodels.ConversionJob] = []
+        for mcpresult_pdf in mcpresult_pdf_list:
+            active = self._active.get(mcpresult_pdf.pdf_path)
+            if active is not None:
+                # The scheduler and the page checkpoint are keyed by the PDF path.
+                logger.info(
+                    f"{mcpresult_pdf.pdf_path} is already being converted by job {active.job_id}"
+                )
+                jobs.append(active)
+                continue
+            now = filing_store.now_isoformat()
+            job = datamodels.ConversionJob(
+                job_id=uuid.uuid4().hex,
+                pdf_path=mcpresult_pdf.pdf_path,
+                ticker=mcpresult_pdf.ticker,
+                filing_name=mcpresult_pdf.filing_name,
+                mode=mode,
+                status="queued",
+                md_path=str(pathlib.Path(mcpresult_pdf.pdf_path).with_suffix(".md")),
+                created_at=now,
+                updated_at=now,
+            )
+            self.jobs[job.job_id] = job
+            self._active[job.pdf_path] = job
+            task = asyncio.create_task(self._run(job, mcpresult_pdf, resume))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            jobs.append(job)
+        self._prune()
+        return jobs
+
+    def _prune(self):
+        # Finished jobs are forgotten oldest first once too many are tracked.
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status not in {"queued", "running"}
+        ]
+        excess = len(self.jobs) - constants.MAX_TRACKED_MARKDOWN_JOBS
+        for job_id in finished[: max(0, excess)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> datamodels.ConversionJob | None:
+        return self.jobs.get(job_id)
+
+    def _update(self, job: datamodels.ConversionJob, **fields):
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.updated_at = filing_store.now_isoformat()
+
+    async def _run(
+        self,
+        job: datamodels.ConversionJob,
+        mcpresult_pdf: datamodels.MCPResultsPDF,
+        resume: bool,
+    ):
+        self._update(job, status="running")
+        try:
+            if job.mode == "html":
+                try:
+                    if await pdf2md.convert_single_html_to_markdown(mcpresult_pdf):
+                        self._update(job, status="complete")
+                        return
+                except Exception as e:
+                    logger.error(
+                        f"HTML conversion failed for {job.pdf_path} with error {e}, using the VLM path"
+                    )
+            assert self._page_scheduler is not None and self._page_budget is not None
+            failed_pages = await pdf2md.convert_single_pdf_to_markdown(
+                self._page_scheduler,
+                self._page_budget,
+                mcpresult_pdf,
+                resume=resume,
+            )
+            self._update(
+                job,
+                status="partial" if failed_pages else "complete",
+                failed_pages=failed_pages,
+            )
+        except Exception as e:
+            logger.error(f"Markdown job {job.job_id} for {job.pdf_path} failed: {e}")
+            self._update(job, status="failed", error=str(e))
+        finally:
+            if self._active.get(job.pdf_path) is job:
+                del self._active[job.pdf_path]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._page_scheduler is not None:
+            await self._page_scheduler.close()
+
+
+_engine: MarkdownEngine | None = None
+
+
+def get_engine() -> MarkdownEngine:
+    global _engine
+    if _engine is None:
+        _engine = MarkdownEngine()
+    return _engine
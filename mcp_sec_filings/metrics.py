@@ -0,0 +1,237 @@
+import contextlib
+import math
+import os
+import threading
+import time
+from typing import Iterator
+
+from mcp_sec_filings import constants
+
+# Metrics are off unless METRICS_ENABLED=1, every recording function then
+# returns after a single global check.
+_enabled = os.getenv("METRICS_ENABLED", "0") == "1"
+_lock = threading.Lock()
+
+Labels = tuple[tuple[str, str], ...]
+
+_help: dict[str, tuple[str, str]] = {}
+_counters: dict[str, dict[Labels, float]] = {}
+_gauges: dict[str, dict[Labels, float]] = {}
+_histograms: dict[str, dict[Labels, "_Histogram"]] = {}
+_buckets: dict[str, tuple[float, ...]] = {}
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def describe(
+    name: str,
+    kind: str,
+    help_text: str,
+    buckets: tuple[float, ...] = constants.METRICS_LATENCY_BUCKETS,
+) -> None:
+    """Registers the HELP/TYPE lines of a metric, histograms also get their buckets."""
+    _help[name] = (kind, help_text)
+    if kind == "histogram":
+        _buckets[name] = buckets
+
+
+def _labels(labels: dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels: object) -> None:
+    if not _enabled:
+        return
+    key = _labels(labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels: object) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        _gauges.setdefault(name, {})[_labels(labels)] = value
+
+
+def observe(name: str, value: float, **labels: object) -> None:
+    if not _enabled:
+        return
+    buckets = _buckets.get(name, constants.METRICS_LATENCY_BUCKETS)
+    key = _labels(labels)
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = _Histogram(len(buckets))
+        for index, upper_bound in enumerate(buckets):
+            if value <= upper_bound:
+                histogram.counts[index] += 1
+                break
+        histogram.total += value
+        histogram.count += 1
+
+
+@contextlib.contextmanager
+def span(name: str, **labels: object) -> Iterator[None]:
+    """Times the block into the `<name>_seconds` histogram, labelled with the outcome."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        observe(
+            f"{name}_seconds", time.perf_counter() - start, outcome=outcome, **labels
+        )
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_prometheus() -> str:
+    """Renders every recorded metric in the Prometheus text exposition format."""
+    lines: list[str] = []
+    with _lock:
+        families = [
+            ("counter", _counters),
+            ("gauge", _gauges),
+        ]
+        for kind, metrics in families:
+            for name in sorted(metrics):
+                _, help_text = _help.get(name, (kind, name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(metrics[name].items()):
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    )
+        for name in sorted(_histograms):
+            _, help_text = _help.get(name, ("histogram", name))
+            buckets = _buckets.get(name, constants.METRICS_LATENCY_BUCKETS)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(_histograms[name].items()):
+                cumulative = 0
+                for upper_bound, bucket_count in zip(buckets, histogram.counts):
+                    cumulative += bucket_count
+                    le = ("le", _format_value(upper_bound))
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, le)} {cumulative}"
+                    )
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}"
+                )
+                lines.append(
+                    f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}"
+                )
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+describe("sec_http_requests_total", "counter", "EDGAR GET requests by status code.")
+describe("sec_http_retries_total", "counter", "EDGAR GET requests that were retried.")
+describe("sec_http_bytes_total", "counter", "Response bytes downloaded from EDGAR.")
+describe(
+    "sec_http_request_seconds", "histogram", "EDGAR GET latency, retries included."
+)
+describe(
+    "sec_submissions_cache_total",
+    "counter",
+    "Submissions lookups by result: fresh, revalidated or fetched.",
+)
+describe("sec_cik_lookup_seconds", "histogram", "Ticker to CIK lookup latency.")
+describe(
+    "sec_submissions_fetch_seconds", "histogram", "Submissions document fetch latency."
+)
+describe("sec_html_download_seconds", "histogram", "Filing HTML download latency.")
+describe("sec_render_seconds", "histogram", "wkhtmltopdf render latency per filing.")
+describe("sec_filings_stored_total", "counter", "Filings stored by status.")
+describe(
+    "pdf2md_rasterize_seconds", "histogram", "Rasterization latency per chunk of pages."
+)
+describe(
+    "pdf2md_text_layer_seconds", "histogram", "Text layer routing latency per document."
+)
+describe(
+    "pdf2md_document_seconds",
+    "histogram",
+    "End to end markdown conversion latency per document.",
+)
+describe("pdf2md_pages_total", "counter", "Converted pages by route and outcome.")
+describe(
+    "pdf2md_pages_per_second",
+    "gauge",
+    "Pages per second of the last converted document.",
+)
+describe("pdf2md_queue_depth", "gauge", "Pages waiting in the page scheduler.")
+describe("pdf2md_inflight_pages", "gauge", "Pages being generated right now.")
+describe("pdf2md_page_cache_total", "counter", "Page cache lookups by result.")
+describe(
+    "inference_generate_seconds",
+    "histogram",
+    "Doctags generation latency per page, or per batch for batching backends.",
+)
+describe(
+    "inference_generated_tokens",
+    "histogram",
+    "Generated tokens per page.",
+    buckets=constants.METRICS_TOKEN_BUCKETS,
+)
+describe(
+    "adaptive_concurrency_limit",
+    "gauge",
+    "Current adaptive concurrency limit by resource class.",
+)
+describe(
+    "adaptive_concurrency_inflight",
+    "gauge",
+    "Work holding an adaptive concurrency slot by resource class.",
+)
+describe(
+    "adaptive_concurrency_decreases_total",
+    "counter",
+    "Adaptive concurrency limit cuts by resource class and reason.",
+)
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import os
+import pathlib
+import threading
+
+from loguru import logger
+from PIL import Image
+
+from mcp_sec_filings import constants, metrics, scheduler
+
+
+def page_cache_key(image: Image.Image, model_name: str, prompt: str) -> str:
+    """Hashes a page image normalized to a fixed width and grayscale, plus the model and prompt.
+
+    Normalizing makes the key independent of the rasterization DPI, and dropping
+    the low bits of every pixel absorbs tiny anti-aliasing differences.
+    """
+    width = constants.PAGE_CACHE_NORMALIZED_WIDTH
+    height = max(1, round(image.height * width / image.width))
+    normalized = image.convert("L").resize((width, height), Image.Resampling.BILINEAR)
+    normalized = normalized.point(lambda value: value & 0xF0)
+
+    digest = hashlib.sha256()
+    digest.update(f"{model_name}\0{prompt}\0{width}x{height}\0".encode("utf-8"))
+    digest.update(normalized.tobytes())
+    return digest.hexdigest()
+
+
+class PageCache:
+    """On-disk page markdown cache with LRU eviction by access time."""
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / key[:2] / f"{key}.md"
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.directory.glob("*/*.md"))
+        return self._size
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            md = path.read_text(encoding="utf-8")
+            # The mtime doubles as the last access time for eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return md
+
+    def put(self, key: str, md: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = md.encode("utf-8")
+        with self._lock:
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._size = self._current_size() + len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(
+            (p.stat().st_mtime, p.stat().st_size, p)
+            for p in self.directory.glob("*/*.md")
+        )
+        size = sum(entry_size for _, entry_size, _ in entries)
+        # Evict down to 90% so a full cache is not rescanned on every put.
+        target = int(self.max_bytes * 0.9)
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+        self._size = size
+        logger.debug(f"Evicted page cache down to {size} bytes")
+
+
+def cached_converter(
+    convert_page: scheduler.PageConverter,
+    cache: PageCache,
+    model_name: str = constants.DOCLING_MODEL_NAME,
+    prompt: str = constants.CHAT_TEMPLATE,
+) -> scheduler.PageConverter:
+    """Wraps a page converter so cache hits skip inference entirely."""
+
+    async def convert(image: Image.Image) -> str | None:
+        key = await asyncio.to_thread(page_cache_key, image, model_name, prompt)
+        md = await asyncio.to_thread(cache.get, key)
+        if md is not None:
+            metrics.inc("pdf2md_page_cache_total", result="hit")
+            return md
+        metrics.inc("pdf2md_page_cache_total", result="miss")
+        md = await convert_page(image)
+        if md is not None:
+            await asyncio.to_thread(cache.put, key, md)
+        return md
+
+    return convert
+
+
+def get_page_cache() -> PageCache | None:
+    """Returns the configured page cache, or None when PAGE_CACHE_MAX_BYTES is 0."""
+    max_bytes = int(
+        os.getenv("PAGE_CACHE_MAX_BYTES", str(constants.PAGE_CACHE_MAX_BYTES))
+    )
+    if max_bytes <= 0:
+        return None
+    return PageCache(constants.PAGE_CACHE_DIR, max_bytes)
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import pathlib
+
+from loguru import logger
+
+from mcp_sec_filings import constants
+
+
+class PageCheckpoint:
+    """Append-only sidecar of per-page conversion results for one PDF.
+
+    Every finished page is appended as one JSON line as soon as it is produced,
+    so an interrupted conversion can resume with only the missing or failed
+    pages. When a page appears more than once the last record wins. Records
+    are written and fsynced by one background task off the event loop, `flush`
+    waits for the ones appended so far.
+    """
+
+    def __init__(self, pdf_path: str) -> None:
+        self.path = pathlib.Path(pdf_path).with_suffix(constants.PAGE_CHECKPOINT_SUFFIX)
+        self._lines: list[str] = []
+        self._writer: asyncio.Task[None] | None = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> dict[int, str | None]:
+        """Returns page number -> markdown, with None for pages that failed."""
+        pages: dict[int, str | None] = {}
+        if not self.path.exists():
+            return pages
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write, that page is redone.
+                    logger.warning(f"Skipping corrupt checkpoint line in {self.path}")
+                    continue
+                pages[int(record["page"])] = record["markdown"]
+        return pages
+
+    def append(self, page_number: int, markdown: str | None) -> None:
+        self._lines.append(json.dumps({"page": page_number, "markdown": markdown}))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._drain())
+
+    async def flush(self) -> None:
+        if self._writer is not None:
+            await self._writer
+
+    async def _drain(self) -> None:
+        # Pages produced while a write is running go out together in the next one.
+        while self._lines:
+            lines, self._lines = self._lines, []
+            await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def remove(self) -> None:
+        await self.flush()
+        self.path.unlink(missing_ok=True)
@@ -1,41 +1,302 @@
 import os
 import asyncio
-import pdf2image
+import contextlib
+import json
 import pathlib
+import time
+import typing
+from typing import AsyncIterator
 from loguru import logger
-from vllm import AsyncLLMEngine, SamplingParams
-from mcp_sec_filings import constants, datamodels, docling_vllm
+from PIL import Image
+from mcp_sec_filings import adaptive_limiter, constants, datamodels, docling_vllm, filing_ranges, filing_store, html2md, http_client, metrics, page_cache, page_checkpoint, scheduler, text_layer
 
-async def convert_single_pdf_to_markdown(semaphore: asyncio.Semaphore, mcpresult_pdf: datamodels.MCPResultsPDF, llm: AsyncLLMEngine, sampling_params: SamplingParams):
-    images = pdf2image.convert_from_path(mcpresult_pdf.pdf_path)
-    tasks = [
-        docling_vllm.convert_single_image_to_md(semaphore, llm, sampling_params, image)
-        for image in images
-    ]
-    md_list = await asyncio.gather(*tasks, return_exceptions=True)
-    md_ist_str: list[str] = []
-    for ml in md_list:
-        if isinstance(ml, Exception):
-            logger.error(f"Failed to convert {mcpresult_pdf.model_dump()} with error {ml}")
+class PageBudget:
+    """Caps how many rasterized pages are alive at once across every document."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, pages: int):
+        # Whole chunks are reserved under a lock so two documents can never
+        # each hold half of the budget and wait on one another.
+        async with self._lock:
+            acquired = 0
+            try:
+                for _ in range(min(pages, self.limit)):
+                    await self._semaphore.acquire()
+                    acquired += 1
+            except BaseException:
+                # A cancelled reservation gives back the part it already holds.
+                for _ in range(acquired):
+                    self._semaphore.release()
+                raise
+
+    def release(self):
+        self._semaphore.release()
+
+async def get_page_count(pdf_path: str) -> int:
+    import pdf2image
+
+    info = await asyncio.to_thread(pdf2image.pdfinfo_from_path, pdf_path)
+    return int(info["Pages"])
+
+def _page_chunks(page_numbers: list[int], chunk_pages: int) -> list[tuple[int, int]]:
+    """Groups sorted page numbers into (first_page, last_page) runs of at most `chunk_pages`."""
+    chunks: list[tuple[int, int]] = []
+    for page_number in page_numbers:
+        if chunks and page_number == chunks[-1][1] + 1 and page_number - chunks[-1][0] < chunk_pages:
+            chunks[-1] = (chunks[-1][0], page_number)
         else:
-            md_ist_str.append(ml)
-    concatenated_md = constants.PAGE_BREAK.join(md_list)
-    pdf_path = pathlib.Path(mcpresult_pdf.pdf_path)
-    md_path = pdf_path.with_suffix(".md")
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(concatenated_md)
-        logger.info(f"Saved markdown for {mcpresult_pdf.model_dump()} at {f.name}")
-
-async def convert_pdf_list_to_markdown(semaphore: asyncio.Semaphore, mcpresult_pdf_list: list[datamodels.MCPResultsPDF], llm: AsyncLLMEngine, sampling_params: SamplingParams):
+            chunks.append((page_number, page_number))
+    return chunks
+
+async def rasterize_pages(pdf_path: str, page_numbers: list[int], page_budget: PageBudget) -> AsyncIterator[tuple[int, Image.Image]]:
+    """Yields (page_number, image) pairs for `page_numbers`, rasterizing `RASTER_CHUNK_PAGES` pages at a time.
+
+    Every yielded image holds one unit of `page_budget` that the consumer must release.
+    Units of pages that were never yielded, because rasterizing failed or the
+    generator was closed early, are released here and their images closed.
+    """
+    import pdf2image
+
+    dpi = int(os.getenv("RASTER_DPI", str(constants.RASTER_DPI)))
+    thread_count = int(os.getenv("RASTER_THREADS", str(constants.RASTER_THREADS)))
+    chunk_pages = min(int(os.getenv("RASTER_CHUNK_PAGES", str(constants.RASTER_CHUNK_PAGES))), page_budget.limit)
+
+    for first_page, last_page in _page_chunks(sorted(page_numbers), chunk_pages):
+        reserved = min(last_page - first_page + 1, page_budget.limit)
+        await page_budget.acquire(reserved)
+        images: list[Image.Image] = []
+        yielded = 0
+        try:
+            with metrics.span("pdf2md_rasterize"):
+                images = await asyncio.to_thread(
+                    pdf2image.convert_from_path,
+                    pdf_path,
+                    dpi=dpi,
+                    first_page=first_page,
+                    last_page=last_page,
+                    thread_count=thread_count,
+                )
+            for offset, image in enumerate(images):
+                yielded += 1
+                yield first_page + offset, image
+        finally:
+            for image in images[yielded:]:
+                image.close()
+            for _ in range(max(0, reserved - yielded)):
+                page_budget.release()
+
+def save_page_routes(pdf_path: str, routes: list[text_layer.PageRoute]):
+    """Records why every page went to the text layer or the VLM next to the PDF."""
+    routes_path = pathlib.Path(pdf_path).with_suffix(constants.PAGE_ROUTES_SUFFIX)
+    report: dict[str, dict] = {}
+    if routes_path.exists():
+        with open(routes_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    for page_route in routes:
+        report[str(page_route.page_number)] = {
+            "route": page_route.route,
+            "reason": page_route.reason,
+            "char_count": page_route.char_count,
+            "image_coverage": round(page_route.image_coverage, 3),
+        }
+    filing_store.atomic_write_text(str(routes_path), json.dumps(report, indent=4))
+
+async def convert_single_pdf_to_markdown(page_scheduler: scheduler.PageScheduler, page_budget: PageBudget, mcpresult_pdf: datamodels.MCPResultsPDF, resume: bool = True, use_text_layer: bool = True) -> list[int]:
+    """Converts one PDF to markdown next to it and returns the page numbers that failed."""
+    document_id = mcpresult_pdf.pdf_path
+    md_path = pathlib.Path(mcpresult_pdf.pdf_path).with_suffix(".md")
+    checkpoint = page_checkpoint.PageCheckpoint(mcpresult_pdf.pdf_path)
+    if resume and md_path.exists() and not checkpoint.exists():
+        logger.info(f"Skipping {mcpresult_pdf.pdf_path}, already converted at {md_path}")
+        return []
+    if not resume:
+        await checkpoint.remove()
+
+    start = time.perf_counter()
+    md_pages = {page_number: md for page_number, md in checkpoint.load().items() if md is not None}
+    page_count = await get_page_count(mcpresult_pdf.pdf_path)
+    pending_pages = [page_number for page_number in range(1, page_count + 1) if page_number not in md_pages]
+    if md_pages:
+        logger.info(f"Resuming {mcpresult_pdf.pdf_path} with {len(pending_pages)}/{page_count} pages left")
+
+    if use_text_layer and pending_pages:
+        with metrics.span("pdf2md_text_layer"):
+            routes = await asyncio.to_thread(text_layer.route_pages, mcpresult_pdf.pdf_path, pending_pages)
+        for page_route in routes:
+            if page_route.route == "text":
+                metrics.inc("pdf2md_pages_total", route="text", outcome="ok")
+                md_pages[page_route.page_number] = page_route.markdown or ""
+                checkpoint.append(page_route.page_number, page_route.markdown or "")
+        pending_pages = [page_route.page_number for page_route in routes if page_route.route == "vlm"]
+        save_page_routes(mcpresult_pdf.pdf_path, routes)
+        logger.info(f"Routed {len(routes) - len(pending_pages)} pages of {mcpresult_pdf.pdf_path} to the text layer and {len(pending_pages)} to the VLM")
+
+    if pending_pages:
+        done = page_scheduler.add_document(document_id, len(pending_pages), on_page=checkpoint.append)
+        try:
+            async with contextlib.aclosing(rasterize_pages(mcpresult_pdf.pdf_path, pending_pages, page_budget)) as pages:
+                async for page_number, image in pages:
+                    try:
+                        await page_scheduler.submit_page(document_id, page_number, image, release=page_budget.release)
+                    except BaseException:
+                        # The scheduler never took the page, so its image and budget unit are still ours.
+                        image.close()
+                        page_budget.release()
+                        raise
+        except BaseException as e:
+            page_scheduler.fail_document(document_id, e)
+            # Nobody awaits the document any more, the error is raised below.
+            done.add_done_callback(lambda future: future.cancelled() or future.exception())
+            raise
+        page_scheduler.seal_document(document_id)
+        vlm_pages = await done
+        md_pages.update(vlm_pages)
+        for md in vlm_pages.values():
+            metrics.inc("pdf2md_pages_total", route="vlm", outcome="ok" if md is not None else "failed")
+
+    # Every page result is on disk before the markdown that is built from them.
+    await checkpoint.flush()
+    failed_pages = [page_number for page_number in range(1, page_count + 1) if md_pages.get(page_number) is None]
+    concatenated_md = constants.PAGE_BREAK.join(md_pages.get(page_number) or "" for page_number in range(1, page_count + 1))
+    filing_store.atomic_write_text(str(md_path), concatenated_md)
+    filing_ranges.save_offset_table(str(md_path), concatenated_md)
+    elapsed = time.perf_counter() - start
+    metrics.observe("pdf2md_document_seconds", elapsed, outcome="partial" if failed_pages else "ok")
+    if pending_pages and elapsed > 0:
+        metrics.set_gauge("pdf2md_pages_per_second", len(pending_pages) / elapsed)
+    if failed_pages:
+        # The checkpoint is kept so the next resume only retries these pages.
+        logger.error(f"Failed to convert pages {failed_pages} of {mcpresult_pdf.model_dump()}, saved partial markdown at {md_path}")
+    else:
+        await checkpoint.remove()
+        logger.info(f"Saved markdown for {mcpresult_pdf.model_dump()} at {md_path}")
+    return failed_pages
+
+async def convert_pdf_list_to_markdown(page_scheduler: scheduler.PageScheduler, mcpresult_pdf_list: list[datamodels.MCPResultsPDF], resume: bool = True, use_text_layer: bool = True):
+    page_budget = PageBudget(int(os.getenv("MAX_INFLIGHT_PAGES", str(constants.MAX_INFLIGHT_PAGES))))
     tasks = [
-        convert_single_pdf_to_markdown(semaphore, mcpresult_pdf, llm, sampling_params)
+        convert_single_pdf_to_markdown(page_scheduler, page_budget, mcpresult_pdf, resume=resume, use_text_layer=use_text_layer)
         for mcpresult_pdf in mcpresult_pdf_list
     ]
-    return asyncio.gather(*tasks, return_exceptions=True)
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+async def convert_single_html_to_markdown(mcpresult_pdf: datamodels.MCPResultsPDF) -> bool:
+    """Converts the stored filing HTML straight to markdown.
+
+    Returns False when the filing is image-only and has to go through the VLM path.
+    """
+    html_path = filing_store.html_path_for(mcpresult_pdf.pdf_path)
+    if not os.path.exists(html_path):
+        response = await http_client.sec_get(mcpresult_pdf.html_url)
+        response.raise_for_status()
+        await asyncio.to_thread(filing_store.atomic_write_bytes, html_path, response.content)
+
+    converter = await asyncio.to_thread(html2md.convert_html_file_to_markdown, html_path)
+    if converter.is_image_only:
+        logger.info(f"{mcpresult_pdf.pdf_path} is image-only, using the VLM path")
+        return False
+    md_path = pathlib.Path(mcpresult_pdf.pdf_path).with_suffix(".md")
+    markdown = converter.markdown()
+    filing_store.atomic_write_text(str(md_path), markdown)
+    filing_ranges.save_offset_table(str(md_path), markdown)
+    logger.info(f"Saved markdown for {mcpresult_pdf.model_dump()} at {md_path}")
+    return True
+
+class LazyBackend:
+    """Loads the inference backend once, on first use or when warmed, and keeps it resident."""
+
+    def __init__(self, backend_name: constants.InferenceBackendName):
+        self.backend_name = backend_name
+        self.backend: docling_vllm.InferenceBackend | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.backend is not None
+
+    async def load(self) -> docling_vllm.InferenceBackend:
+        if self.backend is None:
+            async with self._lock:
+                if self.backend is None:
+                    logger.info(f"Loading the {self.backend_name} inference backend")
+                    # Model loading blocks for a long time, keep the event loop responsive.
+                    self.backend = await asyncio.to_thread(docling_vllm.load_backend, self.backend_name)
+        return self.backend
+
+    async def convert(self, image: Image.Image) -> str | None:
+        backend = await self.load()
+        return await docling_vllm.convert_single_image_to_md(backend, image)
+
+def resolve_backend_name(backend: constants.InferenceBackendName | None = None) -> constants.InferenceBackendName:
+    """Returns `backend` or the INFERENCE_BACKEND env var, rejecting unknown names before vLLM gets loaded by default."""
+    name = backend or os.getenv("INFERENCE_BACKEND", "vllm")
+    known = typing.get_args(constants.InferenceBackendName)
+    if name not in known:
+        raise ValueError(f"Unknown inference backend {name!r}, expected one of {known}")
+    return typing.cast(constants.InferenceBackendName, name)
+
+def inference_limiter(backend: constants.InferenceBackendName) -> adaptive_limiter.AdaptiveLimiter:
+    if backend == "transformers":
+        # Keep enough pages in flight for the backend to fill a batch.
+        batch_size = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", str(constants.INFERENCE_MAX_BATCH_SIZE)))
+        _, ceiling, initial = constants.ADAPTIVE_LIMITS["inference"]
+        return adaptive_limiter.get_limiter("inference", floor=batch_size, ceiling=max(ceiling, batch_size), initial=batch_size)
+    return adaptive_limiter.get_limiter("inference")
+
+def limited_converter(lazy_backend: LazyBackend) -> scheduler.PageConverter:
+    """Gates generation on the adaptive "inference" limiter, failed pages count as overload."""
+    limiter = inference_limiter(lazy_backend.backend_name)
+
+    async def convert(image: Image.Image) -> str | None:
+        # Loading the model would read as one very slow page, so it happens outside the slot.
+        await lazy_backend.load()
+        async with limiter.slot() as slot:
+            md = await lazy_backend.convert(image)
+            slot.overloaded = md is None
+        return md
+
+    return convert
+
+def build_page_scheduler(lazy_backend: LazyBackend) -> scheduler.PageScheduler:
+    backend = lazy_backend.backend_name
+    convert_page = limited_converter(lazy_backend)
+    cache = page_cache.get_page_cache()
+    if cache is not None:
+        # Quantized or CPU backends can emit slightly different doctags, so they get their own entries.
+        model_name = constants.DOCLING_MODEL_NAME if backend == "vllm" else f"{constants.DOCLING_MODEL_NAME}:{backend}"
+        # Cache hits skip the limiter, they would skew its latency baseline.
+        convert_page = page_cache.cached_converter(convert_page, cache, model_name=model_name)
+    limiter = inference_limiter(backend)
+    return scheduler.PageScheduler(
+        convert_page=convert_page,
+        # One worker per slot the limiter can grant, but pages only leave the
+        # priority queue while the limiter's current limit has room for them.
+        max_inflight=limiter.ceiling,
+        max_queued=int(os.getenv("MAX_INFLIGHT_PAGES", str(constants.MAX_INFLIGHT_PAGES))),
+        capacity=lambda: limiter.current_limit,
+    )
+
+async def pdf2md_main(mcpresult_pdf_list: list[datamodels.MCPResultsPDF], mode: constants.ConversionMode = "vlm", resume: bool = True, use_text_layer: bool = True, backend: constants.InferenceBackendName | None = None):
+    if mode == "html":
+        converted = await asyncio.gather(
+            *(convert_single_html_to_markdown(mcpresult_pdf) for mcpresult_pdf in mcpresult_pdf_list),
+            return_exceptions=True,
+        )
+        vlm_pdf_list: list[datamodels.MCPResultsPDF] = []
+        for mcpresult_pdf, result in zip(mcpresult_pdf_list, converted, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(f"HTML conversion failed for {mcpresult_pdf.model_dump()} with error {result}, using the VLM path")
+            if result is not True:
+                vlm_pdf_list.append(mcpresult_pdf)
+        mcpresult_pdf_list = vlm_pdf_list
+        if not mcpresult_pdf_list:
+            return []
 
-async def pdf2md_main(mcpresult_pdf_list: list[datamodels.MCPResultsPDF]):
-    max_concurrency = int(os.getenv("MAX_CONCURRENCY", "2"))
-    semaphore = asyncio.Semaphore(max_concurrency)
-    llm, sampling_params = docling_vllm.load_vllm_model()
-    return await convert_pdf_list_to_markdown(semaphore, mcpresult_pdf_list, llm, sampling_params)
+    page_scheduler = build_page_scheduler(LazyBackend(resolve_backend_name(backend)))
+    async with page_scheduler:
+        return await convert_pdf_list_to_markdown(page_scheduler, mcpresult_pdf_list, resume=resume, use_text_layer=use_text_layer)
 
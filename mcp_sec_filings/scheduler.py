@@ -0,0 +1,219 @@
+import asyncio
+import dataclasses
+import itertools
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+from PIL import Image
+
+from mcp_sec_filings import metrics
+
+PageConverter = Callable[[Image.Image], Awaitable[str | None]]
+DocumentCallback = Callable[[str, dict[int, str | None]], Any]
+PageCallback = Callable[[int, str | None], Any]
+
+
+@dataclasses.dataclass(order=True)
+class PageJob:
+    priority: tuple[int, int]
+    document_id: str = dataclasses.field(compare=False)
+    page_number: int = dataclasses.field(compare=False)
+    image: Image.Image = dataclasses.field(compare=False)
+    release: Callable[[], None] | None = dataclasses.field(default=None, compare=False)
+
+
+@dataclasses.dataclass
+class _DocumentState:
+    page_count: int
+    done: asyncio.Future[dict[int, str | None]]
+    on_complete: DocumentCallback | None
+    on_page: PageCallback | None
+    results: dict[int, str | None] = dataclasses.field(default_factory=dict)
+    submitted: int = 0
+    sealed: bool = False
+
+
+class PageScheduler:
+    """One bounded queue of page jobs shared by every document being converted.
+
+    Pages of shorter documents are served first (ties in submission order), so
+    short filings finish early instead of waiting behind a 10-K. At most
+    `max_inflight` pages are handed to `convert_page` at a time and at most
+    `max_queued` wait in the queue, so producers block once it is full.
+    `capacity`, when set, lowers the pages in flight to its current value, so
+    pages are only taken off the queue once they can start converting and
+    priority still applies to the ones left behind.
+    """
+
+    def __init__(
+        self,
+        convert_page: PageConverter,
+        max_inflight: int,
+        max_queued: int,
+        capacity: Callable[[], int] | None = None,
+    ) -> None:
+        self.convert_page = convert_page
+        self.max_inflight = max_inflight
+        self.capacity = capacity
+        self._capacity_changed = asyncio.Condition()
+        self._admitted = 0
+        self._queue: asyncio.PriorityQueue[PageJob] = asyncio.PriorityQueue()
+        # Queue slots are handed out by a semaphore rather than the queue's own
+        # maxsize so that blocked producers are admitted in arrival order and
+        # one long document cannot starve the others.
+        self._slots = asyncio.Semaphore(max_queued)
+        self._documents: dict[str, _DocumentState] = {}
+        self._sequence = itertools.count()
+        self._workers: list[asyncio.Task[None]] = []
+        self.inflight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def __aenter__(self) -> "PageScheduler":
+        self.start()
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.max_inflight)
+            ]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def add_document(
+        self,
+        document_id: str,
+        page_count: int,
+        on_complete: DocumentCallback | None = None,
+        on_page: PageCallback | None = None,
+    ) -> asyncio.Future[dict[int, str | None]]:
+        """Registers a document and returns a future resolving to its page number -> markdown map.
+
+        `on_page` is called with every page result as soon as it is produced.
+        A document id can only be registered again once its document completed
+        or failed.
+        """
+        if document_id in self._documents:
+            raise ValueError(f"Document {document_id} is already being converted")
+        state = _DocumentState(
+            page_count=page_count,
+            done=asyncio.get_running_loop().create_future(),
+            on_complete=on_complete,
+            on_page=on_page,
+        )
+        self._documents[document_id] = state
+        return state.done
+
+    async def submit_page(
+        self,
+        document_id: str,
+        page_number: int,
+        image: Image.Image,
+        release: Callable[[], None] | None = None,
+    ) -> None:
+        """Queues a page, waiting while the queue is full."""
+        state = self._documents[document_id]
+        state.submitted += 1
+        await self._slots.acquire()
+        self._queue.put_nowait(
+            PageJob(
+                priority=(state.page_count, next(self._sequence)),
+                document_id=document_id,
+                page_number=page_number,
+                image=image,
+                release=release,
+            )
+        )
+        metrics.set_gauge("pdf2md_queue_depth", self.queue_depth)
+
+    def seal_document(self, document_id: str) -> None:
+        """Marks that every page of the document was submitted."""
+        state = self._documents[document_id]
+        state.sealed = True
+        self._maybe_complete(document_id, state)
+
+    def fail_document(self, document_id: str, exc: BaseException) -> None:
+        state = self._documents.pop(document_id, None)
+        if state is None or state.done.done():
+            return
+        if isinstance(exc, asyncio.CancelledError):
+            state.done.cancel()
+        else:
+            state.done.set_exception(exc)
+
+    def _maybe_complete(self, document_id: str, state: _DocumentState) -> None:
+        if not state.sealed or len(state.results) < state.submitted:
+            return
+        del self._documents[document_id]
+        if not state.done.done():
+            state.done.set_result(state.results)
+        if state.on_complete is not None:
+            try:
+                callback_result = state.on_complete(document_id, state.results)
+                if asyncio.iscoroutine(callback_result):
+                    asyncio.ensure_future(callback_result)
+            except Exception as e:
+                logger.error(f"Completion callback failed for {document_id=}: {e}")
+
+    async def _admit(self) -> None:
+        if self.capacity is not None:
+            async with self._capacity_changed:
+                await self._capacity_changed.wait_for(
+                    lambda: self._admitted < self.capacity()
+                )
+        self._admitted += 1
+
+    async def _finish(self) -> None:
+        self._admitted -= 1
+        if self.capacity is not None:
+            async with self._capacity_changed:
+                self._capacity_changed.notify_all()
+
+    async def _worker(self) -> None:
+        while True:
+            await self._admit()
+            try:
+                job = await self._queue.get()
+            except asyncio.CancelledError:
+                self._admitted -= 1
+                raise
+            self._slots.release()
+            self.inflight += 1
+            metrics.set_gauge("pdf2md_queue_depth", self.queue_depth)
+            metrics.set_gauge("pdf2md_inflight_pages", self.inflight)
+            try:
+                md = await self.convert_page(job.image)
+            except Exception as e:
+                logger.error(
+                    f"Failed to convert page {job.page_number} of {job.document_id}: {e}"
+                )
+                md = None
+            finally:
+                self.inflight -= 1
+                metrics.set_gauge("pdf2md_inflight_pages", self.inflight)
+                job.image.close()
+                if job.release is not None:
+                    job.release()
+                self._queue.task_done()
+            await self._finish()
+
+            state = self._documents.get(job.document_id)
+            if state is None:
+                continue
+            state.results[job.page_number] = md
+            if state.on_page is not None:
+                try:
+                    state.on_page(job.page_number, md)
+                except Exception as e:
+                    logger.error(f"Page callback failed for {job.document_id}: {e}")
+            self._maybe_complete(job.document_id, state)
@@ -0,0 +1,229 @@
+import contextlib
+import dataclasses
+import os
+import pathlib
+import sqlite3
+from typing import Iterator
+
+from loguru import logger
+
+from mcp_sec_filings import catalog, constants, datamodels, html2md
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    md_path TEXT PRIMARY KEY,
+    pdf_path TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    form TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    accession_num TEXT NOT NULL,
+    filing_name TEXT NOT NULL,
+    md_mtime REAL NOT NULL,
+    md_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_ticker_form_year ON documents (ticker, form, year);
+CREATE TABLE IF NOT EXISTS chunk_meta (
+    chunk_id INTEGER PRIMARY KEY,
+    md_path TEXT NOT NULL,
+    page INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunk_meta_md_path ON chunk_meta (md_path);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+    section, text, tokenize = 'porter unicode61'
+);
+"""
+
+# Matches in section headings count twice as much as matches in body text.
+_BM25_WEIGHTS = (2.0, 1.0)
+
+
+@dataclasses.dataclass
+class Chunk:
+    page: int
+    section: str
+    text: str
+
+
+def _section_heading(line: str) -> str | None:
+    text = line.strip().lstrip("#").strip().strip("*_").strip()
+    if (
+        html2md.SECTION_RE.match(text)
+        and len(text) <= html2md.MAX_SECTION_HEADING_CHARS
+    ):
+        return text
+    return None
+
+
+def chunk_markdown(md: str) -> list[Chunk]:
+    """Splits converted markdown on `PAGE_BREAK` and on Item/Part headings.
+
+    The current section carries over page breaks, so a chunk at the top of a
+    page still knows which Item it belongs to.
+    """
+    chunks: list[Chunk] = []
+    section = ""
+    for page_number, page in enumerate(md.split(constants.PAGE_BREAK), start=1):
+        lines: list[str] = []
+
+        def flush() -> None:
+            text = "\n".join(lines).strip()
+            if text:
+                chunks.append(Chunk(page=page_number, section=section, text=text))
+            lines.clear()
+
+        for line in page.splitlines():
+            heading = _section_heading(line)
+            if heading is not None:
+                flush()
+                section = heading
+            lines.append(line)
+        flush()
+    return chunks
+
+
+@contextlib.contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    os.makedirs(os.path.dirname(constants.SEARCH_INDEX_PATH), exist_ok=True)
+    conn = sqlite3.connect(constants.SEARCH_INDEX_PATH, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _remove_document(conn: sqlite3.Connection, md_path: str) -> None:
+    conn.execute(
+        "DELETE FROM chunks WHERE rowid IN (SELECT chunk_id FROM chunk_meta WHERE md_path = ?)",
+        (md_path,),
+    )
+    conn.execute("DELETE FROM chunk_meta WHERE md_path = ?", (md_path,))
+    conn.execute("DELETE FROM documents WHERE md_path = ?", (md_path,))
+
+
+def _index_document(
+    conn: sqlite3.Connection,
+    mcp_result: datamodels.MCPResultsPDF,
+    form: str,
+    year: int,
+    md_path: pathlib.Path,
+) -> int:
+    stat = md_path.stat()
+    md = md_path.read_text(encoding="utf-8", errors="replace")
+    _remove_document(conn, str(md_path))
+    conn.execute(
+        "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            str(md_path),
+            mcp_result.pdf_path,
+            mcp_result.ticker,
+            form,
+            year,
+            mcp_result.accession_num,
+            mcp_result.filing_name,
+            stat.st_mtime,
+            stat.st_size,
+        ),
+    )
+    chunks = chunk_markdown(md)
+    for chunk in chunks:
+        cursor = conn.execute(
+            "INSERT INTO chunks (section, text) VALUES (?, ?)",
+            (chunk.section, chunk.text),
+        )
+        conn.execute(
+            "INSERT INTO chunk_meta VALUES (?, ?, ?)",
+            (cursor.lastrowid, str(md_path), chunk.page),
+        )
+    return len(chunks)
+
+
+def sync() -> None:
+    """Brings the index up to date with the markdown next to every cataloged filing.
+
+    Only documents whose markdown appeared, changed size or mtime, or
+    disappeared since the last sync are touched.
+    """
+    filings = catalog.list_filings_with_form_year()
+    with _connect() as conn:
+        indexed = {
+            md_path: (md_mtime, md_size)
+            for md_path, md_mtime, md_size in conn.execute(
+                "SELECT md_path, md_mtime, md_size FROM documents"
+            )
+        }
+        seen: set[str] = set()
+        for mcp_result, form, year in filings:
+            md_path = pathlib.Path(mcp_result.pdf_path).with_suffix(".md")
+            try:
+                stat = md_path.stat()
+            except OSError:
+                continue
+            seen.add(str(md_path))
+            if indexed.get(str(md_path)) == (stat.st_mtime, stat.st_size):
+                continue
+            chunk_count = _index_document(conn, mcp_result, form, year, md_path)
+            logger.info(f"Indexed {chunk_count} chunks of {md_path}")
+        for md_path in indexed.keys() - seen:
+            logger.info(f"Removing {md_path} from the search index")
+            _remove_document(conn, md_path)
+
+
+def _quote_terms(query: str) -> str:
+    """Turns free text into an FTS5 query of quoted terms, for input that is not valid FTS5 syntax."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search(
+    query: str,
+    ticker: str | None = None,
+    form: str | None = None,
+    year: int | None = None,
+    limit: int = 10,
+) -> list[datamodels.SearchHit]:
+    """Ranks the chunks matching `query` with bm25 and returns them with snippets and page references."""
+    clauses, params = ["chunks MATCH ?"], []
+    for column, value in (
+        ("d.ticker", ticker and ticker.upper()),
+        ("d.form", form),
+        ("d.year", year),
+    ):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    sql = f"""
+        SELECT d.ticker, d.form, d.year, d.accession_num, d.filing_name, d.pdf_path,
+               d.md_path, m.page, chunks.section,
+               snippet(chunks, 1, '**', '**', '...', {constants.SEARCH_SNIPPET_TOKENS}),
+               bm25(chunks, {_BM25_WEIGHTS[0]}, {_BM25_WEIGHTS[1]}) AS score
+        FROM chunks
+        JOIN chunk_meta m ON m.chunk_id = chunks.rowid
+        JOIN documents d ON d.md_path = m.md_path
+        WHERE {" AND ".join(clauses)}
+        ORDER BY score
+        LIMIT ?
+    """
+    with _connect() as conn:
+        try:
+            rows = conn.execute(sql, [query, *params, limit]).fetchall()
+        except sqlite3.OperationalError:
+            # Plain questions often contain FTS5 operators such as "-" or ":".
+            rows = conn.execute(sql, [_quote_terms(query), *params, limit]).fetchall()
+    return [
+        datamodels.SearchHit(
+            ticker=row[0],
+            form=row[1],
+            year=row[2],
+            accession_num=row[3],
+            filing_name=row[4],
+            pdf_path=row[5],
+            md_path=row[6],
+            page=row[7],
+            section=row[8],
+            snippet=row[9],
+            score=row[10],
+        )
+        for row in rows
+    ]
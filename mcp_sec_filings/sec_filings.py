@@ -1,17 +1,27 @@
 import re
-import pandas as pd
-from datetime import datetime
-from typing import Union
-import pdfkit
+from typing import TYPE_CHECKING, Awaitable, Callable, Union
 import json
 import os
 import httpx
 import asyncio
 from loguru import logger
 import concurrent.futures
-from mcp_sec_filings import constants, datamodels
+import multiprocessing
+from mcp_sec_filings import (
+    adaptive_limiter,
+    catalog,
+    constants,
+    datamodels,
+    filing_store,
+    http_client,
+    metrics,
+    submissions,
+    ticker_index,
+)
 
-os.makedirs(constants.BASE_DIR, exist_ok=True)
+# filings_index pulls in numpy, which is only needed once filings are listed.
+if TYPE_CHECKING:
+    from mcp_sec_filings import filings_index
 
 
 def _search_url(cik: Union[str, int]) -> str:
@@ -21,6 +31,17 @@ def _search_url(cik: Union[str, int]) -> str:
 
 
 async def get_cik_by_ticker(ticker: str) -> str:
+    """Gets a CIK number from a stock ticker, using the local ticker index when possible."""
+    cik = await ticker_index.lookup_cik(ticker)
+    if cik:
+        return cik
+    logger.info(f"{ticker=} not in the ticker index, searching the SEC website")
+    cik = await search_cik_by_ticker(ticker)
+    ticker_index.remember_cik(ticker, cik)
+    return cik
+
+
+async def search_cik_by_ticker(ticker: str) -> str:
     """Gets a CIK number from a stock ticker by running a search on the SEC website."""
     request_settings = datamodels.RequestSettings()
     url = _search_url(ticker)
@@ -29,71 +50,54 @@ async def get_cik_by_ticker(ticker: str) -> str:
         "Content-Type": "text/html",
     }
 
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        response = await client.get(url, headers=headers)
-        response.raise_for_status()
-        cik_re = re.compile(r".*CIK=(\d{10}).*")
-        results = cik_re.findall(response.text)
+    response = await http_client.sec_get(url, headers=headers)
+    response.raise_for_status()
+    cik_re = re.compile(r".*CIK=(\d{10}).*")
+    results = cik_re.findall(response.text)
 
     return str(results[0])
 
 
-async def get_metadata_from_ticker(
-    sec_filings_request: datamodels.SECFilingsRequest,
-) -> tuple[str, dict[str, list[str]] | None]:
-    cik = await get_cik_by_ticker(sec_filings_request.ticker)
+async def get_company_filings(
+    ticker: str,
+) -> tuple[str, "filings_index.FilingsIndex | None"]:
+    """Resolves a ticker to its CIK and the year partitioned index of its filings."""
+    from mcp_sec_filings import filings_index
+
+    with metrics.span("sec_cik_lookup"):
+        cik = await get_cik_by_ticker(ticker)
 
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
-    url = constants.SEC_CIK_URL.format(cik=cik)
+    try:
+        with metrics.span("sec_submissions_fetch"):
+            json_data = await submissions.get_submissions(cik, headers=headers)
+    except httpx.HTTPStatusError as exc:
+        logger.error(f"Error fetching submissions for {ticker=}: {exc}")
+        return cik, None
 
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        response = await client.get(url, headers=headers)
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            logger.error(
-                f"Error fetching data for {sec_filings_request.model_dump_json()}: {exc}"
-            )
-            return cik, None
+    if not json_data.get("filings", {}).get("recent"):
+        return cik, None
+    return cik, filings_index.get_filings_index(cik, json_data)
 
-        json_data = response.json()
 
-    return cik, json_data.get("filings", {}).get("recent")
+async def get_metadata_from_ticker(
+    sec_filings_request: datamodels.SECFilingsRequest,
+) -> tuple[str, "filings_index.FilingsIndex | None"]:
+    return await get_company_filings(sec_filings_request.ticker)
 
 
 def get_accession_list(
     recent_filings: dict[str, list[str]],
     sec_filings_request: datamodels.SECFilingsRequest,
 ) -> list[datamodels.AccessionNumElem]:
-    acc_nums_list: list[datamodels.AccessionNumElem] = []
-    sec_form_names: list[str] = []
-    for acc_num, filing_name, filing_date, report_date in zip(
-        recent_filings["accessionNumber"],
-        recent_filings["form"],
-        recent_filings["filingDate"],
-        recent_filings["reportDate"],
-    ):
-        if filing_name in sec_filings_request.filing_types and report_date.startswith(
-            str(sec_filings_request.year)
-        ):
-            if filing_name == "10-Q":
-                datetime_obj = datetime.strptime(report_date, "%Y-%m-%d")
-                quarter = pd.Timestamp(datetime_obj).quarter
-                filing_name += str(quarter)
-                if filing_name in sec_form_names:
-                    filing_name += "-1"
-            acc_nums_list.append(
-                datamodels.AccessionNumElem.from_accession_metadata(
-                    accession_num=acc_num,
-                    filing_name=filing_name,
-                    filing_date=filing_date,
-                    report_date=report_date,
-                )
-            )
-            sec_form_names.append(filing_name)
-    return acc_nums_list
+    from mcp_sec_filings import filings_index
+
+    filings_table = filings_index.FilingsTable.from_columns(recent_filings)
+    return filings_table.select(
+        year=sec_filings_request.year, filing_types=sec_filings_request.filing_types
+    )
 
 
 def make_ticker_year_path(sec_filings_request: datamodels.SECFilingsRequest) -> str:
@@ -107,12 +111,21 @@ def make_ticker_year_path(sec_filings_request: datamodels.SECFilingsRequest) ->
 async def get_sec_filings_html_urls(
     sec_filings_request: datamodels.SECFilingsRequest,
 ) -> list[datamodels.HTMLURLList] | None:
-    cik, recent_filings = await get_metadata_from_ticker(sec_filings_request)
-    if not recent_filings:
+    cik, company_filings = await get_metadata_from_ticker(sec_filings_request)
+    if company_filings is None:
         logger.error(f"Could not retrieve for {sec_filings_request.model_dump()}")
         return None
-    acc_nums_list = get_accession_list(
-        recent_filings=recent_filings, sec_filings_request=sec_filings_request
+    return await select_html_urls(cik, company_filings, sec_filings_request)
+
+
+async def select_html_urls(
+    cik: str,
+    company_filings: "filings_index.FilingsIndex",
+    sec_filings_request: datamodels.SECFilingsRequest,
+) -> list[datamodels.HTMLURLList]:
+    await company_filings.ensure_year(sec_filings_request.year)
+    acc_nums_list = company_filings.select(
+        year=sec_filings_request.year, filing_types=sec_filings_request.filing_types
     )
     html_urls = [
         datamodels.HTMLURLList.from_cik_accnum_ticker(
@@ -123,57 +136,266 @@ async def get_sec_filings_html_urls(
     return html_urls
 
 
-def sec_save_pdf(
+FilingCallback = Callable[[datamodels.MCPResultsPDF], Awaitable[None]]
+
+
+async def sec_save_pdf(
     html_urls: list[datamodels.HTMLURLList],
     sec_filings_request: datamodels.SECFilingsRequest,
+    on_filing: FilingCallback | None = None,
 ) -> list[datamodels.MCPResultsPDF]:
+    """Stores every filing and returns one record per filing, failed ones included.
+
+    `on_filing` is awaited with each record as soon as that filing is stored or fails.
+    """
     ticker_year_path = make_ticker_year_path(sec_filings_request=sec_filings_request)
-    mcp_results = convert_html_to_pdfs(
+    mcp_results = await convert_html_to_pdfs(
         html_urls,
         ticker_year_path,
         sec_filings_request.ticker,
         sec_filings_request.year,
+        on_filing=on_filing,
     )
     return mcp_results
 
 
-def convert_single_html_to_pdf(
-    html_url: datamodels.HTMLURLList, base_path: str, ticker: str
-) -> datamodels.MCPResultsPDF:
+def pdf_path_for(html_url: datamodels.HTMLURLList, base_path: str) -> str:
     pdf_path = html_url.html_url.split("/")[-1]
     pdf_path = pdf_path.replace(".htm", f"-{html_url.filing_name}.pdf")
     pdf_path = pdf_path.replace("/A", "A")
-    pdf_path = os.path.join(base_path, pdf_path)
+    return os.path.abspath(os.path.join(base_path, pdf_path))
+
+
+def _inject_base_href(html: str, base_url: str) -> str:
+    base_tag = f'<base href="{base_url}">'
+    head = re.search(r"<head[^>]*>", html, flags=re.IGNORECASE)
+    if head is None:
+        return base_tag + html
+    return html[: head.end()] + base_tag + html[head.end() :]
+
+
+def convert_single_html_to_pdf(html_path: str, html_url: str, pdf_path: str) -> str:
+    """Renders a stored filing HTML into `pdf_path` and returns the sha256 of the PDF."""
+    with open(html_path, "r", encoding="utf-8", errors="replace") as f:
+        # Relative images and stylesheets still resolve against EDGAR.
+        html = _inject_base_href(f.read(), html_url)
+
+    # Imported here so only the render workers pay for it.
+    import pdfkit
+
+    tmp_pdf_path = f"{pdf_path}.{os.getpid()}.tmp.pdf"
+    try:
+        pdfkit.from_string(html, tmp_pdf_path)
+        os.replace(tmp_pdf_path, pdf_path)
+    finally:
+        if os.path.exists(tmp_pdf_path):
+            os.remove(tmp_pdf_path)
+    logger.info(f"Saved filing at {pdf_path=}")
+    return filing_store.sha256_file(pdf_path)
+
+
+_render_executor: concurrent.futures.ProcessPoolExecutor | None = None
+
+
+def render_workers() -> int:
+    return int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+
+
+def render_limiter() -> adaptive_limiter.AdaptiveLimiter:
+    """Adaptive limit on renders in flight, it never exceeds the render pool size."""
+    return adaptive_limiter.get_limiter("render", ceiling=render_workers())
+
+
+def get_render_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Returns the process wide wkhtmltopdf render pool, creating it on first use."""
+    global _render_executor
+    if _render_executor is None:
+        max_workers = render_workers()
+        # Forking a process that already runs an event loop and helper threads
+        # is unsafe, so the workers are spawned fresh.
+        _render_executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Started render pool with {max_workers=}")
+    return _render_executor
 
-    pdfkit.from_url(html_url.html_url, pdf_path)
-    logger.info(f"Saved filing {html_url.filing_name} at {pdf_path=}")
 
-    return datamodels.MCPResultsPDF(
+def shutdown_render_executor() -> None:
+    global _render_executor
+    if _render_executor is not None:
+        _render_executor.shutdown(wait=False, cancel_futures=True)
+        _render_executor = None
+
+
+_directory_locks: dict[str, asyncio.Lock] = {}
+_manifest_save_locks: dict[str, asyncio.Lock] = {}
+_locks_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _locks_for(base_path: str) -> tuple[asyncio.Lock, asyncio.Lock]:
+    """Returns the store lock and the manifest save lock of a filings directory."""
+    global _locks_loop
+
+    loop = asyncio.get_running_loop()
+    if _locks_loop is not loop:
+        _directory_locks.clear()
+        _manifest_save_locks.clear()
+        _locks_loop = loop
+    key = os.path.abspath(base_path)
+    return (
+        _directory_locks.setdefault(key, asyncio.Lock()),
+        _manifest_save_locks.setdefault(key, asyncio.Lock()),
+    )
+
+
+async def save_manifest(
+    base_path: str, manifest: dict[str, datamodels.ManifestEntry]
+) -> None:
+    """Writes the manifest off the event loop, one save of a directory at a time.
+
+    The snapshot is taken once the previous save finished, so an older
+    snapshot can never replace a newer one.
+    """
+    _, save_lock = _locks_for(base_path)
+    async with save_lock:
+        await asyncio.to_thread(filing_store.save_manifest, base_path, dict(manifest))
+
+
+async def store_single_filing(
+    html_url: datamodels.HTMLURLList,
+    base_path: str,
+    ticker: str,
+    manifest: dict[str, datamodels.ManifestEntry],
+) -> datamodels.MCPResultsPDF:
+    """Downloads and renders one filing unless the manifest already has it complete."""
+    pdf_path = pdf_path_for(html_url, base_path)
+    key = html_url.accession_num or html_url.html_url
+    mcp_result = datamodels.MCPResultsPDF(
         ticker=ticker,
         html_url=html_url.html_url,
         filing_name=html_url.filing_name,
-        pdf_path=os.path.abspath(pdf_path),
+        accession_num=html_url.accession_num,
+        pdf_path=pdf_path,
+    )
+
+    if await asyncio.to_thread(filing_store.is_complete, manifest.get(key)):
+        logger.info(f"Skipping {html_url.filing_name}, already stored at {pdf_path=}")
+        metrics.inc("sec_filings_stored_total", status="skipped")
+        return mcp_result
+
+    entry = datamodels.ManifestEntry(
+        accession_num=html_url.accession_num,
+        filing_name=html_url.filing_name,
+        html_url=html_url.html_url,
+        html_path=filing_store.html_path_for(pdf_path),
+        pdf_path=pdf_path,
+        status="pending",
+        updated_at=filing_store.now_isoformat(),
     )
+    manifest[key] = entry
+    await save_manifest(base_path, manifest)
 
+    try:
+        with metrics.span("sec_html_download"):
+            response = await http_client.sec_get(html_url.html_url)
+            response.raise_for_status()
+        html_sha256 = filing_store.sha256_bytes(response.content)
+        await asyncio.to_thread(
+            filing_store.atomic_write_bytes, entry.html_path, response.content
+        )
+        # Timed here because the render itself runs in another process.
+        async with render_limiter().slot():
+            with metrics.span("sec_render"):
+                pdf_sha256 = await asyncio.get_running_loop().run_in_executor(
+                    get_render_executor(),
+                    convert_single_html_to_pdf,
+                    entry.html_path,
+                    html_url.html_url,
+                    pdf_path,
+                )
+    except Exception as e:
+        logger.error(f"Failed to store {html_url.model_dump()}: {e}")
+        manifest[key] = entry.model_copy(
+            update={
+                "status": "failed",
+                "error": str(e),
+                "updated_at": filing_store.now_isoformat(),
+            }
+        )
+        await save_manifest(base_path, manifest)
+        metrics.inc("sec_filings_stored_total", status="failed")
+        return mcp_result.model_copy(
+            update={"status": "failed", "error": str(e) or type(e).__name__}
+        )
 
-def convert_html_to_pdfs(
-    html_urls: list[datamodels.HTMLURLList], base_path: str, ticker: str, year: int
+    manifest[key] = entry.model_copy(
+        update={
+            "status": "complete",
+            "html_sha256": html_sha256,
+            "pdf_sha256": pdf_sha256,
+            "updated_at": filing_store.now_isoformat(),
+        }
+    )
+    await save_manifest(base_path, manifest)
+    metrics.inc("sec_filings_stored_total", status="complete")
+    return mcp_result
+
+
+async def convert_html_to_pdfs(
+    html_urls: list[datamodels.HTMLURLList],
+    base_path: str,
+    ticker: str,
+    year: int,
+    on_filing: FilingCallback | None = None,
 ) -> list[datamodels.MCPResultsPDF]:
+    # Calls for the same ticker and year take turns on the directory, so the
+    # later one sees the filings the earlier one stored and skips them
+    # instead of rendering them again and overwriting its manifest.
+    directory_lock, _ = _locks_for(base_path)
+    async with directory_lock:
+        manifest = await asyncio.to_thread(filing_store.load_manifest, base_path)
 
-    mcp_results: list[datamodels.MCPResultsPDF] = []
+        async def store(
+            html_url: datamodels.HTMLURLList,
+        ) -> datamodels.MCPResultsPDF:
+            mcp_result = await store_single_filing(
+                html_url, base_path, ticker, manifest
+            )
+            if on_filing is not None:
+                try:
+                    await on_filing(mcp_result)
+                except Exception as e:
+                    logger.error(
+                        f"Filing callback failed for {mcp_result.pdf_path}: {e}"
+                    )
+            return mcp_result
+
+        mcp_results = list(await asyncio.gather(*map(store, html_urls)))
 
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        futures = [
-            executor.submit(convert_single_html_to_pdf, html_url, base_path, ticker)
-            for html_url in html_urls
+        # The metadata lists every complete filing of the year, not only this call's.
+        mcp_results_json = [
+            datamodels.MCPResultsPDF(
+                ticker=ticker,
+                html_url=entry.html_url,
+                filing_name=entry.filing_name,
+                accession_num=entry.accession_num,
+                pdf_path=entry.pdf_path,
+            ).model_dump()
+            for entry in manifest.values()
+            if entry.status == "complete"
         ]
-        for future in futures:
-            mcp_results.append(future.result())
-    mcp_results_json = [mcp_res.model_dump() for mcp_res in mcp_results]
-    metadata_path = os.path.join(base_path, f"{ticker}-{year}.json")
-    with open(metadata_path, "w", encoding="utf-8") as f:
-        json.dump(mcp_results_json, f, indent=4)
+        metadata_path = os.path.join(base_path, f"{ticker}-{year}.json")
+        await asyncio.to_thread(
+            filing_store.atomic_write_text,
+            metadata_path,
+            json.dumps(mcp_results_json, indent=4),
+        )
     logger.info(f"Saved metadata at {metadata_path=}")
+    await asyncio.to_thread(
+        catalog.record_filings,
+        [mcp_result for mcp_result in mcp_results if mcp_result.status == "complete"],
+        year,
+    )
     return mcp_results
 
 
@@ -181,14 +403,14 @@ if __name__ == "__main__":
     sec_filings_request = datamodels.SECFilingsRequest(
         ticker="AMZN", year=2024, filing_types=["10-K", "10-Q"], include_amends=True
     )
-    html_urls = asyncio.run(
-        get_sec_filings_html_urls(sec_filings_request=sec_filings_request)
-    )
-    base_path = make_ticker_year_path(sec_filings_request)
-    if html_urls:
-        mcp_results = convert_html_to_pdfs(
-            html_urls=html_urls,
-            base_path=base_path,
-            ticker=sec_filings_request.ticker,
-            year=sec_filings_request.year,
+
+    async def _main() -> None:
+        html_urls = await get_sec_filings_html_urls(
+            sec_filings_request=sec_filings_request
         )
+        if html_urls:
+            await sec_save_pdf(
+                html_urls=html_urls, sec_filings_request=sec_filings_request
+            )
+
+    asyncio.run(_main())
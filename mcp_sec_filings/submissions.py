@@ -0,0 +1,123 @@
+import asyncio
+import collections
+import dataclasses
+import os
+import time
+from typing import Any
+
+from loguru import logger
+
+from mcp_sec_filings import constants, http_client, metrics
+
+
+@dataclasses.dataclass
+class _CacheEntry:
+    data: dict[str, Any]
+    size: int
+    etag: str | None
+    last_modified: str | None
+    checked_at: float
+
+
+class SubmissionsCache:
+    """LRU cache of EDGAR submissions JSON keyed by url.
+
+    Entries older than `fresh_seconds` are revalidated with ETag/Last-Modified,
+    and concurrent requests for the same url share a single in-flight fetch.
+    """
+
+    def __init__(self, max_bytes: int, fresh_seconds: float) -> None:
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._entries: collections.OrderedDict[str, _CacheEntry] = (
+            collections.OrderedDict()
+        )
+        self._size = 0
+        self._inflight: dict[str, asyncio.Future[dict[str, Any]]] = {}
+
+    def _store(self, url: str, entry: _CacheEntry) -> None:
+        old = self._entries.pop(url, None)
+        if old is not None:
+            self._size -= old.size
+        self._entries[url] = entry
+        self._size += entry.size
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    async def _fetch(
+        self, url: str, entry: _CacheEntry | None, headers: dict[str, str] | None
+    ) -> dict[str, Any]:
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        response = await http_client.sec_get(url, headers=request_headers)
+        if response.status_code == 304 and entry is not None:
+            metrics.inc("sec_submissions_cache_total", result="revalidated")
+            entry.checked_at = time.monotonic()
+            if url in self._entries:
+                self._entries.move_to_end(url)
+            else:
+                self._store(url, entry)
+            return entry.data
+
+        response.raise_for_status()
+        metrics.inc("sec_submissions_cache_total", result="fetched")
+        data = response.json()
+        self._store(
+            url,
+            _CacheEntry(
+                data=data,
+                size=len(response.content),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                checked_at=time.monotonic(),
+            ),
+        )
+        logger.debug(f"Fetched {url=} ({len(response.content)} bytes)")
+        return data
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> dict[str, Any]:
+        entry = self._entries.get(url)
+        if (
+            entry is not None
+            and time.monotonic() - entry.checked_at < self.fresh_seconds
+        ):
+            self._entries.move_to_end(url)
+            metrics.inc("sec_submissions_cache_total", result="fresh")
+            return entry.data
+
+        fetch = self._inflight.get(url)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch(url, entry, headers))
+            self._inflight[url] = fetch
+            fetch.add_done_callback(lambda _: self._inflight.pop(url, None))
+        # Shield the shared fetch so one cancelled caller does not fail the others.
+        return await asyncio.shield(fetch)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+submissions_cache = SubmissionsCache(
+    max_bytes=int(
+        os.getenv(
+            "SUBMISSIONS_CACHE_MAX_BYTES", str(constants.SUBMISSIONS_CACHE_MAX_BYTES)
+        )
+    ),
+    fresh_seconds=constants.SUBMISSIONS_CACHE_FRESH_SECONDS,
+)
+
+
+async def get_submissions(
+    cik: str, headers: dict[str, str] | None = None
+) -> dict[str, Any]:
+    """Returns the parsed `CIK{cik}.json` submissions document, served from cache when possible."""
+    return await submissions_cache.get(constants.SEC_CIK_URL.format(cik=cik), headers)
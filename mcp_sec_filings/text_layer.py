@@ -0,0 +1,129 @@
+import dataclasses
+import re
+import threading
+from typing import TYPE_CHECKING, Literal
+
+from mcp_sec_filings import constants, html2md
+
+if TYPE_CHECKING:
+    import pypdfium2
+
+# pdfium is not thread safe and pages are analysed from worker threads.
+pdfium_lock = threading.Lock()
+
+_NUMBER_RE = re.compile(r"\(?\$?\d[\d,]*\.?\d*%?\)?")
+
+
+@dataclasses.dataclass
+class PageRoute:
+    page_number: int
+    route: Literal["text", "vlm"]
+    reason: str
+    char_count: int
+    image_coverage: float
+    markdown: str | None = None
+
+
+def _image_coverage(page: "pypdfium2.PdfPage") -> float:
+    import pypdfium2.raw as pdfium_c
+
+    width, height = page.get_size()
+    image_area = 0.0
+    for image in page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,)):
+        left, bottom, right, top = image.get_pos()
+        image_area += max(0.0, right - left) * max(0.0, top - bottom)
+    return min(1.0, image_area / (width * height)) if width and height else 0.0
+
+
+def _is_table_line(line: str) -> bool:
+    return len(_NUMBER_RE.findall(line)) >= 3
+
+
+def text_to_markdown(text: str) -> str:
+    """Rebuilds paragraphs and section headings from the line broken text layer."""
+    blocks: list[str] = []
+    paragraph: list[str] = []
+
+    def flush() -> None:
+        if paragraph:
+            blocks.append(" ".join(paragraph))
+            paragraph.clear()
+
+    for raw_line in text.splitlines():
+        line = " ".join(raw_line.split())
+        if not line:
+            flush()
+            continue
+        if (
+            html2md.SECTION_RE.match(line)
+            and len(line) <= html2md.MAX_SECTION_HEADING_CHARS
+        ):
+            flush()
+            blocks.append(f"## {line}")
+            continue
+        paragraph.append(line)
+        if line.endswith((".", ":", ";")):
+            flush()
+    flush()
+    return "\n\n".join(blocks)
+
+
+def _route_page(page_number: int, page: "pypdfium2.PdfPage") -> PageRoute:
+    textpage = page.get_textpage()
+    try:
+        text = textpage.get_text_range()
+    finally:
+        textpage.close()
+    stripped = "".join(text.split())
+    char_count = len(stripped)
+    coverage = _image_coverage(page)
+
+    def route(kind: Literal["text", "vlm"], reason: str) -> PageRoute:
+        return PageRoute(
+            page_number=page_number,
+            route=kind,
+            reason=reason,
+            char_count=char_count,
+            image_coverage=coverage,
+            markdown=text_to_markdown(text) if kind == "text" else None,
+        )
+
+    if char_count == 0 and coverage == 0:
+        return route("text", "blank")
+    if char_count < constants.TEXT_LAYER_MIN_CHARS:
+        return route("vlm", "no-text-layer")
+    if coverage > constants.TEXT_LAYER_MAX_IMAGE_COVERAGE:
+        return route("vlm", "image-heavy")
+    garbage = sum(1 for c in stripped if c == "�" or not c.isprintable())
+    if garbage / char_count > constants.TEXT_LAYER_MAX_GARBAGE_RATIO:
+        return route("vlm", "unreliable-text")
+    lines = [line for line in text.splitlines() if line.strip()]
+    table_lines = sum(1 for line in lines if _is_table_line(line))
+    if (
+        table_lines >= constants.TEXT_LAYER_MIN_TABLE_LINES
+        and table_lines / len(lines) > constants.TEXT_LAYER_MAX_TABLE_RATIO
+    ):
+        return route("vlm", "complex-table")
+    return route("text", "text-layer")
+
+
+def route_pages(pdf_path: str, page_numbers: list[int]) -> list[PageRoute]:
+    """Decides per page whether the embedded text layer is good enough to skip the VLM.
+
+    Pages routed to "text" carry their extracted markdown.
+    """
+    import pypdfium2
+
+    routes: list[PageRoute] = []
+    with pdfium_lock:
+        pdf = pypdfium2.PdfDocument(pdf_path)
+        try:
+            for page_number in page_numbers:
+                page = pdf[page_number - 1]
+                try:
+                    routes.append(_route_page(page_number, page))
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+    return routes
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from mcp_sec_filings import constants, http_client
+
+_ticker_to_cik: dict[str, str] | None = None
+_loaded_at: float = 0.0
+_lock: asyncio.Lock | None = None
+_lock_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_lock() -> asyncio.Lock:
+    """Returns the index lock of the running loop."""
+    global _lock, _lock_loop
+
+    loop = asyncio.get_running_loop()
+    if _lock is None or _lock_loop is not loop:
+        _lock = asyncio.Lock()
+        _lock_loop = loop
+    return _lock
+
+
+def _is_fresh(loaded_at: float) -> bool:
+    return time.time() - loaded_at < constants.TICKER_INDEX_TTL_SECONDS
+
+
+def _parse_company_tickers(payload: dict[str, dict[str, Any]]) -> dict[str, str]:
+    """Turns SEC's `company_tickers.json` rows into a ticker -> zero padded CIK map."""
+    return {
+        str(row["ticker"]).upper(): f"{int(row['cik_str']):010d}"
+        for row in payload.values()
+    }
+
+
+def _read_index_file() -> tuple[dict[str, str], float] | None:
+    if not os.path.exists(constants.TICKER_INDEX_PATH):
+        return None
+    try:
+        with open(constants.TICKER_INDEX_PATH, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Failed to read {constants.TICKER_INDEX_PATH}: {e}")
+        return None
+    return index, os.path.getmtime(constants.TICKER_INDEX_PATH)
+
+
+def _write_index_file(index: dict[str, str]) -> None:
+    os.makedirs(os.path.dirname(constants.TICKER_INDEX_PATH), exist_ok=True)
+    tmp_path = f"{constants.TICKER_INDEX_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, constants.TICKER_INDEX_PATH)
+
+
+async def _download_index() -> dict[str, str]:
+    response = await http_client.sec_get(constants.SEC_COMPANY_TICKERS_URL)
+    response.raise_for_status()
+    return _parse_company_tickers(response.json())
+
+
+async def load_ticker_index(force_refresh: bool = False) -> dict[str, str]:
+    """Returns the ticker -> CIK index, loading it from disk or SEC when stale."""
+    global _ticker_to_cik, _loaded_at
+
+    if not force_refresh and _ticker_to_cik is not None and _is_fresh(_loaded_at):
+        return _ticker_to_cik
+
+    async with _get_lock():
+        if not force_refresh and _ticker_to_cik is not None and _is_fresh(_loaded_at):
+            return _ticker_to_cik
+
+        on_disk = None if force_refresh else await asyncio.to_thread(_read_index_file)
+        if on_disk and _is_fresh(on_disk[1]):
+            _ticker_to_cik, _loaded_at = on_disk
+            return _ticker_to_cik
+
+        try:
+            index = await _download_index()
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            logger.warning(f"Could not refresh the ticker index, using stale copy: {e}")
+            if _ticker_to_cik is None:
+                _ticker_to_cik = on_disk[0] if on_disk else {}
+            # Retry the download only after another TTL so a SEC outage does
+            # not turn every lookup into a failed request.
+            _loaded_at = time.time()
+            return _ticker_to_cik
+
+        await asyncio.to_thread(_write_index_file, index)
+        _ticker_to_cik, _loaded_at = index, time.time()
+        logger.info(f"Loaded {len(index)} tickers into the CIK index")
+        return _ticker_to_cik
+
+
+async def lookup_cik(ticker: str) -> str | None:
+    index = await load_ticker_index()
+    return index.get(ticker.upper())
+
+
+def remember_cik(ticker: str, cik: str) -> None:
+    """Adds a CIK found outside of the bulk index, e.g. by scraping browse-edgar."""
+    if _ticker_to_cik is not None:
+        _ticker_to_cik[ticker.upper()] = cik
@@ -1,25 +1,97 @@
 import os
-from typing import Annotated
+import contextlib
+import pathlib
+from typing import Annotated, AsyncIterator
 import asyncio
 from loguru import logger
-import pathlib
-import json
 import pydantic
 from mcp import types
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+
+from mcp_sec_filings import (
+    adaptive_limiter,
+    batch,
+    catalog,
+    constants,
+    datamodels,
+    filing_ranges,
+    http_client,
+    markdown_engine,
+    metrics,
+    search_index,
+    sec_filings,
+)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastMCP) -> AsyncIterator[None]:
+    engine = markdown_engine.get_engine()
+    warm_task: asyncio.Task | None = None
+    if (
+        os.getenv("WARM_INFERENCE_ENGINE", "0") == "1"
+        and not engine.lazy_backend.loaded
+    ):
+        # Warmed in the background so the server answers while the model loads.
+        warm_task = asyncio.create_task(engine.warm())
+    try:
+        yield
+    finally:
+        if warm_task is not None:
+            warm_task.cancel()
+            await asyncio.gather(warm_task, return_exceptions=True)
+        await engine.close()
+        sec_filings.shutdown_render_executor()
+        await http_client.aclose_client()
+
 
-from mcp_sec_filings import constants, datamodels, sec_filings
+mcp = FastMCP("sec_filings", lifespan=lifespan)
 
-mcp = FastMCP("sec_filings")
+
+class FilingProgress:
+    """Sends an MCP progress notification and a log message for every stored filing of a tool call.
+
+    The total grows as the filing lists of the requested years come in.
+    """
+
+    def __init__(self, ctx: Context) -> None:
+        self.ctx = ctx
+        self.done = 0
+        self.total = 0
+
+    def add_filings(self, count: int) -> None:
+        self.total += count
+
+    async def on_filing(self, mcp_result: datamodels.MCPResultsPDF) -> None:
+        self.done += 1
+        await self.ctx.report_progress(self.done, self.total)
+        if mcp_result.status == "complete":
+            await self.ctx.info(
+                f"Saved {mcp_result.ticker} {mcp_result.filing_name} at {mcp_result.pdf_path}"
+            )
+        else:
+            await self.ctx.warning(
+                f"Failed to save {mcp_result.ticker} {mcp_result.filing_name}: {mcp_result.error}"
+            )
 
 
 async def process_sec_filings_request(
-    sec_filings_request: datamodels.SECFilingsRequest, semaphore: asyncio.Semaphore
-) -> list[datamodels.HTMLURLList] | None:
-    async with semaphore:
-        return await sec_filings.get_sec_filings_html_urls(
-            sec_filings_request=sec_filings_request
-        )
+    sec_filings_request: datamodels.SECFilingsRequest,
+    progress: FilingProgress | None = None,
+) -> list[datamodels.MCPResultsPDF]:
+    html_urls = await sec_filings.get_sec_filings_html_urls(
+        sec_filings_request=sec_filings_request
+    )
+    if not html_urls:
+        return []
+    if progress is not None:
+        progress.add_filings(len(html_urls))
+    # EDGAR requests and renders are bounded by their adaptive limiters, so the
+    # filings of every year in a range are fetched and rendered side by side.
+    return await sec_filings.sec_save_pdf(
+        html_urls=html_urls,
+        sec_filings_request=sec_filings_request,
+        on_filing=progress.on_filing if progress is not None else None,
+    )
 
 
 def get_sec_filings_request(
@@ -67,10 +139,15 @@ async def get_sec_filings_save_pdf(
         list[constants.SecFilingType], "Type(s) of SEC filings to retrieve"
     ],
     include_amends: Annotated[bool, "Whether to include amended documents"],
-) -> None:
+    ctx: Context,
+) -> list[datamodels.MCPResultsPDF]:
     """
     Fetch SEC filings URLs for a given stock ticker, optionally filtered by year or year range and then finally saves the pdf
 
+    A progress notification is sent as each filing is saved, so clients can open the first
+    filings while the rest of the range is still downloading. Every filing is returned, the
+    failed ones with status "failed" and the error.
+
     Args:
         ticker (str): The stock ticker symbol (e.g., 'AAPL', 'GOOG').
         year (str | None): Specific year for which filings are requested.
@@ -80,6 +157,8 @@ async def get_sec_filings_save_pdf(
         filing_types (constants.SecFilingType): Type(s) of SEC filings to retrieve, such as 10-K, 10-Q, etc.
         include_amends (bool): Whether to include amended documents
 
+        ctx (Context): The MCP request context, used for the progress notifications.
+
     Raises:
         AssertionError: If both year and year range are set
     """
@@ -94,49 +173,285 @@ async def get_sec_filings_save_pdf(
         filing_types=filing_types,
         include_amends=include_amends,
     )
-    max_concurrency = int(os.getenv("MAX_CONCURRENCY", "5"))
-    semaphore = asyncio.Semaphore(max_concurrency)
+    progress = FilingProgress(ctx)
     tasks = [
         process_sec_filings_request(
-            sec_filings_request=sec_filings_request, semaphore=semaphore
+            sec_filings_request=sec_filings_request,
+            progress=progress,
         )
         for sec_filings_request in sec_filings_request_list
     ]
-    html_urls_list = await asyncio.gather(*tasks, return_exceptions=True)
+    mcp_results_list = await asyncio.gather(*tasks, return_exceptions=True)
     mcp_results: list[datamodels.MCPResultsPDF] = []
-    for html_urls, sec_filings_request in zip(
-        html_urls_list, sec_filings_request_list, strict=True
+    for year_results, sec_filings_request in zip(
+        mcp_results_list, sec_filings_request_list, strict=True
     ):
-        if isinstance(html_urls, BaseException):
-            logger.error(f"Unhandled error processing chunk: {html_urls}")
-            continue
-        if html_urls:
-            mcp_results.extend(
-                sec_filings.sec_save_pdf(
-                    html_urls=html_urls, sec_filings_request=sec_filings_request
-                )
+        if isinstance(year_results, BaseException):
+            logger.error(
+                f"Unhandled error processing {sec_filings_request.model_dump()}: {year_results}"
             )
+            continue
+        mcp_results.extend(year_results)
+    return mcp_results
+
+
+@mcp.tool(
+    name="get_sec_filings_batch",
+    description="Fetch and save the SEC filings of many tickers as one job, with one result per ticker and year.",
+)
+async def get_sec_filings_batch(
+    specs: Annotated[
+        list[datamodels.BatchFilingsSpec],
+        "Ticker, year or year range, and filing types of every request in the batch",
+    ],
+) -> list[datamodels.BatchItemResult]:
+    """
+    Fetch and save the filings of many tickers at once, sharing lookups, renders and one concurrency budget
+
+    Args:
+        specs (list[datamodels.BatchFilingsSpec]): One entry per ticker with either a year or a
+            "START_YEAR-END_YEAR" year range, the filing types and whether to include amends.
+    """
+    return await batch.run_batch(specs)
+
+
+def _filing_resource(mcp_result: datamodels.MCPResultsPDF) -> types.Resource:
+    return types.Resource(
+        uri=pydantic.FileUrl(f"file:///{mcp_result.pdf_path}"),
+        name=f"{mcp_result.ticker}: {mcp_result.filing_name}",
+        description=f"The {mcp_result.filing_name} for the ticker symbol {mcp_result.ticker}",
+        mimeType="application/pdf",
+    )
+
+
+_METRICS_RESOURCE = types.Resource(
+    uri=pydantic.AnyUrl(constants.METRICS_RESOURCE_URI),
+    name="metrics",
+    description="Per stage latency histograms, counters and gauges in the Prometheus text format",
+    mimeType="text/plain",
+)
 
 
 @mcp.list_resources()
 async def list_resources() -> list[types.Resource]:
-    json_data: dict[str, list[dict[str, str]]] = {}
-    for json_file in pathlib.Path(constants.BASE_DIR).rglob("*.json"):
-        with open(json_file, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                json_data[json_file.stem] = data
-            except json.JSONDecodeError as e:
-                logger.warning(f"Failed to decode {json_file}: {e}")
-
-    resources = [
-        types.Resource(
-            uri=pydantic.FileUrl(f"file:///{val['pdf_path']}"),
-            name=f"{val['ticker']: {val['filing_name']}}",
-            description=f"The {val['filing_name']} for the ticker symbol {val['ticker']}",
-            mimeType="application/pdf",
-        )
-        for _, vals in json_data.items()
-        for val in vals
-    ]
+    mcp_results = await asyncio.to_thread(
+        catalog.list_filings,
+        limit=int(os.getenv("RESOURCE_LIST_LIMIT", str(constants.RESOURCE_LIST_LIMIT))),
+    )
+    resources = [_filing_resource(mcp_result) for mcp_result in mcp_results]
+    if metrics.is_enabled():
+        resources.append(_METRICS_RESOURCE)
     return resources
+
+
+@mcp.resource(constants.METRICS_RESOURCE_URI, mime_type="text/plain")
+def prometheus_metrics() -> str:
+    """Metrics in the Prometheus text format, recorded when METRICS_ENABLED=1."""
+    return metrics.render_prometheus()
+
+
+@mcp.tool(
+    name="list_filings",
+    description="List stored SEC filings, optionally filtered by ticker, form and year, one page at a time.",
+)
+async def list_filings(
+    ticker: Annotated[str | None, "Stock ticker symbol"] = None,
+    form: Annotated[constants.SecFilingType | None, "SEC filing type"] = None,
+    year: Annotated[int | None, "Year of the filings"] = None,
+    limit: Annotated[int, "Maximum number of filings to return"] = 100,
+    offset: Annotated[int, "Number of filings to skip"] = 0,
+) -> list[datamodels.MCPResultsPDF]:
+    """
+    List the filings that were already saved, read from the catalog instead of the filesystem
+
+    Args:
+        ticker (str | None): The stock ticker symbol (e.g., 'AAPL', 'GOOG').
+        form (constants.SecFilingType | None): Filing type such as 10-K or 10-Q.
+        year (int | None): Year the filings were requested for.
+        limit (int): Page size.
+        offset (int): Number of filings to skip, for pagination.
+    """
+    return await asyncio.to_thread(
+        catalog.list_filings,
+        ticker=ticker,
+        form=form,
+        year=year,
+        limit=limit,
+        offset=offset,
+    )
+
+
+@mcp.tool(
+    name="convert_filings_to_markdown",
+    description="Queue already downloaded SEC filings for markdown conversion and return job handles.",
+)
+async def convert_filings_to_markdown(
+    ticker: Annotated[str, "Stock ticker symbol"],
+    form: Annotated[constants.SecFilingType | None, "SEC filing type"] = None,
+    year: Annotated[int | None, "Year of the filings"] = None,
+    mode: Annotated[
+        constants.ConversionMode,
+        "vlm renders pages through the model, html converts the filing HTML directly",
+    ] = "vlm",
+    resume: Annotated[
+        bool, "Resume interrupted conversions and skip finished ones"
+    ] = True,
+) -> list[datamodels.ConversionJob]:
+    """
+    Queue saved filings for markdown conversion on the resident inference engine
+
+    Args:
+        ticker (str): The stock ticker symbol (e.g., 'AAPL', 'GOOG').
+        form (constants.SecFilingType | None): Filing type such as 10-K or 10-Q.
+        year (int | None): Year the filings were requested for.
+        mode (constants.ConversionMode): "vlm" or "html", html falls back to vlm for image-only filings.
+        resume (bool): Whether to resume interrupted conversions and skip finished ones.
+    """
+    mcp_results = await asyncio.to_thread(
+        catalog.list_filings, ticker=ticker, form=form, year=year, limit=None
+    )
+    return markdown_engine.get_engine().submit(mcp_results, mode=mode, resume=resume)
+
+
+@mcp.tool(
+    name="get_markdown_jobs",
+    description="Get the status of markdown conversion jobs by their handles.",
+)
+async def get_markdown_jobs(
+    job_ids: Annotated[
+        list[str], "Job handles returned by convert_filings_to_markdown"
+    ],
+) -> list[datamodels.ConversionJob]:
+    """
+    Look up markdown conversion jobs, unknown or expired handles are left out
+
+    Args:
+        job_ids (list[str]): Job handles returned by convert_filings_to_markdown.
+    """
+    engine = markdown_engine.get_engine()
+    return [job for job in map(engine.get, job_ids) if job is not None]
+
+
+@mcp.tool(
+    name="get_concurrency_limits",
+    description="Get the current adaptive concurrency limits for EDGAR requests, PDF renders and inference pages.",
+)
+async def get_concurrency_limits() -> list[datamodels.ConcurrencyLimit]:
+    """
+    Report the adaptive concurrency limit, its floor and ceiling, the work in flight and
+    the observed latency of every resource class used so far
+    """
+    return adaptive_limiter.snapshot()
+
+
+@mcp.tool(
+    name="search_filings",
+    description="Full-text search over the converted markdown of stored filings, returning ranked snippets with page references.",
+)
+async def search_filings(
+    query: Annotated[str, "Words or FTS5 query to search for"],
+    ticker: Annotated[str | None, "Stock ticker symbol"] = None,
+    form: Annotated[constants.SecFilingType | None, "SEC filing type"] = None,
+    year: Annotated[int | None, "Year of the filings"] = None,
+    limit: Annotated[int, "Maximum number of snippets to return"] = 10,
+) -> list[datamodels.SearchHit]:
+    """
+    Search the converted filings instead of reading whole documents, the index is brought up to date first
+
+    Args:
+        query (str): Words to look for, FTS5 syntax such as "operating margin" NEAR/5 or OR is supported.
+        ticker (str | None): The stock ticker symbol (e.g., 'AAPL', 'GOOG').
+        form (constants.SecFilingType | None): Filing type such as 10-K or 10-Q.
+        year (int | None): Year the filings were requested for.
+        limit (int): Maximum number of snippets.
+    """
+    await asyncio.to_thread(search_index.sync)
+    return await asyncio.to_thread(
+        search_index.search, query, ticker=ticker, form=form, year=year, limit=limit
+    )
+
+
+def _find_filing(ticker: str, year: str, filing: str) -> datamodels.MCPResultsPDF:
+    """Finds a stored filing by its name as used in file names (10-K, 10-Q2, 10-KA) or accession number."""
+    for mcp_result in catalog.list_filings(ticker=ticker, year=int(year)):
+        if filing in {
+            mcp_result.filing_name.replace("/A", "A"),
+            mcp_result.accession_num,
+        }:
+            return mcp_result
+    raise ValueError(f"No stored filing {filing} of {ticker} for {year}")
+
+
+def _md_path(mcp_result: datamodels.MCPResultsPDF) -> str:
+    md_path = pathlib.Path(mcp_result.pdf_path).with_suffix(".md")
+    if not md_path.exists():
+        raise ValueError(
+            f"{mcp_result.filing_name} of {mcp_result.ticker} is not converted to markdown yet"
+        )
+    return str(md_path)
+
+
+@mcp.resource(
+    "filing://{ticker}/{year}/{filing}/markdown/pages/{pages}",
+    mime_type="text/markdown",
+)
+async def filing_markdown_pages(ticker: str, year: str, filing: str, pages: str) -> str:
+    """Pages of a converted filing, as "5", "5-9" or "5-" for the rest of the document."""
+    mcp_result = await asyncio.to_thread(_find_filing, ticker, year, filing)
+    return await asyncio.to_thread(
+        filing_ranges.read_markdown_pages, _md_path(mcp_result), pages
+    )
+
+
+@mcp.resource(
+    "filing://{ticker}/{year}/{filing}/markdown/sections/{section}",
+    mime_type="text/markdown",
+)
+async def filing_markdown_section(
+    ticker: str, year: str, filing: str, section: str
+) -> str:
+    """One Item or Part of a converted filing, such as item-7 or item-1a."""
+    mcp_result = await asyncio.to_thread(_find_filing, ticker, year, filing)
+    return await asyncio.to_thread(
+        filing_ranges.read_markdown_section, _md_path(mcp_result), section
+    )
+
+
+@mcp.resource(
+    "filing://{ticker}/{year}/{filing}/markdown/bytes/{byte_range}",
+    mime_type="text/markdown",
+)
+async def filing_markdown_bytes(
+    ticker: str, year: str, filing: str, byte_range: str
+) -> str:
+    """An inclusive byte range of a converted filing, such as 0-65535."""
+    mcp_result = await asyncio.to_thread(_find_filing, ticker, year, filing)
+    return await asyncio.to_thread(
+        filing_ranges.read_markdown_bytes, _md_path(mcp_result), byte_range
+    )
+
+
+@mcp.resource(
+    "filing://{ticker}/{year}/{filing}/pdf/pages/{pages}",
+    mime_type="application/pdf",
+)
+async def filing_pdf_pages(ticker: str, year: str, filing: str, pages: str) -> bytes:
+    """A page range of a stored filing PDF, as a smaller PDF."""
+    mcp_result = await asyncio.to_thread(_find_filing, ticker, year, filing)
+    return await asyncio.to_thread(
+        filing_ranges.extract_pdf_pages, mcp_result.pdf_path, pages
+    )
+
+
+@mcp.resource(
+    "filing://{ticker}/{year}/{filing}/pdf/bytes/{byte_range}",
+    mime_type="application/pdf",
+)
+async def filing_pdf_bytes(
+    ticker: str, year: str, filing: str, byte_range: str
+) -> bytes:
+    """An inclusive byte range of a stored filing PDF."""
+    mcp_result = await asyncio.to_thread(_find_filing, ticker, year, filing)
+    return await asyncio.to_thread(
+        filing_ranges.read_pdf_bytes, mcp_result.pdf_path, byte_range
+    )
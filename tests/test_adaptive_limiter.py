@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+from mcp_sec_filings import adaptive_limiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(adaptive_limiter.time, "monotonic", fake)
+    return fake
+
+
+def _run(limiter, clock, latencies, concurrency, overloaded=False):
+    """Completes `latencies` in batches of `concurrency` slots, or of the whole limit
+    when it is None, and returns the limit after each batch."""
+
+    async def main():
+        limits = []
+        remaining = list(latencies)
+        while remaining:
+            size = concurrency or limiter.current_limit
+            batch, remaining = remaining[:size], remaining[size:]
+            for _ in batch:
+                limiter.inflight += 1
+            for latency in batch:
+                clock.now += latency
+                limiter.release(latency, overloaded)
+            limits.append(limiter.current_limit)
+        return limits
+
+    return asyncio.run(main())
+
+
+def test_limit_grows_while_saturated_and_stays_under_the_ceiling(clock):
+    limiter = adaptive_limiter.AdaptiveLimiter("render", floor=1, ceiling=6, initial=2)
+    limits = _run(limiter, clock, [0.01] * 60, concurrency=None)
+    assert limits[0] == 2
+    assert limits[-1] == 6
+    assert limiter.decreases == 0
+
+
+def test_fast_requests_do_not_pin_the_baseline(clock):
+    limiter = adaptive_limiter.AdaptiveLimiter(
+        "edgar_archive", floor=1, ceiling=10, initial=5
+    )
+    limits = _run(limiter, clock, [0.005] * 10 + [0.08] * 150, concurrency=5)
+    assert min(limits) >= 5
+    assert limiter.decreases == 0
+
+
+def test_latency_jump_cuts_the_limit(clock):
+    limiter = adaptive_limiter.AdaptiveLimiter(
+        "inference", floor=1, ceiling=10, initial=10
+    )
+    _run(limiter, clock, [0.01] * 200, concurrency=10)
+    limits = _run(limiter, clock, [0.1] * 20, concurrency=10)
+    assert limits[-1] < 10
+    assert limiter.decreases >= 1
+
+
+def test_overload_cuts_multiplicatively_down_to_the_floor(clock):
+    limiter = adaptive_limiter.AdaptiveLimiter(
+        "edgar_metadata", floor=2, ceiling=10, initial=10
+    )
+    limits = _run(limiter, clock, [0.05] * 10, concurrency=1, overloaded=True)
+    assert limits[:3] == [7, 4, 3]
+    assert limits[-1] == 2
+    # Cuts at the floor change nothing and are not counted.
+    assert limiter.decreases == 4
+
+
+def test_overloads_within_one_latency_cut_once(clock):
+    limiter = adaptive_limiter.AdaptiveLimiter(
+        "edgar_metadata", floor=1, ceiling=10, initial=10
+    )
+    _run(limiter, clock, [0.05] * 5, concurrency=5)
+    clock.now += 1
+    limiter.inflight += 3
+    for _ in range(3):
+        limiter.release(0.05, overloaded=True)
+    assert limiter.current_limit == 7
+    assert limiter.decreases == 1
+
+
+def test_waiters_are_admitted_in_order_as_slots_free():
+    limiter = adaptive_limiter.AdaptiveLimiter("render", floor=1, ceiling=1, initial=1)
+    order: list[int] = []
+
+    async def work(i: int) -> None:
+        async with limiter.slot():
+            order.append(i)
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(*(work(i) for i in range(4)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3]
+    assert limiter.inflight == 0
+
+
+def test_cancelled_waiters_give_back_their_slot():
+    limiter = adaptive_limiter.AdaptiveLimiter("render", floor=1, ceiling=1, initial=1)
+
+    async def main():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release(0.01)
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+        limiter.release(0.01)
+
+    asyncio.run(main())
+    assert limiter.inflight == 0
+    assert limiter.snapshot().waiting == 0
+
+
+def test_failed_work_counts_as_overload_and_cancelled_work_does_not(clock):
+    limiter = adaptive_limiter.AdaptiveLimiter("render", floor=1, ceiling=8, initial=8)
+
+    async def fail():
+        async with limiter.slot():
+            raise RuntimeError("wkhtmltopdf crashed")
+
+    async def cancelled():
+        async with limiter.slot():
+            raise asyncio.CancelledError
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await fail()
+        clock.now += 10
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled()
+
+    asyncio.run(main())
+    assert limiter.current_limit == 5
+    assert limiter.decreases == 1
+    assert limiter.inflight == 0
+
+
+def test_get_limiter_reads_env_overrides(monkeypatch):
+    monkeypatch.setenv("ADAPTIVE_RENDER_CEILING", "3")
+
+    async def main():
+        return adaptive_limiter.get_limiter("render", ceiling=16, initial=8)
+
+    limiter = asyncio.run(main())
+    assert (limiter.floor, limiter.ceiling, limiter.current_limit) == (1, 3, 3)
+
+
+def test_http_resource_classes():
+    from mcp_sec_filings import http_client
+
+    assert (
+        http_client.resource_class(
+            "https://www.sec.gov/Archives/edgar/data/320193/000032019324000123/aapl-20240928.htm"
+        )
+        == "edgar_archive"
+    )
+    assert (
+        http_client.resource_class(
+            "https://data.sec.gov/submissions/CIK0000320193.json"
+        )
+        == "edgar_metadata"
+    )
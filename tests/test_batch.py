@@ -0,0 +1,52 @@
+import pydantic
+import pytest
+
+from mcp_sec_filings import batch, datamodels
+
+
+def _spec(**fields) -> datamodels.BatchFilingsSpec:
+    return datamodels.BatchFilingsSpec(**{"filing_types": ["10-K"], **fields})
+
+
+def test_plan_merges_specs_into_one_unit_per_ticker_and_year():
+    specs = [
+        _spec(ticker="aapl", year_range="2022-2023"),
+        _spec(ticker="AAPL", year=2023, filing_types=["10-Q"], include_amends=True),
+        _spec(ticker="msft", year=2023),
+    ]
+    items, work = batch._plan(specs)
+    assert [(spec.ticker, year) for spec, year in items] == [
+        ("AAPL", 2022),
+        ("AAPL", 2023),
+        ("AAPL", 2023),
+        ("MSFT", 2023),
+    ]
+    assert set(work) == {("AAPL", 2022), ("AAPL", 2023), ("MSFT", 2023)}
+    assert work[("AAPL", 2023)].filing_types == {"10-K", "10-Q"}
+    assert work[("AAPL", 2023)].include_amends
+    assert not work[("AAPL", 2022)].include_amends
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"year_range": "2020"},
+        {"year_range": "2023-2020"},
+        {"year": 2020, "year_range": "2020-2021"},
+        {},
+    ],
+)
+def test_spec_rejects_invalid_years(fields):
+    with pytest.raises(pydantic.ValidationError):
+        _spec(ticker="AAPL", **fields)
+
+
+def test_spec_years_come_from_the_validated_range():
+    assert _spec(ticker="AAPL", year=2021).years() == [2021]
+    spec = _spec(ticker="AAPL", year_range=" 2020 - 2022 ")
+    assert spec.years() == [2020, 2021, 2022]
+    assert datamodels.BatchFilingsSpec.model_validate(spec.model_dump()).years() == [
+        2020,
+        2021,
+        2022,
+    ]
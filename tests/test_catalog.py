@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from mcp_sec_filings import catalog, constants, datamodels, filing_store
+
+
+@pytest.fixture
+def filings_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(constants, "CATALOG_PATH", str(tmp_path / "catalog.sqlite3"))
+    monkeypatch.setattr(constants, "BASE_DIR", str(tmp_path))
+    base_path = tmp_path / "TEST" / "2024"
+    base_path.mkdir(parents=True)
+    return base_path
+
+
+def _store(base_path, number: int, filing_name: str = "10-K"):
+    """Writes a PDF and its complete manifest entry the way `store_single_filing` does."""
+    accession_num = f"0000000001-24-00000{number}"
+    pdf_path = str(base_path / f"filing{number}-{filing_name}.pdf")
+    filing_store.atomic_write_bytes(pdf_path, b"%PDF-1.4")
+    manifest = filing_store.load_manifest(str(base_path))
+    manifest[accession_num] = datamodels.ManifestEntry(
+        accession_num=accession_num,
+        filing_name=filing_name,
+        html_url=f"https://www.sec.gov/Archives/edgar/data/1/filing{number}.htm",
+        html_path=filing_store.html_path_for(pdf_path),
+        pdf_path=pdf_path,
+        status="complete",
+        updated_at=filing_store.now_isoformat(),
+    )
+    filing_store.save_manifest(str(base_path), manifest)
+    return datamodels.MCPResultsPDF(
+        ticker="TEST",
+        html_url=manifest[accession_num].html_url,
+        filing_name=filing_name,
+        accession_num=accession_num,
+        pdf_path=pdf_path,
+    )
+
+
+def _touch(path: str) -> None:
+    mtime = os.path.getmtime(path) + 10
+    os.utime(path, (mtime, mtime))
+
+
+def test_missing_pdfs_are_dropped(filings_dir):
+    results = [_store(filings_dir, n) for n in (1, 2)]
+    catalog.record_filings(results, 2024)
+    os.remove(results[0].pdf_path)
+    assert catalog.list_filings() == [results[1]]
+    # The row is gone, not only hidden from this listing.
+    assert [r for r, _, _ in catalog.list_filings_with_form_year()] == [results[1]]
+
+
+def test_changed_pdfs_are_re_read_from_the_manifest(filings_dir):
+    result = _store(filings_dir, 1, filing_name="10-Q1")
+    catalog.record_filings([result], 2024)
+
+    # The filing was stored again as an amendment to the same PDF path.
+    manifest = filing_store.load_manifest(str(filings_dir))
+    entry = manifest[result.accession_num]
+    manifest[result.accession_num] = entry.model_copy(
+        update={"html_url": entry.html_url.replace(".htm", "a.htm")}
+    )
+    filing_store.save_manifest(str(filings_dir), manifest)
+    _touch(result.pdf_path)
+
+    [listed] = catalog.list_filings()
+    assert listed.html_url.endswith("filing1a.htm")
+    assert catalog.list_filings(form="10-Q") == [listed]
+
+
+def test_changed_pdfs_without_a_complete_manifest_entry_are_dropped(filings_dir):
+    result = _store(filings_dir, 1)
+    catalog.record_filings([result], 2024)
+    manifest = filing_store.load_manifest(str(filings_dir))
+    manifest[result.accession_num].status = "failed"
+    filing_store.save_manifest(str(filings_dir), manifest)
+    _touch(result.pdf_path)
+
+    assert catalog.list_filings() == []
+    assert catalog.list_filings_with_form_year() == []
+
+
+def test_listing_is_paged(filings_dir):
+    results = [_store(filings_dir, n) for n in range(1, 6)]
+    catalog.record_filings(results, 2024)
+    pages = [catalog.list_filings(limit=2, offset=offset) for offset in (0, 2, 4)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(r.pdf_path for page in pages for r in page) == sorted(
+        r.pdf_path for r in results
+    )
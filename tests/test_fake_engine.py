@@ -0,0 +1,44 @@
+import asyncio
+
+from PIL import Image
+
+from benchmarks import fake_engine
+
+
+async def _generate(engine, image, request_id: str) -> str:
+    prompt = {"prompt": "", "multi_modal_data": {"image": image}}
+    async for output in engine.generate(prompt, None, request_id):
+        last = output
+    return last.outputs[0].text
+
+
+def test_same_page_gives_the_same_doctags():
+    page = Image.new("RGB", (100, 130), "white")
+    other_page = Image.new("RGB", (100, 130), "black")
+
+    async def main():
+        engine = fake_engine.FakeAsyncLLMEngine(base_latency_s=0, per_token_s=0)
+        return [
+            await _generate(engine, image, str(n))
+            for n, image in enumerate([page, page.copy(), other_page])
+        ]
+
+    first, again, other = asyncio.run(main())
+    assert first == again
+    assert first != other
+    assert first.startswith("<doctag>")
+
+
+def test_requests_beyond_the_batch_wait_for_a_slot():
+    engine = fake_engine.FakeAsyncLLMEngine(
+        base_latency_s=0.05, per_token_s=0, max_batch=2
+    )
+    page = Image.new("RGB", (100, 130), "white")
+
+    async def main():
+        await asyncio.gather(*(_generate(engine, page, str(n)) for n in range(4)))
+
+    asyncio.run(main())
+    # Two batches of two, the second waits for the first.
+    assert sorted(engine.latencies)[-1] >= 0.1
+    assert sorted(engine.latencies)[0] < 0.09
@@ -0,0 +1,71 @@
+from mcp_sec_filings import constants, filing_ranges
+
+PAGES = [
+    "# ACME Corp\n\n## PART I\n\n## Item 1. Business\n\nWe make anvils.",
+    "## Item 1A. Risk Factors\n\nAnvils are heavy.",
+    "**Item 7. Management's Discussion and Analysis**\n\nRevenue grew.",
+    "Item 8. Financial Statements\n\n| Revenue | 1,000 |",
+]
+
+
+def _write_filing(tmp_path, pages=PAGES):
+    md = constants.PAGE_BREAK.join(pages)
+    md_path = tmp_path / "filing.md"
+    md_path.write_text(md, encoding="utf-8")
+    filing_ranges.save_offset_table(str(md_path), md)
+    return str(md_path)
+
+
+def test_section_key():
+    assert filing_ranges.section_key("ITEM 1A - Risk Factors") == "item-1a"
+    assert filing_ranges.section_key("Part II") == "part-ii"
+    assert filing_ranges.section_key("Revenue") is None
+
+
+def test_offset_table_pages_exclude_page_breaks():
+    buffer = constants.PAGE_BREAK.join(PAGES).encode("utf-8")
+    table = filing_ranges.build_offset_table(buffer)
+    assert [buffer[start:end].decode() for start, end in table["pages"]] == PAGES
+
+
+def test_offset_table_finds_headings_at_the_top_of_a_page():
+    buffer = constants.PAGE_BREAK.join(PAGES).encode("utf-8")
+    sections = filing_ranges.build_offset_table(buffer)["sections"]
+    assert [(s["key"], s["page"]) for s in sections] == [
+        ("part-i", 1),
+        ("item-1", 1),
+        ("item-1a", 2),
+        ("item-7", 3),
+        ("item-8", 4),
+    ]
+    # Headings stop at the page break instead of running into the next page.
+    assert sections[-1]["heading"] == "Item 8. Financial Statements"
+
+
+def test_read_markdown_section_ends_at_the_next_heading(tmp_path):
+    md_path = _write_filing(tmp_path)
+    section = filing_ranges.read_markdown_section(md_path, "Item 7")
+    assert section.startswith("**Item 7. Management's Discussion and Analysis**")
+    assert "Revenue grew." in section
+    assert "Item 8" not in section
+    assert "Anvils" not in filing_ranges.read_markdown_section(md_path, "item-1")
+
+
+def test_read_markdown_section_prefers_the_longest_occurrence(tmp_path):
+    pages = ["Item 7. MD&A\n\nItem 8. Financials", *PAGES[2:]]
+    md_path = _write_filing(tmp_path, pages)
+    assert "Revenue grew." in filing_ranges.read_markdown_section(md_path, "item-7")
+
+
+def test_read_markdown_pages(tmp_path):
+    md_path = _write_filing(tmp_path)
+    assert filing_ranges.read_markdown_pages(md_path, "2") == PAGES[1]
+    assert filing_ranges.read_markdown_pages(md_path, "3-4") == "\n\n".join(PAGES[2:])
+
+
+def test_stale_offset_table_is_rebuilt(tmp_path):
+    md_path = _write_filing(tmp_path)
+    pathlib_md = tmp_path / "filing.md"
+    pathlib_md.write_text("Item 9. Controls", encoding="utf-8")
+    table = filing_ranges.load_offset_table(md_path)
+    assert [s["key"] for s in table["sections"]] == ["item-9"]
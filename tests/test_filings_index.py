@@ -0,0 +1,151 @@
+import asyncio
+import random
+
+import pytest
+
+from mcp_sec_filings import filings_index
+
+FORMS = ["10-K", "10-K/A", "10-Q", "10-Q/A", "8-K", "S-1"]
+
+
+def _columns(rows: int, seed: int) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    columns: dict[str, list[str]] = {
+        "accessionNumber": [],
+        "form": [],
+        "filingDate": [],
+        "reportDate": [],
+    }
+    for i in range(rows):
+        year = rng.randint(2015, 2024)
+        month = rng.randint(1, 12)
+        report_date = f"{year}-{month:02d}-{rng.randint(1, 28):02d}"
+        form = rng.choice(FORMS)
+        if form == "8-K" and rng.random() < 0.3:
+            report_date = ""
+        columns["accessionNumber"].append(f"0000320193-{year % 100:02d}-{i:06d}")
+        columns["form"].append(form)
+        columns["filingDate"].append(f"{year + (month == 12)}-{month % 12 + 1:02d}-15")
+        columns["reportDate"].append(report_date)
+    return columns
+
+
+def _row_loop(columns, year, filing_types):
+    """The row by row selection the columnar table replaced."""
+    selected = []
+    names: list[str] = []
+    for accession_num, form, filing_date, report_date in zip(
+        columns["accessionNumber"],
+        columns["form"],
+        columns["filingDate"],
+        columns["reportDate"],
+    ):
+        if form not in filing_types or not report_date.startswith(str(year)):
+            continue
+        filing_name = form
+        if form == "10-Q":
+            filing_name += str((int(report_date[5:7]) - 1) // 3 + 1)
+            if filing_name in names:
+                filing_name += "-1"
+        selected.append((accession_num, filing_name, filing_date, report_date))
+        names.append(filing_name)
+    return selected
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize(
+    "filing_types",
+    [["10-K"], ["10-Q"], ["10-K", "10-Q", "8-K"], ["10-K/A", "10-Q/A", "S-1"]],
+)
+def test_select_matches_the_row_loop(seed, filing_types):
+    columns = _columns(400, seed)
+    table = filings_index.FilingsTable.from_columns(columns)
+    for year in range(2014, 2026):
+        selected = [
+            (
+                elem.accession_num,
+                elem.filing_name,
+                elem.filing_date,
+                elem.report_date,
+            )
+            for elem in table.select(year, filing_types)
+        ]
+        assert selected == _row_loop(columns, year, filing_types)
+
+
+def test_partitions_and_concat_keep_duplicate_suffixes():
+    columns = _columns(300, 7)
+    table = filings_index.FilingsTable.from_columns(columns)
+    half = len(table) // 2
+    first = table.take(slice(0, half))
+    second = table.take(slice(half, None))
+    merged = first.concat(second)
+    for year, partition in merged.partition_by_year().items():
+        assert partition.select(year, ["10-Q"]) == table.select(year, ["10-Q"])
+
+
+def _filing(accession_num: str, form: str, filing_date: str, report_date: str):
+    return {
+        "accessionNumber": [accession_num],
+        "form": [form],
+        "filingDate": [filing_date],
+        "reportDate": [report_date],
+    }
+
+
+def test_older_shards_are_fetched_only_for_years_before_recent(monkeypatch):
+    shards = {
+        "CIK0000000001-submissions-001.json": _filing(
+            "0000000001-20-000001", "10-K", "2020-02-01", "2019-12-31"
+        ),
+        "CIK0000000001-submissions-002.json": _filing(
+            "0000000001-16-000001", "10-K", "2016-02-01", "2015-12-31"
+        ),
+    }
+    fetched: list[str] = []
+
+    class FakeCache:
+        async def get(self, url):
+            fetched.append(url.rsplit("/", 1)[-1])
+            return shards[url.rsplit("/", 1)[-1]]
+
+    monkeypatch.setattr(filings_index.submissions, "submissions_cache", FakeCache())
+    index = filings_index.FilingsIndex(
+        "0000000001",
+        {
+            "filings": {
+                "recent": {
+                    "accessionNumber": ["0000000001-22-000001", "0000000001-20-000002"],
+                    "form": ["10-K", "10-Q"],
+                    "filingDate": ["2022-02-01", "2020-06-01"],
+                    "reportDate": ["2021-12-31", "2020-03-31"],
+                },
+                "files": [
+                    {
+                        "name": "CIK0000000001-submissions-001.json",
+                        "filingFrom": "2018-01-01",
+                        "filingTo": "2020-05-31",
+                    },
+                    {
+                        "name": "CIK0000000001-submissions-002.json",
+                        "filingFrom": "2010-01-01",
+                        "filingTo": "2017-12-31",
+                    },
+                ],
+            }
+        },
+    )
+
+    async def select(year):
+        await index.ensure_year(year)
+        return [elem.accession_num for elem in index.select(year, ["10-K"])]
+
+    assert asyncio.run(select(2021)) == ["0000000001-22-000001"]
+    assert fetched == []
+    assert asyncio.run(select(2019)) == ["0000000001-20-000001"]
+    assert fetched == ["CIK0000000001-submissions-001.json"]
+    # Loaded shards are not fetched again.
+    asyncio.run(select(2019))
+    assert fetched == ["CIK0000000001-submissions-001.json"]
+    assert asyncio.run(select(2015)) == ["0000000001-16-000001"]
+    assert fetched[-1] == "CIK0000000001-submissions-002.json"
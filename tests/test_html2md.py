@@ -0,0 +1,52 @@
+from mcp_sec_filings import constants, html2md
+
+
+def _markdown(html: str) -> str:
+    converter = html2md.HTMLToMarkdown()
+    converter.feed(html)
+    converter.close()
+    return converter.markdown()
+
+
+def test_financial_table_headers_stay_above_their_columns():
+    html = (
+        "<table>"
+        "<tr><td></td><td>2024</td><td></td><td>2023</td></tr>"
+        "<tr><td></td><td></td><td></td></tr>"
+        "<tr><td>Revenue</td><td>$</td><td>1,000</td><td></td><td>$</td><td>900</td></tr>"
+        "<tr><td>Net (loss)</td><td>(</td><td>12</td><td>)</td><td></td><td>5</td><td>%</td></tr>"
+        "</table>"
+    )
+    assert _markdown(html) == (
+        "|  | 2024 | 2023 |\n"
+        "| --- | --- | --- |\n"
+        "| Revenue | $1,000 | $900 |\n"
+        "| Net (loss) | (12) | 5% |"
+    )
+
+
+def test_layout_tables_become_paragraphs():
+    html = (
+        "<table><tr><td></td><td>First paragraph.</td></tr>"
+        "<tr><td>Second paragraph.</td></tr></table>"
+    )
+    assert _markdown(html) == "First paragraph.\n\nSecond paragraph."
+
+
+def test_pipes_in_cells_are_escaped():
+    html = "<table><tr><td>A|B</td><td>1</td></tr></table>"
+    assert _markdown(html) == "| A\\|B | 1 |\n| --- | --- |"
+
+
+def test_section_headings_and_page_breaks():
+    html = (
+        "<p>Item 1. Business</p><p>We make anvils.</p>"
+        '<hr style="page-break-after: always"/>'
+        "<p><b>ITEM 7. MANAGEMENT'S DISCUSSION</b></p>"
+        '<div style="display:none">hidden</div>'
+    )
+    pages = _markdown(html).split(constants.PAGE_BREAK)
+    assert pages == [
+        "## Item 1. Business\n\nWe make anvils.",
+        "## ITEM 7. MANAGEMENT'S DISCUSSION",
+    ]
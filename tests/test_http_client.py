@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from mcp_sec_filings import adaptive_limiter, http_client
+
+RATE = 50.0
+
+
+@pytest.fixture
+def fake_edgar(monkeypatch):
+    """Routes `sec_get` to an in-process handler, one token bucket of `RATE` per test."""
+    state = {}
+
+    def install(handler, rate=RATE, burst=1):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        state["limiter"] = http_client.RateLimiter(rate=rate, burst=burst)
+        monkeypatch.setattr(
+            http_client, "get_client", lambda: (client, state["limiter"])
+        )
+        return client
+
+    return install
+
+
+def test_requests_queued_on_slots_do_not_burst_past_the_rate(fake_edgar):
+    sent: list[float] = []
+    gate = asyncio.Event()
+
+    async def handler(request):
+        sent.append(time.monotonic())
+        if len(sent) <= 4:
+            # Hold every slot so the other requests queue behind them.
+            await gate.wait()
+        return httpx.Response(200, text="ok")
+
+    async def main():
+        client = fake_edgar(handler)
+        adaptive_limiter.get_limiter("edgar_archive", floor=4, ceiling=4, initial=4)
+        url = "https://www.sec.gov/Archives/edgar/data/1/filing.htm"
+        requests = [asyncio.create_task(http_client.sec_get(url)) for _ in range(16)]
+        await asyncio.sleep(0.3)
+        gate.set()
+        responses = await asyncio.gather(*requests)
+        await client.aclose()
+        return responses
+
+    responses = asyncio.run(main())
+    assert all(response.status_code == 200 for response in responses)
+    # Any 5 consecutive sends span at least 4 token intervals, less scheduling jitter.
+    spans = [later - earlier for earlier, later in zip(sent, sent[4:])]
+    assert min(spans) >= 3 / RATE
+
+
+def test_token_bucket_holds_the_rate_after_the_burst():
+    async def main():
+        limiter = http_client.RateLimiter(rate=100, burst=5)
+        times = []
+        for _ in range(25):
+            await limiter.acquire()
+            times.append(time.monotonic())
+        return times
+
+    times = asyncio.run(main())
+    assert times[4] - times[0] < 0.05
+    # Past the burst, tokens only come at the refill rate.
+    assert times[-1] - times[4] >= 20 / 100 * 0.95
+
+
+def test_retry_after_sets_the_retry_delay():
+    response = httpx.Response(429, headers={"Retry-After": "7"})
+    assert http_client._retry_delay(0, response) == 7.0
+    # Without a usable Retry-After the delay is a jittered exponential backoff.
+    for attempt in range(3):
+        backoff = http_client.constants.SEC_BACKOFF_BASE_SECONDS * 2**attempt
+        delay = http_client._retry_delay(attempt, httpx.Response(503))
+        assert backoff <= delay <= backoff * 1.5
+
+
+def test_overloaded_responses_are_retried(fake_edgar, monkeypatch):
+    statuses = iter([429, 503, 200])
+    monkeypatch.setattr(http_client, "_retry_delay", lambda attempt, response: 0.0)
+
+    async def handler(request):
+        return httpx.Response(next(statuses), headers={"Retry-After": "0"})
+
+    async def main():
+        client = fake_edgar(handler)
+        response = await http_client.sec_get("https://data.sec.gov/submissions/x")
+        await client.aclose()
+        return response
+
+    assert asyncio.run(main()).status_code == 200
+    assert next(statuses, None) is None
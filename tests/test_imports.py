@@ -0,0 +1,38 @@
+import os
+import pathlib
+import subprocess
+import sys
+
+HEAVY_MODULES = [
+    "numpy",
+    "pandas",
+    "pdfkit",
+    "pdf2image",
+    "pypdfium2",
+    "torch",
+    "transformers",
+    "vllm",
+    "docling",
+]
+
+PACKAGE_ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def test_importing_the_pipeline_skips_heavy_modules_and_side_effects(tmp_path):
+    code = (
+        "import sys\n"
+        "from mcp_sec_filings import batch, docling_vllm, markdown_engine, pdf2md, sec_filings\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": str(PACKAGE_ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+    # Importing does not create the filings directory.
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,48 @@
+import asyncio
+
+from mcp_sec_filings import datamodels, markdown_engine, pdf2md
+
+
+def _mcp_result(pdf_path: str) -> datamodels.MCPResultsPDF:
+    return datamodels.MCPResultsPDF(
+        ticker="TEST",
+        html_url="https://www.sec.gov/filing.htm",
+        filing_name="10-K",
+        pdf_path=pdf_path,
+    )
+
+
+def test_submitting_a_pdf_in_flight_reuses_its_job(tmp_path, monkeypatch):
+    monkeypatch.setenv("PAGE_CACHE_MAX_BYTES", "0")
+    conversions: list[str] = []
+    release = asyncio.Event
+
+    async def main():
+        finish = release()
+
+        async def convert(page_scheduler, page_budget, mcpresult_pdf, resume=True):
+            conversions.append(mcpresult_pdf.pdf_path)
+            await finish.wait()
+            return []
+
+        monkeypatch.setattr(pdf2md, "convert_single_pdf_to_markdown", convert)
+        engine = markdown_engine.MarkdownEngine(backend="vllm")
+        pdf_path = str(tmp_path / "filing.pdf")
+        try:
+            [first] = engine.submit([_mcp_result(pdf_path)])
+            [second] = engine.submit([_mcp_result(pdf_path)])
+            await asyncio.sleep(0)
+            finish.set()
+            while engine.get(first.job_id).status != "complete":
+                await asyncio.sleep(0)
+            [third] = engine.submit([_mcp_result(pdf_path)])
+            while engine.get(third.job_id).status != "complete":
+                await asyncio.sleep(0)
+        finally:
+            await engine.close()
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    assert second.job_id == first.job_id
+    assert third.job_id != first.job_id
+    assert len(conversions) == 2
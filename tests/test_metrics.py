@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+from mcp_sec_filings import metrics
+
+_NAME = r"[a-zA-Z_:][a-zA-Z0-9_:]*"
+_LABEL = rf'[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*"'
+_SAMPLE_RE = re.compile(
+    rf"^(?P<name>{_NAME})(?:\{{(?P<labels>{_LABEL}(?:,{_LABEL})*)\}})? "
+    r"(?P<value>[+-]Inf|NaN|-?\d+(?:\.\d+)?(?:e[+-]?\d+)?)$"
+)
+_HELP_RE = re.compile(rf"^# HELP (?P<name>{_NAME}) .+$")
+_TYPE_RE = re.compile(
+    rf"^# TYPE (?P<name>{_NAME}) (?P<kind>counter|gauge|histogram|summary|untyped)$"
+)
+
+
+@pytest.fixture
+def recording():
+    metrics.reset()
+    metrics.set_enabled(True)
+    yield
+    metrics.set_enabled(False)
+    metrics.reset()
+
+
+def _parse(text: str) -> dict[str, tuple[str, list[tuple[str, str, float]]]]:
+    """Parses exposition text into family -> (type, samples), failing on any invalid line."""
+    assert text.endswith("\n")
+    families: dict[str, tuple[str, list[tuple[str, str, float]]]] = {}
+    current = None
+    for line in text.splitlines():
+        if match := _HELP_RE.match(line):
+            assert match["name"] not in families, f"Family declared twice: {line}"
+            continue
+        if match := _TYPE_RE.match(line):
+            current = match["name"]
+            families[current] = (match["kind"], [])
+            continue
+        match = _SAMPLE_RE.match(line)
+        assert match is not None, f"Invalid sample line: {line!r}"
+        assert current is not None and (
+            match["name"] == current
+            or match["name"]
+            in {f"{current}_bucket", f"{current}_sum", f"{current}_count"}
+        ), f"Sample outside of its family: {line!r}"
+        families[current][1].append(
+            (match["name"], match["labels"] or "", float(match["value"]))
+        )
+    return families
+
+
+def test_rendered_metrics_are_valid_prometheus_text(recording):
+    metrics.inc("sec_http_requests_total", status=200)
+    metrics.inc("sec_http_requests_total", status=200)
+    metrics.inc("sec_http_requests_total", status='odd "label"\nvalue')
+    metrics.set_gauge("pdf2md_queue_depth", 3)
+    metrics.set_gauge("pdf2md_pages_per_second", 1.25)
+    for value in (0.003, 0.2, 0.2, 1000.0):
+        metrics.observe("sec_render_seconds", value)
+    with metrics.span("pdf2md_rasterize"):
+        pass
+
+    families = _parse(metrics.render_prometheus())
+
+    kind, samples = families["sec_http_requests_total"]
+    assert kind == "counter"
+    assert ("sec_http_requests_total", 'status="200"', 2.0) in samples
+    assert (
+        "sec_http_requests_total",
+        'status="odd \\"label\\"\\nvalue"',
+        1.0,
+    ) in samples
+    assert families["pdf2md_queue_depth"] == (
+        "gauge",
+        [("pdf2md_queue_depth", "", 3.0)],
+    )
+
+    kind, samples = families["sec_render_seconds"]
+    assert kind == "histogram"
+    buckets = [value for name, _, value in samples if name.endswith("_bucket")]
+    assert buckets == sorted(buckets), "Bucket counts must be cumulative"
+    assert samples[-3] == ("sec_render_seconds_bucket", 'le="+Inf"', 4.0)
+    assert samples[-2][0] == "sec_render_seconds_sum"
+    assert samples[-2][2] == pytest.approx(1000.403)
+    assert samples[-1] == ("sec_render_seconds_count", "", 4.0)
+
+    _, samples = families["pdf2md_rasterize_seconds"]
+    assert samples[-1] == ("pdf2md_rasterize_seconds_count", 'outcome="ok"', 1.0)
+
+
+def test_nothing_is_recorded_while_disabled():
+    metrics.reset()
+    metrics.inc("sec_http_requests_total", status=200)
+    metrics.observe("sec_render_seconds", 0.1)
+    assert metrics.render_prometheus() == "\n"
@@ -0,0 +1,58 @@
+import asyncio
+import os
+
+from PIL import Image
+
+from mcp_sec_filings import page_cache
+
+
+def _age(cache, key: str, mtime: float) -> None:
+    os.utime(cache._path(key), (mtime, mtime))
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    cache = page_cache.PageCache(str(tmp_path), max_bytes=100)
+    for age, key in enumerate(["aa01", "bb02", "cc03"], start=1):
+        cache.put(key, "x" * 30)
+        _age(cache, key, 1000.0 * age)
+    # Reading the oldest entry makes it the most recently used one.
+    assert cache.get("aa01") == "x" * 30
+
+    cache.put("dd04", "x" * 30)
+
+    assert cache.get("bb02") is None
+    assert [cache.get(key) is not None for key in ["aa01", "cc03", "dd04"]] == [
+        True,
+        True,
+        True,
+    ]
+    assert cache._current_size() <= 90
+
+
+def test_cache_keys_depend_on_the_page_and_the_model():
+    page = Image.new("RGB", (200, 260), "white")
+    other_page = page.copy()
+    other_page.paste("black", (20, 20, 180, 60))
+    key = page_cache.page_cache_key(page, "model", "prompt")
+    assert page_cache.page_cache_key(page.copy(), "model", "prompt") == key
+    assert page_cache.page_cache_key(other_page, "model", "prompt") != key
+    assert page_cache.page_cache_key(page, "model:transformers", "prompt") != key
+
+
+def test_cache_hits_skip_the_converter(tmp_path):
+    cache = page_cache.PageCache(str(tmp_path), max_bytes=1 << 20)
+    converted: list[Image.Image] = []
+
+    async def convert_page(image):
+        converted.append(image)
+        return "markdown"
+
+    convert = page_cache.cached_converter(convert_page, cache, model_name="model")
+    page = Image.new("RGB", (200, 260), "white")
+
+    async def main():
+        return [await convert(page.copy()) for _ in range(3)]
+
+    assert asyncio.run(main()) == ["markdown"] * 3
+    assert len(converted) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
@@ -0,0 +1,131 @@
+import asyncio
+import sys
+import types
+
+import pytest
+from PIL import Image
+
+from mcp_sec_filings import datamodels, pdf2md, scheduler
+
+
+@pytest.fixture
+def fake_pdf2image(monkeypatch):
+    """Stand-in for pdf2image where every PDF has 4 pages and paths containing "corrupt" fail to rasterize."""
+    module = types.ModuleType("pdf2image")
+
+    def pdfinfo_from_path(pdf_path):
+        return {"Pages": 4}
+
+    def convert_from_path(pdf_path, first_page, last_page, **_):
+        if "corrupt" in pdf_path:
+            raise RuntimeError("Syntax Error: Couldn't find trailer dictionary")
+        images = []
+        for page_number in range(first_page, last_page + 1):
+            image = Image.new("RGB", (8, 8))
+            image.info["page"] = page_number
+            images.append(image)
+        return images
+
+    module.pdfinfo_from_path = pdfinfo_from_path
+    module.convert_from_path = convert_from_path
+    monkeypatch.setitem(sys.modules, "pdf2image", module)
+    return module
+
+
+def _mcp_result(tmp_path, name: str) -> datamodels.MCPResultsPDF:
+    return datamodels.MCPResultsPDF(
+        ticker="TEST",
+        html_url=f"https://www.sec.gov/{name}.htm",
+        filing_name="10-K",
+        pdf_path=str(tmp_path / f"{name}.pdf"),
+    )
+
+
+async def _convert(page_scheduler, page_budget, mcp_result):
+    return await asyncio.wait_for(
+        pdf2md.convert_single_pdf_to_markdown(
+            page_scheduler, page_budget, mcp_result, use_text_layer=False
+        ),
+        timeout=5,
+    )
+
+
+def test_failed_rasterization_releases_page_budget(tmp_path, fake_pdf2image):
+    async def convert_page(image):
+        return "page"
+
+    async def main():
+        page_budget = pdf2md.PageBudget(8)
+        async with scheduler.PageScheduler(
+            convert_page, max_inflight=2, max_queued=8
+        ) as page_scheduler:
+            for name in ["corrupt-1", "corrupt-2"]:
+                with pytest.raises(RuntimeError):
+                    await _convert(
+                        page_scheduler, page_budget, _mcp_result(tmp_path, name)
+                    )
+            failed_pages = await _convert(
+                page_scheduler, page_budget, _mcp_result(tmp_path, "good")
+            )
+        return page_budget, failed_pages
+
+    page_budget, failed_pages = asyncio.run(main())
+    assert failed_pages == []
+    assert (tmp_path / "good.md").read_text() == "---Page Break---".join(["page"] * 4)
+    assert page_budget._semaphore._value == 8
+
+
+def test_closing_rasterize_pages_early_releases_unyielded_pages(fake_pdf2image):
+    async def main():
+        page_budget = pdf2md.PageBudget(8)
+        pages = pdf2md.rasterize_pages("filing.pdf", [1, 2, 3, 4], page_budget)
+        page_number, image = await anext(pages)
+        await pages.aclose()
+        # The yielded page is the consumer's to release.
+        held = 8 - page_budget._semaphore._value
+        page_budget.release()
+        return page_number, held
+
+    assert asyncio.run(main()) == (1, 1)
+
+
+def test_resolve_backend_name_rejects_unknown_backends(monkeypatch):
+    monkeypatch.setenv("INFERENCE_BACKEND", "transformer")
+    with pytest.raises(ValueError, match="transformer"):
+        pdf2md.resolve_backend_name()
+    monkeypatch.setenv("INFERENCE_BACKEND", "transformers")
+    assert pdf2md.resolve_backend_name() == "transformers"
+    assert pdf2md.resolve_backend_name("vllm") == "vllm"
+
+
+def test_resume_reconverts_only_the_failed_page(tmp_path, fake_pdf2image):
+    converted: list[int] = []
+    failing = {2}
+
+    async def convert_page(image):
+        page_number = image.info["page"]
+        converted.append(page_number)
+        if page_number in failing:
+            raise RuntimeError("CUDA out of memory")
+        return f"page {page_number}"
+
+    async def run():
+        async with scheduler.PageScheduler(
+            convert_page, max_inflight=2, max_queued=8
+        ) as page_scheduler:
+            return await _convert(
+                page_scheduler, pdf2md.PageBudget(8), _mcp_result(tmp_path, "filing")
+            )
+
+    assert asyncio.run(run()) == [2]
+    assert sorted(converted) == [1, 2, 3, 4]
+    assert (tmp_path / "filing.pages.jsonl").exists()
+
+    converted.clear()
+    failing.clear()
+    assert asyncio.run(run()) == []
+    assert converted == [2]
+    assert (tmp_path / "filing.md").read_text() == "---Page Break---".join(
+        f"page {page_number}" for page_number in range(1, 5)
+    )
+    assert not (tmp_path / "filing.pages.jsonl").exists()
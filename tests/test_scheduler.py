@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+from PIL import Image
+
+from mcp_sec_filings import adaptive_limiter, scheduler
+
+
+def _image(tag: str) -> Image.Image:
+    image = Image.new("RGB", (4, 4))
+    image.info["tag"] = tag
+    return image
+
+
+def test_pages_of_shorter_documents_are_served_first():
+    converted: list[str] = []
+
+    async def convert_page(image):
+        converted.append(image.info["tag"])
+        return image.info["tag"]
+
+    async def main():
+        page_scheduler = scheduler.PageScheduler(
+            convert_page, max_inflight=1, max_queued=16
+        )
+        completed: list[str] = []
+        long_done = page_scheduler.add_document(
+            "long", 3, on_complete=lambda document_id, _: completed.append(document_id)
+        )
+        short_done = page_scheduler.add_document(
+            "short", 1, on_complete=lambda document_id, _: completed.append(document_id)
+        )
+        for page_number in (1, 2, 3):
+            await page_scheduler.submit_page(
+                "long", page_number, _image(f"long-{page_number}")
+            )
+        await page_scheduler.submit_page("short", 1, _image("short-1"))
+        page_scheduler.seal_document("long")
+        page_scheduler.seal_document("short")
+        async with page_scheduler:
+            results = await asyncio.gather(long_done, short_done)
+        return completed, results
+
+    completed, (long_pages, short_pages) = asyncio.run(main())
+    assert converted == ["short-1", "long-1", "long-2", "long-3"]
+    assert completed == ["short", "long"]
+    assert long_pages == {1: "long-1", 2: "long-2", 3: "long-3"}
+    assert short_pages == {1: "short-1"}
+
+
+def test_failed_pages_resolve_to_none_and_release_their_slot():
+    released: list[int] = []
+    pages_seen: list[tuple[int, str | None]] = []
+
+    async def convert_page(image):
+        if image.info["tag"] == "bad":
+            raise RuntimeError("CUDA out of memory")
+        return "ok"
+
+    async def main():
+        async with scheduler.PageScheduler(
+            convert_page, max_inflight=2, max_queued=1
+        ) as page_scheduler:
+            done = page_scheduler.add_document(
+                "doc",
+                3,
+                on_page=lambda page_number, md: pages_seen.append((page_number, md)),
+            )
+            for page_number, tag in enumerate(["ok", "bad", "ok"], start=1):
+                await page_scheduler.submit_page(
+                    "doc",
+                    page_number,
+                    _image(tag),
+                    release=lambda page_number=page_number: released.append(
+                        page_number
+                    ),
+                )
+            page_scheduler.seal_document("doc")
+            return await asyncio.wait_for(done, timeout=5)
+
+    pages = asyncio.run(main())
+    assert pages == {1: "ok", 2: None, 3: "ok"}
+    assert sorted(pages_seen) == [(1, "ok"), (2, None), (3, "ok")]
+    assert sorted(released) == [1, 2, 3]
+
+
+def test_document_ids_are_unique_while_converting():
+    async def convert_page(image):
+        return "ok"
+
+    async def main():
+        async with scheduler.PageScheduler(
+            convert_page, max_inflight=1, max_queued=4
+        ) as page_scheduler:
+            done = page_scheduler.add_document("doc", 1)
+            with pytest.raises(ValueError):
+                page_scheduler.add_document("doc", 1)
+            await page_scheduler.submit_page("doc", 1, _image("first"))
+            page_scheduler.seal_document("doc")
+            await asyncio.wait_for(done, timeout=5)
+            # A finished document id can be converted again.
+            again = page_scheduler.add_document("doc", 1)
+            await page_scheduler.submit_page("doc", 1, _image("second"))
+            page_scheduler.seal_document("doc")
+            return await asyncio.wait_for(again, timeout=5)
+
+    assert asyncio.run(main()) == {1: "ok"}
+
+
+def test_failed_document_raises_to_its_waiter():
+    async def convert_page(image):
+        return "ok"
+
+    async def main():
+        async with scheduler.PageScheduler(
+            convert_page, max_inflight=1, max_queued=4
+        ) as page_scheduler:
+            done = page_scheduler.add_document("doc", 2)
+            page_scheduler.fail_document("doc", RuntimeError("corrupt PDF"))
+            with pytest.raises(RuntimeError, match="corrupt PDF"):
+                await done
+
+    asyncio.run(main())
+
+
+def test_capacity_keeps_pages_queued_by_priority():
+    limiter = adaptive_limiter.AdaptiveLimiter(
+        "inference", floor=2, ceiling=8, initial=2
+    )
+    converted: list[str] = []
+
+    async def convert_page(image):
+        async with limiter.slot():
+            await asyncio.sleep(0.005)
+        converted.append(image.info["tag"])
+        return image.info["tag"]
+
+    async def main():
+        async with scheduler.PageScheduler(
+            convert_page,
+            max_inflight=limiter.ceiling,
+            max_queued=64,
+            capacity=lambda: limiter.current_limit,
+        ) as page_scheduler:
+            long_done = page_scheduler.add_document("long", 20)
+            for page_number in range(1, 21):
+                await page_scheduler.submit_page(
+                    "long", page_number, _image(f"long-{page_number}")
+                )
+            page_scheduler.seal_document("long")
+            while len(converted) < 4:
+                await asyncio.sleep(0.001)
+            short_done = page_scheduler.add_document("short", 2)
+            for page_number in (1, 2):
+                await page_scheduler.submit_page(
+                    "short", page_number, _image(f"short-{page_number}")
+                )
+            page_scheduler.seal_document("short")
+            submitted_after = len(converted)
+            await asyncio.wait_for(short_done, timeout=5)
+            short_finished_after = len(converted)
+            await asyncio.wait_for(long_done, timeout=5)
+        return short_finished_after - submitted_after
+
+    # The short filing only waits for the pages already converting, not for
+    # every page a worker could have taken off the queue.
+    assert asyncio.run(main()) <= 2 + limiter.current_limit
+    assert limiter.inflight == 0
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from mcp_sec_filings import catalog, constants, datamodels, search_index
+
+
+@pytest.fixture
+def stored_filing(monkeypatch, tmp_path):
+    monkeypatch.setattr(constants, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(constants, "CATALOG_PATH", str(tmp_path / "catalog.sqlite3"))
+    monkeypatch.setattr(
+        constants, "SEARCH_INDEX_PATH", str(tmp_path / "search.sqlite3")
+    )
+    pdf_path = tmp_path / "TEST" / "filing-10-K.pdf"
+    pdf_path.parent.mkdir()
+    pdf_path.write_bytes(b"%PDF-1.4")
+    mcp_result = datamodels.MCPResultsPDF(
+        ticker="TEST",
+        html_url="https://www.sec.gov/Archives/edgar/data/1/filing.htm",
+        filing_name="10-K",
+        accession_num="0000000001-24-000001",
+        pdf_path=str(pdf_path),
+    )
+    catalog.record_filings([mcp_result], 2024)
+    return pdf_path.with_suffix(".md")
+
+
+def _write(md_path, text: str) -> None:
+    md_path.write_text(text, encoding="utf-8")
+    # Force a new mtime even when the test writes twice within the clock resolution.
+    stat = md_path.stat()
+    os.utime(md_path, (stat.st_atime, stat.st_mtime + 1))
+
+
+def test_chunks_carry_their_page_and_section():
+    chunks = search_index.chunk_markdown(
+        "Intro\n## Item 1A. Risk Factors\nSupply risk"
+        + constants.PAGE_BREAK
+        + "More supply risk"
+    )
+    assert [(chunk.page, chunk.section) for chunk in chunks] == [
+        (1, ""),
+        (1, "Item 1A. Risk Factors"),
+        (2, "Item 1A. Risk Factors"),
+    ]
+
+
+def test_sync_follows_markdown_changes(stored_filing):
+    search_index.sync()
+    assert search_index.search("semiconductors") == []
+
+    _write(stored_filing, "## Item 1A. Risk Factors\nWe depend on semiconductors.")
+    search_index.sync()
+    [hit] = search_index.search("semiconductors", ticker="test")
+    assert (hit.form, hit.year, hit.page) == ("10-K", 2024, 1)
+    assert hit.section == "Item 1A. Risk Factors"
+
+    _write(stored_filing, "## Item 7. Management's Discussion\nRevenue grew.")
+    search_index.sync()
+    assert search_index.search("semiconductors") == []
+    assert len(search_index.search("revenue")) == 1
+
+    stored_filing.unlink()
+    search_index.sync()
+    assert search_index.search("revenue") == []
+
+
+def test_search_accepts_text_that_is_not_fts5_syntax(stored_filing):
+    _write(stored_filing, "Item 7. Revenue grew year-over-year.")
+    search_index.sync()
+    assert len(search_index.search("year-over-year: revenue")) == 1
@@ -0,0 +1,156 @@
+import asyncio
+import collections
+import concurrent.futures
+import time
+
+import httpx
+
+from mcp_sec_filings import constants, datamodels, filing_store, sec_filings
+
+
+def _html_url(number: int) -> datamodels.HTMLURLList:
+    return datamodels.HTMLURLList(
+        html_url=f"https://www.sec.gov/Archives/edgar/data/1/{number}/filing{number}.htm",
+        filing_name="10-K",
+        accession_num=f"0000000001-24-00000{number}",
+    )
+
+
+def test_concurrent_stores_of_one_directory_keep_every_filing(tmp_path, monkeypatch):
+    renders: collections.Counter[str] = collections.Counter()
+
+    async def sec_get(url, **_):
+        await asyncio.sleep(0.01)
+        return httpx.Response(
+            200, content=b"<html></html>", request=httpx.Request("GET", url)
+        )
+
+    def render(html_path, html_url, pdf_path):
+        renders[pdf_path] += 1
+        filing_store.atomic_write_bytes(pdf_path, b"%PDF-1.4")
+        return filing_store.sha256_file(pdf_path)
+
+    monkeypatch.setattr(sec_filings.http_client, "sec_get", sec_get)
+    monkeypatch.setattr(sec_filings, "convert_single_html_to_pdf", render)
+    monkeypatch.setattr(constants, "CATALOG_PATH", str(tmp_path / "catalog.sqlite3"))
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(sec_filings, "get_render_executor", lambda: executor)
+    base_path = str(tmp_path / "TEST-2024")
+    (tmp_path / "TEST-2024").mkdir()
+
+    async def main():
+        return await asyncio.gather(
+            sec_filings.convert_html_to_pdfs(
+                [_html_url(1), _html_url(2)], base_path, "TEST", 2024
+            ),
+            sec_filings.convert_html_to_pdfs(
+                [_html_url(2), _html_url(3)], base_path, "TEST", 2024
+            ),
+        )
+
+    try:
+        first, second = asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    assert all(r.status == "complete" for r in first + second)
+    manifest = filing_store.load_manifest(base_path)
+    assert sorted(manifest) == [f"0000000001-24-00000{n}" for n in (1, 2, 3)]
+    assert all(entry.status == "complete" for entry in manifest.values())
+    # The shared filing is rendered once, the second call finds it complete.
+    assert sorted(renders.values()) == [1, 1, 1]
+
+
+def _fake_pipeline(monkeypatch, tmp_path, render, workers=4):
+    """Serves filing HTML locally and renders on a thread pool, returns the pool."""
+
+    async def sec_get(url, **_):
+        if "missing" in url:
+            return httpx.Response(404, request=httpx.Request("GET", url))
+        return httpx.Response(
+            200, content=b"<html></html>", request=httpx.Request("GET", url)
+        )
+
+    monkeypatch.setattr(sec_filings.http_client, "sec_get", sec_get)
+    monkeypatch.setattr(sec_filings, "convert_single_html_to_pdf", render)
+    monkeypatch.setattr(constants, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(constants, "CATALOG_PATH", str(tmp_path / "catalog.sqlite3"))
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    monkeypatch.setattr(sec_filings, "get_render_executor", lambda: executor)
+    return executor
+
+
+def _request() -> datamodels.SECFilingsRequest:
+    return datamodels.SECFilingsRequest(
+        ticker="TEST", year=2024, filing_types=["10-K", "10-Q"], include_amends=False
+    )
+
+
+def _write_pdf(html_path, html_url, pdf_path):
+    filing_store.atomic_write_bytes(pdf_path, b"%PDF-1.4")
+    return filing_store.sha256_file(pdf_path)
+
+
+def test_every_filing_is_reported_as_it_is_stored(tmp_path, monkeypatch):
+    executor = _fake_pipeline(monkeypatch, tmp_path, _write_pdf)
+    missing = datamodels.HTMLURLList(
+        html_url="https://www.sec.gov/Archives/edgar/data/1/9/missing.htm",
+        filing_name="10-Q1",
+        accession_num="0000000001-24-000009",
+    )
+    request = _request()
+    reported: list[datamodels.MCPResultsPDF] = []
+
+    async def on_filing(mcp_result):
+        reported.append(mcp_result)
+
+    try:
+        results = asyncio.run(
+            sec_filings.sec_save_pdf(
+                [_html_url(1), missing, _html_url(2)], request, on_filing=on_filing
+            )
+        )
+    finally:
+        executor.shutdown()
+
+    # Results keep the request order, failures included.
+    assert [(r.accession_num, r.status) for r in results] == [
+        ("0000000001-24-000001", "complete"),
+        ("0000000001-24-000009", "failed"),
+        ("0000000001-24-000002", "complete"),
+    ]
+    assert "404" in results[1].error
+    assert sorted(r.accession_num for r in reported) == sorted(
+        r.accession_num for r in results
+    )
+
+
+def test_renders_run_off_the_event_loop(tmp_path, monkeypatch):
+    def slow_render(html_path, html_url, pdf_path):
+        time.sleep(0.2)
+        return _write_pdf(html_path, html_url, pdf_path)
+
+    executor = _fake_pipeline(monkeypatch, tmp_path, slow_render)
+    request = _request()
+
+    async def main():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beating = asyncio.create_task(heartbeat())
+        await sec_filings.sec_save_pdf([_html_url(n) for n in (1, 2, 3)], request)
+        beating.cancel()
+        return ticks
+
+    try:
+        ticks = asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    # At least 0.4s of renders, the loop keeps serving other tasks meanwhile.
+    assert ticks >= 15
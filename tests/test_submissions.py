@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mcp_sec_filings import submissions
+
+URL = "https://data.sec.gov/submissions/CIK0000320193.json"
+
+
+@pytest.fixture
+def fake_sec_get(monkeypatch):
+    """Answers like EDGAR with an ETag, and with 304 when the ETag still matches."""
+    requests: list[dict[str, str]] = []
+    state = {"etag": '"v1"', "body": {"filings": {"recent": {}}, "version": 1}}
+
+    async def sec_get(url, headers=None, **_):
+        requests.append(dict(headers or {}))
+        await asyncio.sleep(0.01)
+        request = httpx.Request("GET", url)
+        if (headers or {}).get("If-None-Match") == state["etag"]:
+            return httpx.Response(304, request=request)
+        return httpx.Response(
+            200, json=state["body"], headers={"ETag": state["etag"]}, request=request
+        )
+
+    monkeypatch.setattr(submissions.http_client, "sec_get", sec_get)
+    return requests, state
+
+
+def test_stale_entries_are_revalidated_with_a_conditional_get(fake_sec_get):
+    requests, state = fake_sec_get
+    cache = submissions.SubmissionsCache(max_bytes=1 << 20, fresh_seconds=0)
+
+    async def main():
+        first = await cache.get(URL)
+        revalidated = await cache.get(URL)
+        state["etag"], state["body"] = '"v2"', {"version": 2}
+        changed = await cache.get(URL)
+        return first, revalidated, changed
+
+    first, revalidated, changed = asyncio.run(main())
+    assert "If-None-Match" not in requests[0]
+    assert requests[1]["If-None-Match"] == '"v1"'
+    # The 304 serves the cached body.
+    assert revalidated is first
+    assert changed == {"version": 2}
+
+
+def test_fresh_entries_are_served_without_a_request(fake_sec_get):
+    requests, _ = fake_sec_get
+    cache = submissions.SubmissionsCache(max_bytes=1 << 20, fresh_seconds=60)
+
+    async def main():
+        return [await cache.get(URL) for _ in range(3)]
+
+    first, *rest = asyncio.run(main())
+    assert len(requests) == 1
+    assert all(data is first for data in rest)
+
+
+def test_concurrent_gets_share_one_fetch(fake_sec_get):
+    requests, _ = fake_sec_get
+    cache = submissions.SubmissionsCache(max_bytes=1 << 20, fresh_seconds=60)
+
+    async def main():
+        callers = [asyncio.create_task(cache.get(URL)) for _ in range(5)]
+        await asyncio.sleep(0)
+        # A cancelled caller does not fail the fetch the others wait on.
+        callers[0].cancel()
+        return await asyncio.gather(*callers[1:])
+
+    results = asyncio.run(main())
+    assert len(requests) == 1
+    assert all(data is results[0] for data in results)
@@ -0,0 +1,92 @@
+from mcp_sec_filings import text_layer
+
+PROSE = [
+    "Item 7. Management's Discussion and Analysis",
+    "Net sales increased during the year, driven by higher demand for services",
+    "and continued growth in subscriptions across every geographic segment.",
+]
+TABLE = [f"Segment {n} $1,{n}00 $2,{n}00 $3,{n}00 12.{n}%" for n in range(8)]
+
+
+def _text_stream(lines: list[str]) -> bytes:
+    ops = ["BT", "/F1 10 Tf", "12 TL", "40 750 Td"]
+    for line in lines:
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        ops.append(f"({escaped}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def _write_pdf(path, pages: list[tuple[list[str], bool]]) -> None:
+    """Writes a letter sized PDF whose pages hold `lines` of text and, when set, a full page image."""
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # The page tree, filled in once the page ids are known.
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray"
+        b" /BitsPerComponent 8 /Length 1 >>\nstream\n\x80\nendstream",
+    ]
+    page_ids = []
+    for lines, full_page_image in pages:
+        content = _text_stream(lines)
+        if full_page_image:
+            content = b"q 612 0 0 792 0 0 cm /Im1 Do Q\n" + content
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R"
+            b" /Resources << /Font << /F1 3 0 R >> /XObject << /Im1 4 0 R >> >> >>"
+            % len(objects)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(bytes(out))
+
+
+def test_every_page_is_routed_with_its_reason(tmp_path):
+    pdf_path = tmp_path / "filing.pdf"
+    _write_pdf(
+        pdf_path,
+        [
+            (PROSE, False),
+            ([], False),
+            (["Page 3"], False),
+            (PROSE, True),
+            (PROSE + TABLE, False),
+        ],
+    )
+
+    routes = text_layer.route_pages(str(pdf_path), [1, 2, 3, 4, 5])
+
+    assert [(route.route, route.reason) for route in routes] == [
+        ("text", "text-layer"),
+        ("text", "blank"),
+        ("vlm", "no-text-layer"),
+        ("vlm", "image-heavy"),
+        ("vlm", "complex-table"),
+    ]
+    assert routes[0].markdown.startswith("## Item 7. Management")
+    assert routes[3].image_coverage == 1.0
+    assert all(route.markdown is None for route in routes if route.route == "vlm")
+
+
+def test_text_layer_paragraphs_and_headings():
+    text = "Item 1A. Risk Factors\r\nWe depend on\r\nsuppliers.\r\n\r\nOther risks"
+    assert text_layer.text_to_markdown(text) == (
+        "## Item 1A. Risk Factors\n\nWe depend on suppliers.\n\nOther risks"
+    )
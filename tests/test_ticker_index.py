@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+import time
+
+import httpx
+import pytest
+
+from mcp_sec_filings import constants, http_client, sec_filings, ticker_index
+
+COMPANY_TICKERS = {
+    "0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."},
+    "1": {"cik_str": 789019, "ticker": "MSFT", "title": "MICROSOFT CORP"},
+}
+
+
+@pytest.fixture
+def fake_sec(monkeypatch, tmp_path):
+    """Serves company_tickers.json and browse-edgar searches, recording every requested url."""
+    requested: list[str] = []
+    state = {"tickers_status": 200}
+
+    async def sec_get(url, headers=None, **_):
+        requested.append(url)
+        request = httpx.Request("GET", url)
+        if url == constants.SEC_COMPANY_TICKERS_URL:
+            return httpx.Response(
+                state["tickers_status"], json=COMPANY_TICKERS, request=request
+            )
+        return httpx.Response(
+            200,
+            text='<a href="/cgi-bin/browse-edgar?action=getcompany&CIK=0001234567">',
+            request=request,
+        )
+
+    monkeypatch.setattr(http_client, "sec_get", sec_get)
+    monkeypatch.setattr(
+        constants, "TICKER_INDEX_PATH", str(tmp_path / "company_tickers.json")
+    )
+    monkeypatch.setattr(ticker_index, "_ticker_to_cik", None)
+    monkeypatch.setattr(ticker_index, "_loaded_at", 0.0)
+    return requested, state
+
+
+def _expire():
+    stale = time.time() - constants.TICKER_INDEX_TTL_SECONDS - 1
+    ticker_index._loaded_at = stale
+    os.utime(constants.TICKER_INDEX_PATH, (stale, stale))
+
+
+def test_index_is_downloaded_once_and_kept_on_disk(fake_sec):
+    requested, _ = fake_sec
+
+    async def main():
+        return [await ticker_index.lookup_cik(ticker) for ticker in ["aapl", "MSFT"]]
+
+    assert asyncio.run(main()) == ["0000320193", "0000789019"]
+    assert requested == [constants.SEC_COMPANY_TICKERS_URL]
+    with open(constants.TICKER_INDEX_PATH, encoding="utf-8") as f:
+        assert json.load(f)["AAPL"] == "0000320193"
+
+    # A new process reads the fresh copy on disk instead of downloading it.
+    ticker_index._ticker_to_cik = None
+    assert asyncio.run(ticker_index.lookup_cik("MSFT")) == "0000789019"
+    assert requested == [constants.SEC_COMPANY_TICKERS_URL]
+
+
+def test_expired_index_is_downloaded_again(fake_sec):
+    requested, _ = fake_sec
+    asyncio.run(ticker_index.lookup_cik("AAPL"))
+    _expire()
+    assert asyncio.run(ticker_index.lookup_cik("AAPL")) == "0000320193"
+    assert requested == [constants.SEC_COMPANY_TICKERS_URL] * 2
+
+
+def test_stale_index_is_used_when_the_download_fails(fake_sec):
+    requested, state = fake_sec
+    asyncio.run(ticker_index.lookup_cik("AAPL"))
+    _expire()
+    state["tickers_status"] = 503
+    assert asyncio.run(ticker_index.lookup_cik("AAPL")) == "0000320193"
+    # The failed refresh is not retried on every lookup.
+    assert asyncio.run(ticker_index.lookup_cik("MSFT")) == "0000789019"
+    assert requested == [constants.SEC_COMPANY_TICKERS_URL] * 2
+
+
+def test_unknown_tickers_fall_back_to_scraping(fake_sec):
+    requested, _ = fake_sec
+
+    async def main():
+        return [await sec_filings.get_cik_by_ticker("NEWCO") for _ in range(2)]
+
+    assert asyncio.run(main()) == ["0001234567", "0001234567"]
+    searches = [url for url in requested if url.startswith(constants.SEC_SEARCH_URL)]
+    # The scraped CIK is remembered, so the second lookup does not search again.
+    assert len(searches) == 1